@@ -4,7 +4,7 @@ MCP server handler for tool management
 
 import json
 from fastmcp import Client as MCPClient
-from ui.display import print_tool_call, print_tool_result, print_error
+from ui.display import print_tool_call, print_tool_result, print_error, print_tool_progress, print_tool_partial
 
 class MCPHandler:
     """Handler for MCP server interactions"""
@@ -14,11 +14,16 @@ class MCPHandler:
         self.timeout = config.get("timeout", 30)
         self.client = None
         self.tools = []
+        self.partial_results = []
         
     async def connect(self):
         """Connect to MCP server and get available tools"""
         try:
-            self.client = MCPClient(self.url)
+            self.client = MCPClient(
+                self.url,
+                log_handler=self._handle_log,
+                progress_handler=self._handle_progress
+            )
             await self.client.__aenter__()
             
             server_tools = await self.client.list_tools()
@@ -48,6 +53,25 @@ class MCPHandler:
             except Exception as e:
                 print_error(f"Error disconnecting from MCP server: {e}")
     
+    async def _handle_progress(self, progress, total, message):
+        """Show progress notifications sent while a tool is still running"""
+        print_tool_progress(progress, total, message)
+    
+    async def _handle_log(self, log_message):
+        """Collect partial tool results streamed as log notifications"""
+        data = log_message.data
+        if isinstance(data, dict) and 'msg' in data:
+            data = data['msg']
+        try:
+            payload = json.loads(data) if isinstance(data, str) else data
+        except json.JSONDecodeError:
+            payload = None
+        
+        if isinstance(payload, dict) and payload.get('type') in ('websearch_result', 'scrape_result'):
+            result = payload.get('result', {})
+            self.partial_results.append(result)
+            print_tool_partial(result.get('title') or result.get('error', ''), result.get('url', ''), result.get('content_length', 0))
+    
     def get_tools(self):
         """Get the list of available tools"""
         return self.tools
@@ -78,6 +102,7 @@ class MCPHandler:
             print_tool_call(function_name, arguments)
             
             # Track tool execution time
+            self.partial_results = []
             tool_start = datetime.now()
             result = await self.client.call_tool(function_name, arguments)
             tool_end = datetime.now()
@@ -91,5 +116,8 @@ class MCPHandler:
             tool_end = datetime.now()
             execution_time = (tool_end - tool_start).total_seconds() if 'tool_start' in locals() else 0.0
             error_msg = f"Error calling tool: {e}"
+            if self.partial_results:
+                # Pages that were streamed before the failure are still usable
+                error_msg += f"\nPartial results received before the error: {json.dumps(self.partial_results, ensure_ascii=False)}"
             print_tool_result(error_msg, success=False)
             return error_msg, execution_time
\ No newline at end of file
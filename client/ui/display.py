@@ -74,6 +74,16 @@ def print_tool_result(result, success=True):
     else:
         print(f"{Colors.DIM}  {result_str}{Colors.RESET}")
 
+def print_tool_progress(progress, total=None, message=None):
+    """Print a progress update for a running tool"""
+    done = f"{progress:g}/{total:g}" if total else f"{progress:g}"
+    suffix = f" {message}" if message else ""
+    print(f"{Colors.DIM}  [{done}]{suffix}{Colors.RESET}")
+
+def print_tool_partial(title, url, length):
+    """Print a partial result streamed by a running tool"""
+    print(f"{Colors.DIM}  {Icons.BULLET} {title or url} ({length} chars){Colors.RESET}")
+
 def print_error(message):
     """Print error message"""
     timestamp = print_timestamp()
@@ -108,4 +108,249 @@ browser.commands.onCommand.addListener((command) => {
       }).catch(error => console.error("Error querying all tabs:", error));
     }).catch(error => console.error("Error querying active tab:", error));
   }
-});
\ No newline at end of file
+});
+
+// Direct channel to the MCP server, used instead of keystrokes + clipboard when connected.
+// Every request is acknowledged right away and answered with a result under the same id.
+const BRIDGE_URL = "ws://127.0.0.1:8766";
+let bridge = null;
+let bridgeRetryMs = 1000;
+
+function connectBridge() {
+  bridge = new WebSocket(BRIDGE_URL);
+  
+  bridge.onopen = () => {
+    console.log("Connected to MCP server bridge");
+    bridgeRetryMs = 1000;
+    sendTabSnapshot();
+  };
+  
+  bridge.onmessage = (event) => {
+    let request;
+    try {
+      request = JSON.parse(event.data);
+    } catch (error) {
+      console.error("Malformed bridge request:", error);
+      return;
+    }
+    handleBridgeRequest(request);
+  };
+  
+  bridge.onclose = () => {
+    bridge = null;
+    // Server not running yet or restarted, keep retrying with backoff
+    setTimeout(connectBridge, bridgeRetryMs);
+    bridgeRetryMs = Math.min(bridgeRetryMs * 2, 30000);
+  };
+}
+
+function sendToBridge(message) {
+  if (bridge && bridge.readyState === WebSocket.OPEN) {
+    bridge.send(JSON.stringify(message));
+  }
+}
+
+// Large page content goes out in chunk frames ahead of the result, which the
+// server stitches back together, so no single frame grows with the page
+const CHUNK_CHARS = 256 * 1024;
+
+function sendResult(id, data) {
+  if (data && typeof data.content === "string" && data.content.length > CHUNK_CHARS) {
+    const content = data.content;
+    let index = 0;
+    for (let start = 0; start < content.length; start += CHUNK_CHARS) {
+      sendToBridge({ id: id, type: "chunk", field: "content", index: index++, data: content.substring(start, start + CHUNK_CHARS) });
+    }
+    data = { ...data, content: undefined, chunked_fields: ["content"], chunk_counts: { content: index } };
+  }
+  sendToBridge({ id: id, type: "result", ok: true, data: data });
+}
+
+function handleBridgeRequest(request) {
+  sendToBridge({ id: request.id, type: "ack" });
+  
+  const action = bridgeActions[request.action];
+  if (!action) {
+    sendToBridge({ id: request.id, type: "result", ok: false, error: `Unknown action: ${request.action}` });
+    return;
+  }
+  
+  Promise.resolve()
+    .then(() => action(request.params || {}))
+    .then(data => sendResult(request.id, data))
+    .catch(error => sendToBridge({ id: request.id, type: "result", ok: false, error: String(error && error.message || error) }));
+}
+
+// Same shape as the Ctrl+E payload, plus the browser's own tab id for follow-up requests
+async function listTabs() {
+  const allTabsInWindow = await browser.tabs.query({ currentWindow: true });
+  let currentTab = null;
+  const otherTabs = [];
+  allTabsInWindow.forEach((tab, index) => {
+    const info = { id: index + 1, tab_id: tab.id, title: tab.title, url: tab.url };
+    if (tab.active) {
+      currentTab = info;
+    } else {
+      otherTabs.push(info);
+    }
+  });
+  return { current_tab: currentTab, other_tabs: otherTabs };
+}
+
+// Ready once the main text length has held still for stableMs (and notBeforeMs
+// has passed), rather than on the load event: SPAs render after it, static
+// pages are readable long before it. Resolves with readyMs, the time the text
+// last changed, so the server can learn how quickly the domain settles.
+async function waitForStableContent(tabId, { stableMs, notBeforeMs, timeoutMs }) {
+  const started = Date.now();
+  let length = -1;
+  let changedAt = started;
+  for (;;) {
+    let current = 0;
+    try {
+      current = (await browser.tabs.sendMessage(tabId, { action: "contentLength" })).length;
+    } catch (error) {
+      // Content script not injected yet
+    }
+    const now = Date.now();
+    if (current !== length) {
+      length = current;
+      changedAt = now;
+    } else if (length > 0 && now - started >= notBeforeMs && now - changedAt >= stableMs) {
+      return { timedOut: false, readyMs: changedAt - started };
+    }
+    if (now - started >= timeoutMs) {
+      return { timedOut: true, readyMs: changedAt - started };
+    }
+    await new Promise(resolve => setTimeout(resolve, 100));
+  }
+}
+
+// The content script may not be listening yet right after the load event
+async function requestExtraction(tabId, maxChars, attempts = 10) {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await browser.tabs.sendMessage(tabId, { action: "extractContent", maxChars: maxChars });
+    } catch (error) {
+      if (attempt >= attempts) throw error;
+      await new Promise(resolve => setTimeout(resolve, 100));
+    }
+  }
+}
+
+const bridgeActions = {
+  list_tabs: () => listTabs(),
+  
+  // Reaches any tab, unlike Ctrl+1..8
+  activate_tab: async ({ tab_id }) => {
+    const tab = await browser.tabs.update(tab_id, { active: true });
+    await browser.windows.update(tab.windowId, { focused: true });
+    return { activated: tab_id };
+  },
+  
+  // Readiness probe for tabs the server opened with keystrokes, defaults to the active tab
+  content_length: async ({ tab_id }) => {
+    if (tab_id === undefined) {
+      const [tab] = await browser.tabs.query({ active: true, lastFocusedWindow: true });
+      tab_id = tab.id;
+    }
+    try {
+      return await browser.tabs.sendMessage(tab_id, { action: "contentLength" });
+    } catch (error) {
+      // Content script not injected yet
+      return { length: 0 };
+    }
+  },
+  
+  extract_tab: async ({ tab_id, max_chars }) => {
+    const tab = await browser.tabs.get(tab_id);
+    const allTabsInWindow = await browser.tabs.query({ windowId: tab.windowId });
+    const page = await requestExtraction(tab_id, max_chars);
+    return {
+      tab_number: allTabsInWindow.findIndex(t => t.id === tab_id) + 1,
+      title: tab.title,
+      url: tab.url,
+      content: page.content,
+      extract_ms: page.extract_ms
+    };
+  },
+  
+  // Load the URL in a background tab, never focused and hidden from the tab strip
+  // where supported, extract it and close it again. Safe to run several at once.
+  scrape_in_background: async ({ url, timeout_ms = 15000, stable_ms = 500, not_before_ms = 0, max_chars }) => {
+    const tab = await browser.tabs.create({ url: url, active: false });
+    try {
+      browser.tabs.update(tab.id, { muted: true }).catch(() => {});
+      if (browser.tabs.hide) {
+        browser.tabs.hide(tab.id).catch(() => {});
+      }
+      const ready = await waitForStableContent(tab.id, { stableMs: stable_ms, notBeforeMs: not_before_ms, timeoutMs: timeout_ms });
+      const loaded = await browser.tabs.get(tab.id);
+      const page = await requestExtraction(tab.id, max_chars);
+      return {
+        tab_number: 'background',
+        title: loaded.title,
+        url: loaded.url,
+        content: page.content,
+        extract_ms: page.extract_ms,
+        ready_ms: ready.readyMs,
+        timed_out: ready.timedOut
+      };
+    } finally {
+      browser.tabs.remove(tab.id).catch(() => {});
+    }
+  }
+};
+
+// Push tab changes so the server keeps a live tab index and never has to ask.
+// Structural changes send a full (debounced) snapshot, everything else a small event.
+function tabInfo(tab) {
+  return {
+    tab_id: tab.id,
+    window_id: tab.windowId,
+    index: tab.index,
+    title: tab.title,
+    url: tab.url,
+    active: tab.active,
+    hidden: tab.hidden || false
+  };
+}
+
+async function sendTabSnapshot() {
+  try {
+    const [tabs, focused] = await Promise.all([browser.tabs.query({}), browser.windows.getLastFocused()]);
+    sendToBridge({ type: "event", event: "tabs_snapshot", focused_window_id: focused.id, tabs: tabs.map(tabInfo) });
+  } catch (error) {
+    console.error("Could not send tab snapshot:", error);
+  }
+}
+
+let snapshotTimer = null;
+function scheduleTabSnapshot() {
+  clearTimeout(snapshotTimer);
+  snapshotTimer = setTimeout(sendTabSnapshot, 50);
+}
+
+browser.tabs.onCreated.addListener(scheduleTabSnapshot);
+browser.tabs.onRemoved.addListener(scheduleTabSnapshot);
+browser.tabs.onMoved.addListener(scheduleTabSnapshot);
+browser.tabs.onAttached.addListener(scheduleTabSnapshot);
+browser.tabs.onDetached.addListener(scheduleTabSnapshot);
+
+browser.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
+  if (changeInfo.url !== undefined || changeInfo.title !== undefined || changeInfo.hidden !== undefined) {
+    sendToBridge({ type: "event", event: "tab_updated", tab: tabInfo(tab) });
+  }
+});
+
+browser.tabs.onActivated.addListener(({ tabId, windowId }) => {
+  sendToBridge({ type: "event", event: "tab_activated", tab_id: tabId, window_id: windowId });
+});
+
+browser.windows.onFocusChanged.addListener((windowId) => {
+  if (windowId !== browser.windows.WINDOW_ID_NONE) {
+    sendToBridge({ type: "event", event: "window_focused", window_id: windowId });
+  }
+});
+
+connectBridge();
@@ -7,18 +7,25 @@ browser.runtime.onMessage.addListener((message, sender, sendResponse) => {
     copyTabInfoWithHTMLToClipboard(message.currentTab);
   } else if (message.action === "copyTabInfo") {
     copyTabInfoToClipboard(message.currentTab, message.allTabs);
+  } else if (message.action === "extractContent") {
+    // Requested over the server bridge, answered directly instead of via the clipboard
+    return Promise.resolve(extractWithTiming(message.maxChars || Infinity));
+  } else if (message.action === "contentLength") {
+    // Cheap readiness probe, polled until the page's text stops changing
+    return Promise.resolve({ length: mainContentLength() });
   }
 });
 
 function copyTabInfoWithHTMLToClipboard(currentTab) {
   // Extract meaningful content from the page efficiently
-  const content = extractPageContent();
+  const page = extractWithTiming(50000);
   
   const tabData = {
     tab_number: currentTab.id,
     title: currentTab.title,
     url: currentTab.url,
-    content: content
+    content: page.content,
+    extract_ms: page.extract_ms
   };
   
   const jsonString = JSON.stringify(tabData, null, 2);
@@ -32,68 +39,87 @@ function copyTabInfoWithHTMLToClipboard(currentTab) {
   });
 }
 
-function extractPageContent() {
-  // Remove scripts, styles, and other non-content elements
-  const elementsToRemove = ['script', 'style', 'noscript', 'iframe', 'object', 'embed', 'nav', 'aside', 'footer', 'header'];
-  const clone = document.cloneNode(true);
-  
-  // Remove unwanted elements from the clone
-  elementsToRemove.forEach(tag => {
-    const elements = clone.querySelectorAll(tag);
-    elements.forEach(el => el.remove());
-  });
-  
-  // Remove elements with common noise classes/ids
-  const noiseSelectors = [
-    '[class*="ad"]', '[id*="ad"]', '[class*="advertisement"]',
-    '[class*="sidebar"]', '[class*="cookie"]', '[class*="popup"]',
-    '[class*="modal"]', '[class*="overlay"]', '[class*="banner"]',
-    '[class*="newsletter"]', '[class*="subscribe"]', '[class*="social"]',
-    '[class*="share"]', '[class*="comment"]', '[class*="related"]',
-    '[class*="recommended"]', '[class*="promo"]', '[class*="widget"]'
-  ];
-  
-  noiseSelectors.forEach(selector => {
-    try {
-      const elements = clone.querySelectorAll(selector);
-      elements.forEach(el => el.remove());
-    } catch(e) {
-      // Ignore selector errors
+// Elements whose whole subtree never holds readable content
+const SKIP_TAGS = new Set([
+  'script', 'style', 'noscript', 'template', 'iframe', 'object', 'embed',
+  'nav', 'aside', 'footer', 'header', 'svg', 'canvas'
+]);
+
+// class/id words marking boilerplate, matched as whole words so "header-ad"
+// is noise but "loaded" or "shadow" are not
+const NOISE_PATTERN = /(?:^|[\s_-])(?:ads?|advert\w*|sidebar|cookies?|popup|modal|overlay|banner|newsletter|subscribe|social|share|sharing|comments?|related|recommended|promo\w*|widget)(?:$|[\s_-])/i;
+
+const MAIN_SELECTORS = [
+  'main', 'article', '[role="main"]', '.main-content',
+  '#main-content', '.content', '#content', '.post-content',
+  '.article-content', '.entry-content', '.page-content'
+];
+
+function isNoise(element) {
+  if (SKIP_TAGS.has(element.localName)) return true;
+  if (element.hidden || element.getAttribute('aria-hidden') === 'true') return true;
+  const classes = element.getAttribute('class');
+  if (classes && NOISE_PATTERN.test(classes)) return true;
+  return Boolean(element.id) && NOISE_PATTERN.test(element.id);
+}
+
+// Elements whose edges separate words; text inside inline tags (<b>, <a>, <span>) joins up as written
+const BLOCK_TAGS = new Set([
+  'address', 'article', 'blockquote', 'caption', 'dd', 'details', 'div', 'dl', 'dt',
+  'fieldset', 'figcaption', 'figure', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+  'li', 'main', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'td', 'th', 'tr', 'ul'
+]);
+
+function walkText(root, maxChars = Infinity) {
+  const parts = [];
+  let collected = 0;
+  // Block elements the walk is currently inside, innermost last
+  const blocks = [];
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+    acceptNode(node) {
+      if (node.nodeType === Node.TEXT_NODE || node.localName === 'br') return NodeFilter.FILTER_ACCEPT;
+      if (isNoise(node)) return NodeFilter.FILTER_REJECT;
+      return BLOCK_TAGS.has(node.localName) ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
     }
   });
-  
-  // Try to find main content area first
-  let mainContent = null;
-  const mainSelectors = [
-    'main', 'article', '[role="main"]', '.main-content', 
-    '#main-content', '.content', '#content', '.post-content',
-    '.article-content', '.entry-content', '.page-content'
-  ];
-  
-  for (const selector of mainSelectors) {
-    const element = clone.querySelector(selector);
-    if (element) {
-      mainContent = element;
-      break;
+  while (walker.nextNode()) {
+    const node = walker.currentNode;
+    // Moving into or out of a block element starts a new word
+    while (blocks.length && !blocks[blocks.length - 1].contains(node)) {
+      blocks.pop();
+      parts.push(' ');
+    }
+    if (node.nodeType !== Node.TEXT_NODE) {
+      if (node.localName !== 'br') blocks.push(node);
+      parts.push(' ');
+      continue;
     }
+    parts.push(node.nodeValue);
+    collected += node.nodeValue.length;
+    if (collected >= maxChars * 2) break;
   }
-  
-  // If no main content found, use body but filter more aggressively
-  if (!mainContent) {
-    mainContent = clone.querySelector('body') || clone;
+  return parts.join('').replace(/\s+/g, ' ').trim();
+}
+
+function findMainContent() {
+  for (const selector of MAIN_SELECTORS) {
+    const element = document.querySelector(selector);
+    if (element && !isNoise(element)) {
+      return element;
+    }
   }
-  
-  // Extract text content and clean it up
-  let textContent = mainContent.textContent || mainContent.innerText || '';
-  
-  // Clean up the text
-  textContent = textContent
-    // Replace multiple whitespaces with single space
-    .replace(/\s+/g, ' ')
-    // Remove excessive line breaks
-    .replace(/\n\s*\n\s*\n/g, '\n\n')
-    // Trim whitespace from start and end
-    .trim();
+  return null;
+}
+
+function mainContentLength() {
+  const root = findMainContent() || document.body;
+  return root ? root.textContent.length : 0;
+}
+
+function extractPageContent(maxLength = Infinity) {
+  // Try to find main content area first, otherwise use body
+  const mainContent = findMainContent();
+  let textContent = walkText(mainContent || document.body || document.documentElement, maxLength);
   
   // If content is too short, try to get more content from the page
   if (textContent.length < 100) {
@@ -104,8 +130,7 @@ function extractPageContent() {
     }
   }
   
-  // Limit content length to prevent extremely large payloads (optional)
-  const maxLength = 50000; // Adjust as needed
+  // Both paths cap the payload, the clipboard at 50k and the server bridge at its page budget
   if (textContent.length > maxLength) {
     textContent = textContent.substring(0, maxLength) + '\n\n[Content truncated due to length...]';
   }
@@ -113,6 +138,12 @@ function extractPageContent() {
   return textContent;
 }
 
+function extractWithTiming(maxLength) {
+  const started = performance.now();
+  const content = extractPageContent(maxLength);
+  return { content: content, extract_ms: Math.round(performance.now() - started) };
+}
+
 function copyTabInfoToClipboard(currentTabDetails, allTabsInWindow) {
   // The 'id' field in currentTabDetails and elements of allTabsInWindow is already the tab number
   const jsonData = {
@@ -0,0 +1,110 @@
+"""
+Local stand-in for Hyprland's IPC sockets, for exercising tools.hyprland_ipc
+without a compositor.
+
+    fake = FakeHyprland().start()   # sets HYPRLAND_INSTANCE_SIGNATURE / XDG_RUNTIME_DIR
+    fake.clients.append({...}); fake.emit('openwindow', '...')
+
+.socket.sock answers j/clients, j/activeworkspace, j/monitors and [[BATCH]]
+dispatches (recorded in `dispatched`, 'workspace N' is applied). .socket2.sock
+broadcasts whatever emit() is given.
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+
+
+class FakeHyprland:
+    def __init__(self, signature: str = 'fake_instance'):
+        self.signature = signature
+        self.runtime_dir = tempfile.mkdtemp(prefix='fake_hypr_')
+        self.clients = [{
+            'class': 'zen',
+            'title': 'Zen Browser',
+            'workspace': {'id': 2, 'name': '2'}
+        }]
+        self.active_workspace = {'id': 1, 'name': '1'}
+        self.monitors = [{'id': 0, 'name': 'DP-1', 'specialWorkspace': {'id': 0, 'name': ''}}]
+        self.requests = []
+        self.dispatched = []
+        self._subscribers = []
+        self._lock = threading.Lock()
+        directory = os.path.join(self.runtime_dir, 'hypr', signature)
+        os.makedirs(directory)
+        self._request_socket = self._listen(os.path.join(directory, '.socket.sock'))
+        self._event_socket = self._listen(os.path.join(directory, '.socket2.sock'))
+
+    @staticmethod
+    def _listen(path: str) -> socket.socket:
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(16)
+        return server
+
+    def start(self):
+        os.environ['HYPRLAND_INSTANCE_SIGNATURE'] = self.signature
+        os.environ['XDG_RUNTIME_DIR'] = self.runtime_dir
+        threading.Thread(target=self._serve_requests, daemon=True).start()
+        threading.Thread(target=self._serve_events, daemon=True).start()
+        return self
+
+    def _answer(self, command: str) -> str:
+        self.requests.append(command)
+        if command.startswith('[[BATCH]]'):
+            replies = []
+            for part in command[len('[[BATCH]]'):].split(';'):
+                dispatcher = part.strip()[len('dispatch '):]
+                self.dispatched.append(dispatcher)
+                name, _, argument = dispatcher.partition(' ')
+                if name == 'workspace':
+                    self.active_workspace = {'id': int(argument), 'name': argument}
+                    self.emit('workspace', argument)
+                replies.append('ok')
+            return '\n\n'.join(replies)
+        queries = {
+            'j/clients': self.clients,
+            'j/activeworkspace': self.active_workspace,
+            'j/monitors': self.monitors
+        }
+        if command in queries:
+            return json.dumps(queries[command])
+        return 'unknown request'
+
+    def _serve_requests(self):
+        while True:
+            try:
+                connection, _ = self._request_socket.accept()
+            except OSError:
+                return
+            with connection:
+                command = connection.recv(65536).decode('utf-8')
+                connection.sendall(self._answer(command).encode('utf-8'))
+
+    def _serve_events(self):
+        while True:
+            try:
+                connection, _ = self._event_socket.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._subscribers.append(connection)
+
+    def emit(self, event: str, data: str = ''):
+        line = f"{event}>>{data}\n".encode('utf-8')
+        with self._lock:
+            for connection in list(self._subscribers):
+                try:
+                    connection.sendall(line)
+                except OSError:
+                    self._subscribers.remove(connection)
+
+    def stop(self):
+        self._request_socket.close()
+        self._event_socket.close()
+        with self._lock:
+            for connection in self._subscribers:
+                connection.close()
+            self._subscribers.clear()
@@ -0,0 +1,230 @@
+"""
+Local stand-in for DuckDuckGo plus fixture sites, used by the websearch benchmark.
+
+GET /             search box, or a results page when ?q= is given. The markup
+                  matches the selectors used by _search_duckduckgo_ultra_fast.
+GET /html/?q=     DuckDuckGo's no-JS HTML endpoint, for DuckDuckGoHTMLBackend.
+GET /search?q=&format=json
+                  SearXNG-style JSON results, for SearxngBackend. Ranked in
+                  reverse so rank fusion has something to merge.
+
+Each fixture site is served on its own port and shaped by the profile
+(latency, size, JS rendering).
+"""
+
+import json
+import random
+import threading
+import time
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote
+
+# One entry per fixture site: response latency, approximate text size, and whether
+# the content only appears after client-side rendering
+DEFAULT_PROFILE = [
+    {'latency_ms': 50, 'size_kb': 20, 'js': False},
+    {'latency_ms': 150, 'size_kb': 60, 'js': False},
+    {'latency_ms': 300, 'size_kb': 10, 'js': True},
+    {'latency_ms': 80, 'size_kb': 200, 'js': False},
+    {'latency_ms': 600, 'size_kb': 30, 'js': False},
+    {'latency_ms': 1200, 'size_kb': 40, 'js': True},
+    {'latency_ms': 2500, 'size_kb': 15, 'js': False},
+    {'latency_ms': 100, 'size_kb': 5, 'js': False},
+    {'latency_ms': 4000, 'size_kb': 50, 'js': False},
+    {'latency_ms': 200, 'size_kb': 80, 'js': True},
+]
+
+WORDS = (
+    'latency throughput browser context cache scrape search query result page content '
+    'network socket render parser extract passage benchmark fixture server python async '
+    'event loop token budget deadline pool worker request response header document'
+).split()
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html><head><title>DuckDuckGo</title></head>
+<body><form action="/" method="get"><input name="q" type="text" autofocus></form></body></html>"""
+
+RESULTS_PAGE = """<!DOCTYPE html>
+<html><head><title>{query} at DuckDuckGo</title></head>
+<body><form action="/" method="get"><input name="q" type="text" value="{query}"></form>
+<section>{articles}</section></body></html>"""
+
+HTML_RESULT = """<div class="result results_links web-result">
+<h2 class="result__title"><a rel="nofollow" class="result__a" href="//duckduckgo.com/l/?uddg={target}&amp;rut=fixture">{title}</a></h2>
+<a class="result__snippet" href="//duckduckgo.com/l/?uddg={target}">{snippet}</a>
+</div>"""
+
+ARTICLE = """<article data-testid="result">
+<h2><a href="{url}">{title}</a></h2>
+<div data-result="snippet">{snippet}</div>
+</article>"""
+
+
+def _paragraphs(seed: int, size_kb: int):
+    rng = random.Random(seed)
+    target = size_kb * 1024
+    paragraphs = []
+    size = 0
+    while size < target:
+        sentence_count = rng.randint(3, 8)
+        paragraph = ' '.join(
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + '.'
+            for _ in range(sentence_count)
+        )
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    return paragraphs
+
+
+def render_site(index: int, site: dict) -> str:
+    paragraphs = _paragraphs(index, site['size_kb'])
+    title = f"Fixture site {index}"
+    if site['js']:
+        # App shell: the article only exists once the script runs
+        return f"""<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body><div id="root"></div>
+<script>
+const paragraphs = {json.dumps(paragraphs)};
+setTimeout(() => {{
+  const article = document.createElement('article');
+  article.innerHTML = '<h1>{title}</h1>' + paragraphs.map(p => '<p>' + p + '</p>').join('');
+  document.getElementById('root').appendChild(article);
+}}, 50);
+</script></body></html>"""
+
+    body = ''.join(f"<p>{escape(p)}</p>" for p in paragraphs)
+    return f"""<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body><nav><a href="/">Home</a> <a href="/about">About</a></nav>
+<article><h1>{title}</h1>{body}</article>
+<footer>Fixture footer</footer></body></html>"""
+
+
+class FakeSearchServer:
+    """
+    Threaded HTTP servers hosting the fake search engine and fixture sites.
+
+    Every fixture site gets its own port so per-domain state in the scraper
+    (learned fetch tiers, politeness limits) treats them as separate hosts.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, profile=None):
+        self.profile = profile or DEFAULT_PROFILE
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body: str, status: int = 200, content_type: str = 'text/html; charset=utf-8'):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The scraper cancelled this fetch
+                    pass
+
+            def do_GET(self):
+                fake.requests += 1
+                parsed = urlparse(self.path)
+                index = self.server.site_index
+                if index is not None:
+                    if parsed.path != '/':
+                        return self._send('<h1>Not found</h1>', 404)
+                    site = fake.profile[index]
+                    time.sleep(site['latency_ms'] / 1000)
+                    return self._send(render_site(index, site))
+                query = parse_qs(parsed.query).get('q', [''])[0]
+                if parsed.path == '/':
+                    if not query:
+                        return self._send(SEARCH_PAGE)
+                    return self._send(fake.results_page(query))
+                if parsed.path == '/html/':
+                    return self._send(fake.html_results_page(query))
+                if parsed.path == '/search':
+                    return self._send(json.dumps(fake.searxng_results(query)), content_type='application/json')
+                self._send('<h1>Not found</h1>', 404)
+
+        def make_server(bind_port, site_index):
+            httpd = ThreadingHTTPServer((host, bind_port), Handler)
+            httpd.daemon_threads = True
+            httpd.site_index = site_index
+            return httpd
+
+        self._httpd = make_server(port, None)
+        self._sites = [make_server(0, i) for i in range(len(self.profile))]
+        self._threads = []
+
+    @staticmethod
+    def _url(httpd) -> str:
+        host, port = httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def url(self) -> str:
+        return self._url(self._httpd)
+
+    def site_url(self, index: int) -> str:
+        return self._url(self._sites[index])
+
+    def results_page(self, query: str) -> str:
+        articles = ''.join(
+            ARTICLE.format(
+                url=self.site_url(i),
+                title=f"Fixture site {i} for {escape(query)}",
+                snippet=f"{site['size_kb']} KB, {site['latency_ms']} ms{', JS rendered' if site['js'] else ''}"
+            )
+            for i, site in enumerate(self.profile)
+        )
+        return RESULTS_PAGE.format(query=escape(query), articles=articles)
+
+    def _fixture_results(self, query: str):
+        for i, site in enumerate(self.profile):
+            yield (
+                self.site_url(i),
+                f"Fixture site {i} for {query}",
+                f"{site['size_kb']} KB, {site['latency_ms']} ms{', JS rendered' if site['js'] else ''}"
+            )
+
+    def html_results_page(self, query: str) -> str:
+        results = ''.join(
+            HTML_RESULT.format(target=quote(url, safe=''), title=escape(title), snippet=escape(snippet))
+            for url, title, snippet in self._fixture_results(query)
+        )
+        return f"<!DOCTYPE html><html><head><title>{escape(query)} at DuckDuckGo</title></head><body>{results}</body></html>"
+
+    def searxng_results(self, query: str) -> dict:
+        results = [
+            {'url': url, 'title': title, 'content': snippet, 'engine': 'fixture'}
+            for url, title, snippet in self._fixture_results(query)
+        ]
+        return {'query': query, 'results': results[::-1]}
+
+    def start(self):
+        for httpd in [self._httpd] + self._sites:
+            thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for httpd in [self._httpd] + self._sites:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+if __name__ == "__main__":
+    server = FakeSearchServer(port=8790).start()
+    print(f"Fake search engine running at {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,135 @@
+"""
+Offline benchmark for scrape_web_content against the local fake search engine.
+
+    cd server && python -m bench.run_bench --runs 3 --headless
+
+Reports latency for a cold run (fresh browser, empty caches), warm runs (pooled
+browser, caches bypassed) and a cached run, with per-page timing, bytes
+extracted and peak RSS of this process.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from bench.fake_search import FakeSearchServer, DEFAULT_PROFILE
+from tools import websearch
+from tools import http_fetch
+from tools import search_backends
+from tools.browser_pool import browser_pool
+from tools.search_cache import SearchCache
+from tools.content_cache import content_cache
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_once(label: str, query: str, use_cache: bool, max_results: int, time_budget: float) -> dict:
+    pages = []
+    start = time.perf_counter()
+
+    async def on_result(result, completed, total):
+        pages.append({
+            'url': result['url'],
+            'seconds': round(time.perf_counter() - start, 3),
+            'chars': result['content_length'],
+            'via': result.get('fetched_via', 'cache'),
+        })
+
+    result = await websearch.scrape_web_content(
+        query,
+        max_links=min(max_results * 2, 10),
+        use_cache=use_cache,
+        on_result=on_result,
+        target_results=max_results,
+        deadline=time_budget
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        'label': label,
+        'seconds': round(elapsed, 3),
+        'results': result['total_results'],
+        'bytes_extracted': sum(len(r['content'].encode('utf-8')) for r in result['results']),
+        'first_page_seconds': pages[0]['seconds'] if pages else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'pages': pages,
+    }
+
+
+async def run_benchmark(args) -> list:
+    profile = DEFAULT_PROFILE
+    if args.profile:
+        profile = json.loads(Path(args.profile).read_text())
+
+    server = FakeSearchServer(profile=profile).start()
+    websearch.DUCKDUCKGO_URL = server.url
+    search_backends.DUCKDUCKGO_HTML_URL = server.url + 'html/'
+    search_backends.SEARXNG_URL = server.url if args.searxng else None
+    browser_pool.headless = args.headless
+
+    with tempfile.TemporaryDirectory() as tmp:
+        websearch.search_cache = SearchCache(path=str(Path(tmp) / 'bench_cache.db'))
+        runs = []
+        try:
+            # Cold: no browser, no learned fetch tiers, nothing cached
+            await browser_pool.close()
+            http_fetch.domain_tiers.clear()
+            runs.append(await run_once('cold', args.query, False, args.max_results, args.time_budget))
+
+            for i in range(args.runs):
+                runs.append(await run_once(f'warm-{i + 1}', args.query, False, args.max_results, args.time_budget))
+
+            # Cached: SERP and page content served from the caches filled above
+            await run_once('fill', args.query, True, args.max_results, args.time_budget)
+            runs.append(await run_once('cached', args.query, True, args.max_results, args.time_budget))
+        finally:
+            await browser_pool.close()
+            content_cache.__init__(content_cache.max_bytes)
+            server.stop()
+    return runs
+
+
+def print_report(runs: list):
+    print(f"\n{'run':<10} {'seconds':>8} {'first':>8} {'results':>8} {'bytes':>10} {'rss MB':>8}")
+    print("-" * 58)
+    for run in runs:
+        first = f"{run['first_page_seconds']:.3f}" if run['first_page_seconds'] is not None else '-'
+        print(f"{run['label']:<10} {run['seconds']:>8.3f} {first:>8} {run['results']:>8} {run['bytes_extracted']:>10} {run['peak_rss_mb']:>8.1f}")
+
+    warm = [run['seconds'] for run in runs if run['label'].startswith('warm')]
+    if warm:
+        print(f"\nwarm median {statistics.median(warm):.3f}s, best {min(warm):.3f}s")
+
+    print("\nper-page timing (last warm run):")
+    last_warm = [run for run in runs if run['label'].startswith('warm')][-1:]
+    for run in last_warm:
+        for page in run['pages']:
+            print(f"  {page['seconds']:>7.3f}s  {page['chars']:>8} chars  {page['via']:<8} {page['url']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline websearch benchmark")
+    parser.add_argument('--query', default='benchmark fixture query')
+    parser.add_argument('--runs', type=int, default=3, help='number of warm runs')
+    parser.add_argument('--max-results', type=int, default=5)
+    parser.add_argument('--time-budget', type=float, default=12.0)
+    parser.add_argument('--profile', help='JSON file with a list of {latency_ms, size_kb, js} fixture sites')
+    parser.add_argument('--headless', action='store_true', help='run Chromium headless')
+    parser.add_argument('--searxng', action='store_true', help='also fan out to the SearXNG-style stand-in')
+    parser.add_argument('--json', help='also write the raw results to this file')
+    args = parser.parse_args()
+
+    runs = asyncio.run(run_benchmark(args))
+    print_report(runs)
+    if args.json:
+        Path(args.json).write_text(json.dumps(runs, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,132 @@
-from fastmcp import FastMCP
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from fastmcp import FastMCP, Context
 from tools.execute_command import execute_command, execute_command_description
-from tools.websearch import scrape_web_content, websearch_description
+from tools.websearch import scrape_web_content, scrape_web_content_batch, websearch_description, websearch_batch_description
 from tools.code_execute import codeexecuter, codeexecuter_description
 from tools.browser_tool import browser_tool, browser_tool_description
-from tools.url_scrape import scrape_url, scrape_url_description
+from tools.url_scrape import scrape_url, scrape_urls, scrape_url_description, scrape_urls_description
 from tools.memory_tool import memoryaccesstool, memory_tool_description
+from tools.extension_bridge import extension_bridge
+from tools.desktop_scheduler import desktop_scheduler
+from tools.browser_pool import browser_pool
+from tools.host_scheduler import host_scheduler
+from tools.search_cache import search_cache
+from tools.content_cache import content_cache
+from tools.hyprland_ipc import hyprland
+from tools.tab_index import tab_index
+from tools.readiness import readiness
+from tools.circuit_breaker import breakers_status
 
 mcp = FastMCP("MCP Server")
 
+# Bounded per-tool executors so blocking tools never stall the event loop,
+# and a slow call to one tool doesn't queue up calls to the others.
+# Single workers where the tool owns shared state: the Qt dialog thread
+# and the memory file. Anything driving the desktop (keystrokes/clipboard)
+# waits for the single seat in desktop_scheduler instead.
+executors = {
+    'execute_command': ThreadPoolExecutor(max_workers=1, thread_name_prefix='execute_command'),
+    'code_execute': ThreadPoolExecutor(max_workers=2, thread_name_prefix='code_execute'),
+    'browser_tool': ThreadPoolExecutor(max_workers=2, thread_name_prefix='browser_tool'),
+    'scrape_url': ThreadPoolExecutor(max_workers=4, thread_name_prefix='scrape_url'),
+    'memory_tool': ThreadPoolExecutor(max_workers=1, thread_name_prefix='memory_tool'),
+}
+
+async def run_blocking(tool: str, fn, *args, **kwargs):
+    """Run a blocking tool function on that tool's executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executors[tool], functools.partial(fn, *args, **kwargs))
+
+def result_streamer(ctx: Context, query, kind: str = 'websearch_result'):
+    """Callback pushing each scraped page to the client as soon as it is ready"""
+    async def stream_result(result, completed, total):
+        await ctx.report_progress(progress=completed, total=total)
+        await ctx.info(json.dumps({
+            'type': kind,
+            'query': query,
+            'completed': completed,
+            'total': total,
+            'result': result
+        }, ensure_ascii=False))
+    return stream_result
+
 @mcp.tool(description=execute_command_description)
-def execute_linux_command(command: str) -> str:
-    return execute_command(command)
+async def execute_linux_command(command: str) -> str:
+    return await run_blocking('execute_command', execute_command, command)
 
 @mcp.tool(description=websearch_description)
-def websearch(query: str) -> str:
-    return scrape_web_content(query, max_links=7, use_duckduckgo=True)
+async def websearch(query: str, ctx: Context, max_results: int = 5, time_budget: float = 12.0, focused: bool = False, bypass_cache: bool = False) -> dict:
+    # Over-issue scrapes so a few slow or empty pages don't hold up the result
+    max_results = max(1, min(max_results, 10))
+    return await scrape_web_content(
+        query,
+        max_links=min(max_results * 2, 10),
+        use_duckduckgo=True,
+        use_cache=not bypass_cache,
+        on_result=result_streamer(ctx, query),
+        target_results=max_results,
+        deadline=time_budget,
+        rank_passages=focused
+    )
+
+@mcp.tool(description=websearch_batch_description)
+async def websearch_batch(queries: list[str], ctx: Context, max_results: int = 4, time_budget: float = 15.0, focused: bool = False, bypass_cache: bool = False) -> dict:
+    max_results = max(1, min(max_results, 10))
+    return await scrape_web_content_batch(
+        queries,
+        max_links=min(max_results + 2, 10),
+        use_cache=not bypass_cache,
+        on_result=result_streamer(ctx, queries),
+        target_results=max_results,
+        deadline=time_budget,
+        rank_passages=focused
+    )
 
 @mcp.tool(description=codeexecuter_description)
-def code_execute(code: str) -> str:
-    return codeexecuter(code)
+async def code_execute(code: str) -> str:
+    return await run_blocking('code_execute', codeexecuter, code)
 
 @mcp.tool(description=browser_tool_description)
-def browser_tab_tool(execute : str) -> str:
-    return browser_tool(execute=execute)
+async def browser_tab_tool(execute : str) -> str:
+    return await run_blocking('browser_tool', browser_tool, execute=execute)
 
 @mcp.tool(description=scrape_url_description)
-def scrape_url_content(url: str) -> str:
-    return scrape_url(url)
+async def scrape_url_content(url: str, bypass_cache: bool = False) -> str:
+    return await run_blocking('scrape_url', scrape_url, url, bypass_cache=bypass_cache)
+
+@mcp.tool(name="scrape_urls", description=scrape_urls_description)
+async def scrape_urls_content(urls: list[str], ctx: Context, bypass_cache: bool = False) -> dict:
+    return await scrape_urls(
+        urls[:20],
+        bypass_cache=bypass_cache,
+        max_parallel=4,
+        on_result=result_streamer(ctx, urls, kind='scrape_result'),
+        executor=executors['scrape_url']
+    )
 
 @mcp.tool(description=memory_tool_description)
-def memory_access_tool(operation: str, memory: str = None, memory_id: int = None) -> str:
-    return memoryaccesstool(operation, memory, memory_id)
+async def memory_access_tool(operation: str, memory: str = None, memory_id: int = None) -> str:
+    return await run_blocking('memory_tool', memoryaccesstool, operation, memory, memory_id)
+
+@mcp.resource("status://server", description="Live state of the server's shared resources: browser pool, caches, host politeness, desktop queue, Hyprland IPC, extension bridge, tab index, learned page readiness and dependency circuit breakers")
+def server_status() -> dict:
+    return {
+        'browser_pool': browser_pool.status(),
+        'search_cache': search_cache.stats(),
+        'content_cache': content_cache.stats(),
+        'hosts': host_scheduler.status(),
+        'desktop_queue': desktop_scheduler.status(),
+        'hyprland': hyprland.status(),
+        'extension_bridge': extension_bridge.status(),
+        'tab_index': tab_index.status(),
+        'readiness': readiness.status(),
+        'breakers': breakers_status()
+    }
 
 if __name__ == "__main__":
+    # Let the browser extension connect before the first tool call needs it
+    extension_bridge.start()
     mcp.run(transport="streamable-http", host="127.0.0.1", port=8000, path="/mcp")
\ No newline at end of file
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from tools import browser_pool
+from tools.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    def on(self, event, callback):
+        pass
+
+    async def add_init_script(self, script):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        return FakeContext()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = self
+        self.launched = []
+
+    async def launch(self, **options):
+        self.launched.append(FakeBrowser())
+        return self.launched[-1]
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    fake = FakePlaywright()
+
+    class Starter:
+        async def start(self):
+            return fake
+
+    monkeypatch.setattr(browser_pool, 'async_playwright', lambda: Starter())
+    return fake
+
+
+def test_contexts_are_reused_and_recycled(playwright):
+    async def scenario():
+        pool = BrowserPool(max_uses_per_context=2)
+        seen = []
+        for _ in range(3):
+            async with pool.context() as context:
+                seen.append(context)
+        pool._idle_task.cancel()
+        return pool, seen
+
+    pool, seen = asyncio.run(scenario())
+    assert seen[0] is seen[1]
+    assert seen[2] is not seen[0]
+    assert seen[0].closed
+    assert pool.stats['launches'] == 1
+    assert pool.stats['contexts_created'] == 2
+    assert pool._in_use == 0
+
+
+def test_failed_borrow_is_not_counted(playwright, monkeypatch):
+    async def scenario():
+        pool = BrowserPool()
+
+        async def broken(browser):
+            raise RuntimeError('context failed')
+
+        monkeypatch.setattr(pool, '_new_context', broken)
+        with pytest.raises(RuntimeError):
+            await pool.acquire()
+        pool._idle_task.cancel()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert pool._in_use == 0
+    assert pool._slots._value == pool.max_contexts
+
+
+def test_idle_watcher_keeps_watching_when_a_borrow_starts_during_its_check(playwright):
+    async def scenario():
+        pool = BrowserPool(idle_timeout=0.0)
+        async with pool.context():
+            pass
+        pool._idle_task.cancel()
+
+        # The watcher decides to shut down and waits for the lock ...
+        await pool._lock.acquire()
+        watcher = asyncio.create_task(pool._idle_watcher())
+        await asyncio.sleep(1.1)
+        # ... while a borrow starts and queues behind it
+        borrow = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        pool._lock.release()
+        entry = await borrow
+        assert not watcher.done()
+        assert pool.stats['idle_shutdowns'] == 0
+        assert pool._browser.is_connected()
+
+        # Once the borrow is back the next check does shut down
+        await pool.release(entry)
+        await asyncio.wait_for(watcher, 3)
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert pool.stats['idle_shutdowns'] == 1
+    assert pool._browser is None
+    assert len(playwright.launched) == 1
@@ -0,0 +1,38 @@
+import subprocess
+
+import pytest
+
+from tools import browser_tool
+from tools.circuit_breaker import CircuitOpen
+
+
+@pytest.fixture
+def keystroke_path(monkeypatch):
+    monkeypatch.setattr(browser_tool.tab_index, 'ready', False)
+    monkeypatch.setattr(type(browser_tool.extension_bridge), 'connected', property(lambda self: False))
+    monkeypatch.setattr(browser_tool, 'ensure_available', lambda *names: None)
+    monkeypatch.setattr(browser_tool, 'require_zen_window', lambda: {'workspace_id': 2, 'workspace_name': '2'})
+    monkeypatch.setattr(browser_tool, 'current_workspace', lambda: {'id': 1, 'name': '1', 'is_special': False})
+    return monkeypatch
+
+
+@pytest.mark.parametrize('error, message', [
+    (CircuitOpen('hyprland is unavailable (gone), retrying in 15s'), 'hyprland is unavailable'),
+    (subprocess.CalledProcessError(1, ['hyprctl']), 'Could not list tabs through the desktop'),
+])
+def test_hyprland_failures_come_back_as_messages(keystroke_path, error, message):
+    def dispatch(*commands):
+        raise error
+
+    keystroke_path.setattr(browser_tool.hyprland, 'dispatch', dispatch)
+    assert message in browser_tool.browser_tool('y')
+
+
+def test_missing_zen_window_is_reported(keystroke_path):
+    from tools.hyprland_ipc import ZenWindowMissing
+
+    def missing():
+        raise ZenWindowMissing('No Zen browser window found')
+
+    keystroke_path.setattr(browser_tool, 'require_zen_window', missing)
+    assert browser_tool.browser_tool('y') == 'No Zen browser window found'
@@ -0,0 +1,142 @@
+import pytest
+
+from tools import circuit_breaker
+from tools.circuit_breaker import CircuitBreaker, CircuitOpen, CLOSED, OPEN, HALF_OPEN
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def fail(cb, times=1, error='boom'):
+    for _ in range(times):
+        cb.allow()
+        cb.record_failure(error)
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    cb = CircuitBreaker('test', failure_threshold=3, cooldown=10.0)
+    fail(cb, 2)
+    assert cb.state == CLOSED
+    fail(cb)
+    assert cb.state == OPEN
+    assert cb.stats['opened'] == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    cb = CircuitBreaker('test', failure_threshold=3)
+    fail(cb, 2)
+    cb.record_success()
+    fail(cb, 2)
+    assert cb.state == CLOSED
+
+
+def test_open_breaker_rejects_with_the_last_error(clock):
+    cb = CircuitBreaker('test', failure_threshold=1, cooldown=10.0)
+    fail(cb, error='connection refused\nlong banner')
+    with pytest.raises(CircuitOpen, match='connection refused'):
+        cb.allow()
+    assert cb.last_error == 'connection refused'
+    assert cb.stats['rejected'] == 1
+    assert not cb.available()
+
+
+def test_half_open_lets_a_single_trial_through_after_cooldown(clock):
+    cb = CircuitBreaker('test', failure_threshold=1, cooldown=10.0)
+    fail(cb)
+    clock[0] += 10.0
+    assert cb.available()
+    cb.allow()
+    assert cb.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        cb.allow()
+
+
+def test_successful_trial_closes_the_breaker(clock):
+    cb = CircuitBreaker('test', failure_threshold=1, cooldown=10.0)
+    fail(cb)
+    clock[0] += 10.0
+    cb.allow()
+    cb.record_success()
+    assert cb.state == CLOSED
+    assert cb.failures == 0
+    cb.allow()
+
+
+def test_failed_trial_reopens_with_doubled_cooldown(clock):
+    cb = CircuitBreaker('test', failure_threshold=1, cooldown=10.0, max_cooldown=15.0)
+    fail(cb)
+    clock[0] += 10.0
+    fail(cb)
+    assert cb.state == OPEN
+    assert cb.cooldown == 15.0
+    clock[0] += 10.0
+    assert not cb.available()
+    clock[0] += 5.0
+    assert cb.available()
+
+
+def test_fatal_failure_opens_straight_away(clock):
+    cb = CircuitBreaker('test', failure_threshold=5)
+    cb.record_failure('not installed', fatal=True)
+    assert cb.state == OPEN
+
+
+def test_release_frees_the_half_open_trial(clock):
+    cb = CircuitBreaker('test', failure_threshold=1, cooldown=10.0)
+    fail(cb)
+    clock[0] += 10.0
+    cb.allow()
+    cb.release()
+    cb.allow()
+    assert cb.state == HALF_OPEN
+
+
+def test_context_manager_records_outcomes(clock):
+    cb = CircuitBreaker('test', failure_threshold=1)
+    with cb:
+        pass
+    assert cb.state == CLOSED
+    with pytest.raises(ValueError):
+        with cb:
+            raise ValueError('bad')
+    assert cb.state == OPEN
+
+
+def test_check_counts_rejections_without_claiming_the_trial(clock):
+    cb = CircuitBreaker('test', failure_threshold=1, cooldown=10.0)
+    cb.check()
+    fail(cb)
+    with pytest.raises(CircuitOpen):
+        cb.check()
+    assert cb.stats['rejected'] == 1
+    clock[0] += 10.0
+    cb.check()
+    cb.allow()
+    assert cb.state == HALF_OPEN
+
+
+def test_ensure_available_raises_for_the_first_open_breaker(monkeypatch, clock):
+    monkeypatch.setattr(circuit_breaker, 'breakers', {
+        'up': CircuitBreaker('up'),
+        'down': CircuitBreaker('down', failure_threshold=1),
+    })
+    circuit_breaker.breakers['down'].record_failure('gone')
+    circuit_breaker.ensure_available('up')
+    with pytest.raises(CircuitOpen, match='down'):
+        circuit_breaker.ensure_available('up', 'down')
+
+
+def test_guarded_run_counts_missing_binaries_and_exit_codes(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, 'breakers', {'cli': CircuitBreaker('cli', failure_threshold=2)})
+    cb = circuit_breaker.breakers['cli']
+    circuit_breaker.guarded_run('cli', ['false'])
+    assert cb.failures == 1
+    circuit_breaker.guarded_run('cli', ['true'])
+    assert cb.failures == 0
+    with pytest.raises(CircuitOpen, match='not installed'):
+        circuit_breaker.guarded_run('cli', ['definitely-not-a-real-binary'])
+    assert cb.state == OPEN
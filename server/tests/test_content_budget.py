@@ -0,0 +1,64 @@
+import asyncio
+
+from tools import content_budget
+from tools.content_budget import ContentBudget, PeakMemory
+
+
+def test_take_keeps_text_within_allowance():
+    budget = ContentBudget(per_page=100, total=1000)
+    assert budget.take('x' * 40) == 'x' * 40
+    assert budget.used == 40
+    assert budget.truncated == 0
+    assert budget.allowance() == 100
+
+
+def test_take_cuts_to_per_page_cap():
+    budget = ContentBudget(per_page=100, total=1000)
+    assert len(budget.take('x' * 250)) == 100
+    assert budget.truncated == 1
+
+
+def test_take_cuts_to_what_is_left_of_the_call():
+    budget = ContentBudget(per_page=100, total=150)
+    budget.take('x' * 100)
+    assert budget.allowance() == 50
+    assert len(budget.take('y' * 100)) == 50
+    assert budget.exhausted
+    assert budget.allowance() == 0
+    assert budget.take('z' * 10) == ''
+
+
+def test_text_already_cut_to_the_allowance_counts_as_truncated():
+    budget = ContentBudget(per_page=100, total=1000)
+    budget.take('x' * 100)
+    assert budget.truncated == 1
+
+
+def test_report():
+    budget = ContentBudget(per_page=100, total=150)
+    budget.take('x' * 120)
+    budget.take('y' * 80)
+    budget.skip()
+    assert budget.report() == {
+        'content_chars': 150,
+        'budget_chars': 150,
+        'page_budget_chars': 100,
+        'pages_truncated': 2,
+        'pages_skipped': 1
+    }
+
+
+def test_peak_memory_reports_process_wide_rss(monkeypatch):
+    samples = iter([100, 150, 130, 120] + [110] * 100)
+    monkeypatch.setattr(content_budget, 'current_rss', lambda: next(samples) * 1024 * 1024)
+
+    async def call():
+        async with PeakMemory(interval=0.001) as memory:
+            await asyncio.sleep(0.02)
+        return memory
+
+    assert asyncio.run(call()).report() == {
+        'process_rss_start_mb': 100.0,
+        'process_rss_peak_mb': 150.0,
+        'process_rss_growth_mb': 50.0
+    }
@@ -0,0 +1,46 @@
+from tools.content_cache import cache_key, ttl_for, ContentCache, DEFAULT_TTL
+
+
+def test_cache_key_ignores_protocol_www_fragment_and_trailing_slash():
+    assert cache_key('https://www.Example.com/docs/#intro') == 'example.com/docs'
+    assert cache_key('http://example.com/docs') == 'example.com/docs'
+    assert cache_key('https://example.com') == 'example.com/'
+
+
+def test_cache_key_sorts_query_params():
+    assert cache_key('https://example.com/s?b=2&a=1') == cache_key('https://example.com/s?a=1&b=2')
+
+
+def test_cache_key_drops_tracking_params():
+    url = 'https://example.com/post?id=7&utm_source=x&UTM_Medium=y&fbclid=abc&ref=hn&ref_src=tw&ref_url=z'
+    assert cache_key(url) == 'example.com/post?id=7'
+
+
+def test_cache_key_keeps_params_that_only_look_like_tracking():
+    assert cache_key('https://example.com/s?refine=1&region=us&q=x') == 'example.com/s?q=x&refine=1&region=us'
+    assert cache_key('https://example.com/s?referrer=a&gclid_extra=b') == 'example.com/s?gclid_extra=b&referrer=a'
+
+
+def test_ttl_for_matches_parent_domains():
+    assert ttl_for('https://en.wikipedia.org/wiki/Python') == 7 * 24 * 3600
+    assert ttl_for('https://old.reddit.com/r/linux') == 900
+    assert ttl_for('https://unknown.example/') == DEFAULT_TTL
+
+
+def test_content_cache_round_trip_on_normalized_url():
+    cache = ContentCache()
+    cache.put('https://www.example.com/page/?utm_source=x', 'Title', 'body text')
+    cached = cache.get('http://example.com/page')
+    assert cached['title'] == 'Title'
+    assert cached['content'] == 'body text'
+
+
+def test_content_cache_evicts_least_recently_used():
+    cache = ContentCache(max_bytes=10)
+    cache.put('https://example.com/a', 'A', 'aaaa')
+    cache.put('https://example.com/b', 'B', 'bbbb')
+    cache.get('https://example.com/a')
+    cache.put('https://example.com/c', 'C', 'cccc')
+    assert cache.get('https://example.com/b') is None
+    assert cache.get('https://example.com/a')['content'] == 'aaaa'
+    assert cache.get('https://example.com/c')['content'] == 'cccc'
@@ -0,0 +1,78 @@
+import random
+
+from tools.dedup import simhash, hamming, dedupe_results
+
+WORDS = ('kernel scheduler memory page cache thread lock socket buffer queue driver module '
+         'signal process file inode mount device network packet filter table route').split()
+
+
+def paragraph(seed: int, words: int = 40) -> str:
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def page(*seeds: int) -> str:
+    return '\n\n'.join(paragraph(seed) for seed in seeds)
+
+
+def test_simhash_is_stable_and_close_for_near_duplicates():
+    text = page(1, 2, 3, 4, 5, 6)
+    assert simhash(text) == simhash(text)
+    assert hamming(simhash(text), simhash(text + ' Copyright.')) <= 3
+    assert hamming(simhash(text), simhash(page(7, 8, 9, 10, 11, 12))) > 3
+
+
+def test_simhash_of_empty_text_is_zero():
+    assert simhash('') == 0
+
+
+def test_mirrored_page_is_dropped_and_listed_under_the_original():
+    original = {'url': 'https://a.example/post', 'content': page(1, 2, 3, 4, 5, 6)}
+    mirror = {'url': 'https://mirror.example/post', 'content': original['content'] + ' Mirrored.'}
+    other = {'url': 'https://b.example', 'content': page(7, 8, 9, 10, 11, 12)}
+
+    results, report = dedupe_results([original, mirror, other])
+
+    assert [result['url'] for result in results] == ['https://a.example/post', 'https://b.example']
+    assert results[0]['mirrors'] == ['https://mirror.example/post']
+    assert report[0]['type'] == 'page'
+    assert report[0]['duplicate_of'] == 'https://a.example/post'
+
+
+def test_repeated_passages_are_removed_from_later_results():
+    first = {'url': 'https://a.example', 'content': page(1, 2, 3)}
+    second = {'url': 'https://b.example', 'content': page(2, 20, 21, 22)}
+
+    results, report = dedupe_results([first, second])
+
+    assert results[1]['content'] == page(20, 21, 22)
+    assert results[1]['content_length'] == len(page(20, 21, 22))
+    assert report == [{'type': 'passages', 'url': 'https://b.example', 'chars_removed': len(paragraph(2))}]
+
+
+def test_page_left_with_only_repeated_passages_is_dropped():
+    first = {'url': 'https://a.example', 'content': page(1, 2, 3, 4)}
+    second = {'url': 'https://b.example', 'content': page(3, 4) + '\n\nShort note.'}
+
+    results, report = dedupe_results([first, second])
+
+    assert [result['url'] for result in results] == ['https://a.example']
+    assert report[-1]['type'] == 'page'
+
+
+def test_short_paragraphs_are_never_deduplicated():
+    first = {'url': 'https://a.example', 'content': 'Read more.\n\n' + page(1, 2)}
+    second = {'url': 'https://b.example', 'content': 'Read more.\n\n' + page(3, 4)}
+
+    results, report = dedupe_results([first, second])
+
+    assert results[1]['content'].startswith('Read more.')
+    assert report == []
+
+
+def test_input_results_are_not_modified():
+    first = {'url': 'https://a.example', 'content': page(1, 2, 3)}
+    second = {'url': 'https://b.example', 'content': page(2, 20, 21)}
+    content = second['content']
+    dedupe_results([first, second])
+    assert second['content'] == content
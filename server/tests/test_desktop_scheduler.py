@@ -0,0 +1,195 @@
+import threading
+import time
+
+import pytest
+
+from tools.desktop_scheduler import DesktopScheduler, DesktopTimeout, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the scheduler"
+        time.sleep(0.005)
+
+
+class Seat:
+    """Keeps the scheduler's worker busy inside a job until released"""
+
+    def __init__(self, scheduler):
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.thread = threading.Thread(target=scheduler.run, args=('blocker', self._block))
+        self.thread.start()
+        assert self.started.wait(2)
+
+    def _block(self):
+        self.started.set()
+        self.gate.wait(5)
+        return 'blocker'
+
+    def release(self):
+        self.gate.set()
+        self.thread.join(2)
+
+
+def submit(scheduler, results, name, fn, **kwargs):
+    """Call scheduler.run from its own thread and wait until the job is queued or joined"""
+    status = scheduler.status()
+    seen = status['queue_depth'] + status['coalesced']
+
+    def target():
+        try:
+            results[name] = scheduler.run(name, fn, **kwargs)
+        except Exception as e:
+            results[name] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    wait_for(lambda: scheduler.status()['queue_depth'] + scheduler.status()['coalesced'] > seen)
+    return thread
+
+
+@pytest.fixture
+def scheduler():
+    return DesktopScheduler(default_timeout=5.0)
+
+
+def test_runs_highest_priority_first_and_fifo_within_a_priority(scheduler):
+    order = []
+    results = {}
+    seat = Seat(scheduler)
+    threads = [
+        submit(scheduler, results, name, lambda name=name: order.append(name), priority=priority)
+        for name, priority in [('low', PRIORITY_LOW), ('normal-1', PRIORITY_NORMAL),
+                               ('high', PRIORITY_HIGH), ('normal-2', PRIORITY_NORMAL)]
+    ]
+    assert scheduler.status()['queue_depth'] == 4
+    assert scheduler.status()['running'] == 'blocker'
+
+    seat.release()
+    for thread in threads:
+        thread.join(2)
+    assert order == ['high', 'normal-1', 'normal-2', 'low']
+    assert scheduler.status()['jobs'] == 5
+
+
+def test_same_key_jobs_share_one_run(scheduler):
+    calls = []
+    results = {}
+
+    def job():
+        calls.append(1)
+        return 'screenshot'
+
+    seat = Seat(scheduler)
+    first = submit(scheduler, results, 'first', job, key='shot')
+    second = submit(scheduler, results, 'second', job, key='shot')
+    other = submit(scheduler, results, 'other', job, key='other')
+    assert scheduler.status()['queue_depth'] == 2
+    assert scheduler.status()['coalesced'] == 1
+
+    seat.release()
+    for thread in (first, second, other):
+        thread.join(2)
+    assert results == {'first': 'screenshot', 'second': 'screenshot', 'other': 'screenshot'}
+    assert len(calls) == 2
+
+
+def test_a_job_can_join_one_that_is_already_running(scheduler):
+    gate = threading.Event()
+    started = threading.Event()
+    calls = []
+    results = {}
+
+    def job():
+        calls.append(1)
+        started.set()
+        gate.wait(5)
+        return 'done'
+
+    first = threading.Thread(target=lambda: results.setdefault('first', scheduler.run('first', job, key='k')))
+    first.start()
+    assert started.wait(2)
+    second = submit(scheduler, results, 'second', job, key='k')
+    gate.set()
+    first.join(2)
+    second.join(2)
+    assert results == {'first': 'done', 'second': 'done'}
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_waiter(scheduler):
+    results = {}
+
+    def job():
+        raise RuntimeError('wtype missing')
+
+    seat = Seat(scheduler)
+    threads = [submit(scheduler, results, name, job, key='type') for name in ('a', 'b')]
+    seat.release()
+    for thread in threads:
+        thread.join(2)
+    assert all(isinstance(results[name], RuntimeError) for name in ('a', 'b'))
+    assert scheduler.status()['errors'] == 1
+
+
+def test_a_timed_out_job_is_dropped_before_it_runs(scheduler):
+    calls = []
+    seat = Seat(scheduler)
+
+    with pytest.raises(DesktopTimeout, match='stale did not get through'):
+        scheduler.run('stale', lambda: calls.append('stale'), key='k', timeout=0.05)
+    assert scheduler.status()['queue_depth'] == 0
+    assert scheduler.status()['timeouts'] == 1
+
+    # The key is free again, a new caller gets a fresh job rather than the cancelled one
+    results = {}
+    fresh = submit(scheduler, results, 'fresh', lambda: calls.append('fresh') or 'ok', key='k')
+    seat.release()
+    fresh.join(2)
+    assert results['fresh'] == 'ok'
+    assert calls == ['fresh']
+
+
+def test_a_timed_out_job_still_runs_for_the_remaining_waiters(scheduler):
+    calls = []
+    results = {}
+    seat = Seat(scheduler)
+    patient = submit(scheduler, results, 'patient', lambda: calls.append(1) or 'ok', key='k')
+
+    with pytest.raises(DesktopTimeout):
+        scheduler.run('impatient', lambda: calls.append(1), key='k', timeout=0.05)
+
+    seat.release()
+    patient.join(2)
+    assert results['patient'] == 'ok'
+    assert calls == [1]
+
+
+def test_coalesce_shares_an_in_flight_call(scheduler):
+    gate = threading.Event()
+    started = threading.Event()
+    calls = []
+    results = {}
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        gate.wait(5)
+        return 'page'
+
+    owner = threading.Thread(target=lambda: results.setdefault('owner', scheduler.coalesce('url', fetch)))
+    owner.start()
+    assert started.wait(2)
+    follower = threading.Thread(target=lambda: results.setdefault('follower', scheduler.coalesce('url', fetch)))
+    follower.start()
+    wait_for(lambda: scheduler.status()['coalesced'] == 1)
+    gate.set()
+    owner.join(2)
+    follower.join(2)
+
+    assert results == {'owner': 'page', 'follower': 'page'}
+    assert len(calls) == 1
+    assert scheduler.status()['shared_in_flight'] == 0
+    assert scheduler.coalesce('url', lambda: 'again') == 'again'
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+from tools import doc_fetch
+from tools.doc_fetch import DocumentReader, document_kind, needs_peek, url_looks_like_document
+
+
+@pytest.mark.parametrize('content_type, kind', [
+    ('application/pdf', 'pdf'),
+    ('application/json; charset=utf-8', 'json'),
+    ('application/vnd.api+json', 'json'),
+    ('text/plain; charset=latin-1', 'text'),
+    ('text/markdown', 'text'),
+    ('text/html; charset=utf-8', None),
+    ('image/png', None),
+])
+def test_document_kind_from_content_type(content_type, kind):
+    assert document_kind(content_type, 'https://example.com/download') == kind
+
+
+def test_generic_types_fall_back_to_the_file_name():
+    assert document_kind('application/octet-stream', 'https://example.com/files/Report.PDF') == 'pdf'
+    assert document_kind('', 'https://example.com/data.json?v=2') == 'json'
+    assert document_kind('binary/octet-stream', 'https://example.com/README.md') == 'text'
+    assert document_kind('application/octet-stream', 'https://example.com/setup.exe') is None
+
+
+def test_pdf_magic_wins_over_the_label():
+    assert document_kind('application/octet-stream', 'https://example.com/get?id=7', b'%PDF-1.7\n') == 'pdf'
+    assert document_kind('application/octet-stream', 'https://example.com/get?id=7', b'PK\x03\x04') is None
+    # A specific content type is trusted without a peek, but the magic still counts
+    assert document_kind('text/plain', 'https://example.com/a', b'%PDF-1.4') == 'pdf'
+
+
+def test_only_generic_types_need_a_peek():
+    assert needs_peek('application/octet-stream')
+    assert needs_peek('')
+    assert needs_peek('Binary/Octet-Stream; name=x')
+    assert not needs_peek('application/pdf')
+    assert not needs_peek('text/html')
+
+
+def test_url_looks_like_document():
+    assert url_looks_like_document('https://arxiv.org/pdf/2401.00001.pdf')
+    assert url_looks_like_document('https://example.com/notes.MD#intro')
+    assert not url_looks_like_document('https://example.com/pdf')
+    assert not url_looks_like_document('https://example.com/page.html?file=a.pdf')
+
+
+def test_reader_stops_at_the_byte_cap(monkeypatch):
+    monkeypatch.setattr(doc_fetch, 'MAX_TEXT_BYTES', 10)
+    reader = DocumentReader('https://example.com/a.txt', 'text')
+    assert reader.feed(b'hello ')
+    assert not reader.feed(b'world and more')
+    assert reader.truncated
+    assert reader.size == 10
+    result = reader.extract()
+    assert result['content'] == 'hello worl'
+    assert result['bytes'] == 10
+    assert result['truncated'] is True
+
+
+def test_reader_decodes_characters_split_across_chunks():
+    data = 'naïve café — 日本語'.encode('utf-8')
+    reader = DocumentReader('https://example.com/a.txt', 'text', 'utf-8')
+    # One byte at a time splits every multi-byte character
+    for i in range(len(data)):
+        assert reader.feed(data[i:i + 1])
+    assert reader.extract()['content'] == 'naïve café — 日本語'
+
+
+def test_reader_uses_the_response_charset_and_survives_unknown_ones():
+    reader = DocumentReader('https://example.com/a.txt', 'text', 'latin-1')
+    reader.feed('déjà vu'.encode('latin-1'))
+    assert reader.extract()['content'] == 'déjà vu'
+
+    reader = DocumentReader('https://example.com/a.txt', 'text', 'no-such-codec')
+    reader.feed('ok ✓'.encode('utf-8'))
+    assert reader.extract()['content'] == 'ok ✓'
+
+
+def test_json_is_pretty_printed_unless_truncated(monkeypatch):
+    reader = DocumentReader('https://example.com/api/data.json', 'json')
+    reader.feed(json.dumps({'name': 'mcp', 'tags': ['a', 'b']}).encode())
+    result = asyncio.run(reader.aextract())
+    assert result['content'] == '{\n "name": "mcp",\n "tags": [\n  "a",\n  "b"\n ]\n}'
+    assert result['title'] == 'data.json'
+    assert result['kind'] == 'json'
+
+    monkeypatch.setattr(doc_fetch, 'MAX_TEXT_BYTES', 8)
+    reader = DocumentReader('https://example.com/api/data.json', 'json')
+    reader.feed(b'{"name": "mcp"}')
+    assert reader.extract()['content'] == '{"name":'
+
+
+def test_truncated_pdfs_are_refused(monkeypatch):
+    monkeypatch.setattr(doc_fetch, 'MAX_PDF_BYTES', 4)
+    reader = DocumentReader('https://example.com/a.pdf', 'pdf')
+    assert not reader.feed(b'%PDF-1.7')
+    with pytest.raises(ValueError, match='larger than'):
+        reader.extract()
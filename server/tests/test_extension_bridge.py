@@ -0,0 +1,260 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from tools.extension_bridge import ExtensionBridge, BridgeError
+
+
+class FakeExtension:
+    """
+    Stands in for the extension's end of the websocket.
+
+    `answer(request)` returns the frames sent back for each request, push()
+    delivers frames nobody asked for, close() ends the connection.
+    """
+
+    def __init__(self, answer=None, origin='moz-extension://1234'):
+        self.request = SimpleNamespace(headers={'Origin': origin} if origin else {})
+        self.answer = answer or (lambda request: [])
+        self.sent = []
+        self.closed = None
+        self._inbox = asyncio.Queue()
+
+    async def send(self, text):
+        request = json.loads(text)
+        self.sent.append(request)
+        for frame in self.answer(request):
+            self.push(frame)
+
+    def push(self, frame):
+        self._inbox.put_nowait(frame if isinstance(frame, str) else json.dumps(frame))
+
+    async def close(self, code=1000, reason=''):
+        self.closed = (code, reason)
+        self._inbox.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self._inbox.get()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+
+def ack(request):
+    return {'id': request['id'], 'type': 'ack'}
+
+
+def result(request, data=None, ok=True, error=None):
+    return {'id': request['id'], 'type': 'result', 'ok': ok, 'data': data, 'error': error}
+
+
+async def connect(bridge, extension):
+    task = asyncio.create_task(bridge._handle(extension))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_request_returns_the_result_data():
+    bridge = ExtensionBridge(ack_timeout=0.5)
+
+    async def scenario():
+        extension = FakeExtension(lambda request: [ack(request), result(request, {'tabs': [1, 2]})])
+        await connect(bridge, extension)
+        data = await bridge._request('list_tabs', {'window': 3}, timeout=1.0)
+        assert extension.sent == [{'id': 1, 'action': 'list_tabs', 'params': {'window': 3}}]
+        await extension.close()
+        return data
+
+    assert asyncio.run(scenario()) == {'tabs': [1, 2]}
+    assert bridge.status()['requests'] == 1
+    assert bridge.status()['pending'] == 0
+
+
+def test_error_replies_raise_bridge_error():
+    bridge = ExtensionBridge(ack_timeout=0.5)
+
+    async def scenario():
+        extension = FakeExtension(lambda request: [ack(request), result(request, ok=False, error='No tab 9')])
+        await connect(bridge, extension)
+        with pytest.raises(BridgeError, match='No tab 9'):
+            await bridge._request('activate_tab', {'tab_id': 9}, timeout=1.0)
+        await extension.close()
+
+    asyncio.run(scenario())
+    assert bridge.stats['errors'] == 1
+
+
+def test_a_missing_ack_fails_fast():
+    bridge = ExtensionBridge(ack_timeout=0.05)
+
+    async def scenario():
+        extension = FakeExtension()
+        await connect(bridge, extension)
+        with pytest.raises(BridgeError, match='did not acknowledge list_tabs'):
+            await bridge._request('list_tabs', {}, timeout=5.0)
+        await extension.close()
+
+    asyncio.run(scenario())
+    assert bridge.status()['pending'] == 0
+
+
+def test_an_acknowledged_request_times_out_on_the_result():
+    bridge = ExtensionBridge(ack_timeout=0.5)
+
+    async def scenario():
+        extension = FakeExtension(lambda request: [ack(request)])
+        await connect(bridge, extension)
+        with pytest.raises(BridgeError, match='scrape timed out'):
+            await bridge._request('scrape', {}, timeout=0.05)
+        await extension.close()
+
+    asyncio.run(scenario())
+    assert bridge.stats['timeouts'] == 1
+
+
+def test_disconnect_fails_pending_requests_and_emits_an_event():
+    bridge = ExtensionBridge(ack_timeout=0.5)
+    events = []
+    bridge.add_event_handler(events.append)
+
+    async def scenario():
+        extension = FakeExtension(lambda request: [ack(request)])
+        await connect(bridge, extension)
+        request = asyncio.create_task(bridge._request('scrape', {}, timeout=5.0))
+        await asyncio.sleep(0.01)
+        await extension.close()
+        with pytest.raises(BridgeError, match='disconnected'):
+            await request
+
+    asyncio.run(scenario())
+    assert not bridge.connected
+    assert events == [{'type': 'event', 'event': 'bridge_disconnected'}]
+
+
+def test_rejects_connections_without_an_extension_origin():
+    bridge = ExtensionBridge()
+
+    async def scenario():
+        for origin in ('https://evil.example', None):
+            page = FakeExtension(origin=origin)
+            await bridge._handle(page)
+            assert page.closed == (1008, 'extension origin required')
+
+    asyncio.run(scenario())
+    assert not bridge.connected
+    assert bridge.stats['connections'] == 0
+
+
+def test_a_new_connection_replaces_the_old_one():
+    bridge = ExtensionBridge()
+
+    async def scenario():
+        old = FakeExtension()
+        await connect(bridge, old)
+        new = FakeExtension()
+        await connect(bridge, new)
+        assert old.closed == (1000, 'replaced by a newer connection')
+        assert bridge._connection is new
+        await new.close()
+
+    asyncio.run(scenario())
+    assert bridge.stats['connections'] == 2
+
+
+def test_events_reach_handlers_and_malformed_frames_are_ignored():
+    bridge = ExtensionBridge()
+    events = []
+    bridge.add_event_handler(events.append)
+    bridge.add_event_handler(lambda message: 1 / 0)
+
+    async def scenario():
+        extension = FakeExtension()
+        await connect(bridge, extension)
+        extension.push('not json')
+        extension.push({'type': 'event', 'event': 'tab_activated', 'tab_id': 4})
+        extension.push({'id': 999, 'type': 'result', 'ok': True})
+        await asyncio.sleep(0.01)
+        await extension.close()
+
+    asyncio.run(scenario())
+    assert events[0] == {'type': 'event', 'event': 'tab_activated', 'tab_id': 4}
+
+
+def chunked(request, content, size, order=None, drop=()):
+    pieces = [content[i:i + size] for i in range(0, len(content), size)]
+    frames = [ack(request)]
+    for index in order or range(len(pieces)):
+        if index not in drop:
+            frames.append({'id': request['id'], 'type': 'chunk', 'field': 'content', 'index': index, 'data': pieces[index]})
+    frames.append(result(request, {'title': 'Page', 'chunked_fields': ['content'], 'chunk_counts': {'content': len(pieces)}}))
+    return frames
+
+
+def scrape_with(answer):
+    bridge = ExtensionBridge(ack_timeout=0.5)
+
+    async def scenario():
+        extension = FakeExtension(answer)
+        await connect(bridge, extension)
+        try:
+            return await bridge._request('scrape', {}, timeout=1.0)
+        finally:
+            await extension.close()
+
+    return asyncio.run(scenario())
+
+
+def test_chunk_frames_are_joined_into_the_result():
+    content = 'abcdefghij' * 10
+    data = scrape_with(lambda request: chunked(request, content, 7))
+    assert data == {'title': 'Page', 'content': content}
+
+
+def test_out_of_order_chunks_are_joined_by_index():
+    content = 'abcdefghij' * 3
+    data = scrape_with(lambda request: chunked(request, content, 10, order=[2, 0, 1]))
+    assert data['content'] == content
+
+
+def test_missing_chunks_fail_the_request():
+    with pytest.raises(BridgeError, match='missing 1 of 3 chunks'):
+        scrape_with(lambda request: chunked(request, 'x' * 30, 10, drop={1}))
+
+
+def test_chunks_without_an_index_keep_arrival_order():
+    def answer(request):
+        return [
+            ack(request),
+            {'id': request['id'], 'type': 'chunk', 'field': 'content', 'data': 'first '},
+            {'id': request['id'], 'type': 'chunk', 'field': 'content', 'data': 'second'},
+            result(request, {'chunked_fields': ['content']}),
+        ]
+
+    assert scrape_with(answer) == {'content': 'first second'}
+
+
+def test_sync_request_goes_through_the_bridge_loop():
+    bridge = ExtensionBridge(ack_timeout=0.5)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    bridge._loop = loop
+
+    with pytest.raises(BridgeError, match='not connected'):
+        bridge.request('list_tabs')
+
+    extension = FakeExtension(lambda request: [ack(request), result(request, 'pong')])
+    asyncio.run_coroutine_threadsafe(connect(bridge, extension), loop).result(1)
+    try:
+        assert bridge.request('ping', timeout=1.0) == 'pong'
+        assert asyncio.run(bridge.arequest('ping', timeout=1.0)) == 'pong'
+    finally:
+        asyncio.run_coroutine_threadsafe(extension.close(), loop).result(1)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(1)
@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tools import host_scheduler as host_scheduler_module
+from tools.host_scheduler import HostScheduler, HostBlocked
+
+URL = 'https://www.example.com/page'
+
+
+class Clock:
+    """Stands in for time.monotonic/time.sleep/asyncio.sleep inside host_scheduler"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(host_scheduler_module, 'time', SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    monkeypatch.setattr(host_scheduler_module, 'asyncio', SimpleNamespace(sleep=clock.async_sleep))
+    return clock
+
+
+def take(scheduler, url=URL, **options):
+    with scheduler.slot_sync(url, **options) as slot:
+        return slot
+
+
+def test_host_of_ignores_www_and_case():
+    assert HostScheduler.host_of('https://WWW.Example.com/a') == 'example.com'
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    scheduler = HostScheduler(rate=2.0, burst=3, per_host_concurrency=10)
+    for _ in range(3):
+        take(scheduler)
+    assert clock.slept == 0
+    take(scheduler)
+    assert clock.slept == pytest.approx(0.5)
+    # Other hosts have their own bucket
+    take(scheduler, 'https://other.example/')
+    assert clock.slept == pytest.approx(0.5)
+
+
+def test_concurrency_cap_times_out_after_max_wait(clock):
+    scheduler = HostScheduler(per_host_concurrency=1, max_wait=0.5)
+    with scheduler.slot_sync(URL):
+        with pytest.raises(HostBlocked, match='Timed out waiting'):
+            take(scheduler)
+        assert clock.slept <= 0.5
+        # A caller may wait longer than the scheduler's default
+        with pytest.raises(HostBlocked):
+            take(scheduler, max_wait=5.0)
+        assert clock.slept == pytest.approx(5.0, abs=0.6)
+    take(scheduler)
+    assert scheduler.status()['example.com']['in_flight'] == 0
+
+
+def test_slot_is_released_when_the_fetch_raises(clock):
+    scheduler = HostScheduler(per_host_concurrency=1)
+    with pytest.raises(RuntimeError):
+        with scheduler.slot_sync(URL):
+            raise RuntimeError('fetch failed')
+    take(scheduler)
+    assert clock.slept == 0
+
+
+def test_throttling_backs_off_exponentially_and_success_resets_it(clock):
+    scheduler = HostScheduler(rate=100.0, max_wait=30.0)
+    take(scheduler).status(429)
+    take(scheduler).status(503)
+    assert clock.slept == pytest.approx(1.0)
+    take(scheduler).status(429)
+    assert clock.slept == pytest.approx(3.0)
+    assert scheduler.status()['example.com']['throttled'] == 3
+    take(scheduler).status(200)
+    take(scheduler).status(429)
+    assert scheduler.status()['example.com']['backoff_remaining'] == 1.0
+
+
+def test_retry_after_is_honored_and_long_backoffs_fail_fast(clock):
+    scheduler = HostScheduler(max_wait=10.0, max_backoff=120.0)
+    take(scheduler).status(429, '7')
+    take(scheduler)
+    assert clock.slept == pytest.approx(7.0)
+
+    take(scheduler).status(503, '60')
+    with pytest.raises(HostBlocked, match='rate limiting'):
+        take(scheduler)
+    # A bigger max_wait sits the backoff out instead
+    take(scheduler, max_wait=90.0)
+    assert clock.slept == pytest.approx(67.0)
+
+
+def test_repeated_timeouts_blacklist_the_host(clock):
+    scheduler = HostScheduler(blacklist_after=3, failure_window=60.0, blacklist_seconds=600.0)
+    take(scheduler).timed_out()
+    clock.now += 120.0
+    # The first timeout fell out of the window
+    take(scheduler).timed_out()
+    take(scheduler).timed_out()
+    take(scheduler)
+
+    take(scheduler).timed_out()
+    with pytest.raises(HostBlocked, match='blacklisted'):
+        take(scheduler)
+    clock.now += 600.0
+    take(scheduler)
+    assert scheduler.status()['example.com']['timeouts'] == 4
+
+
+def test_async_slot(clock):
+    scheduler = HostScheduler(rate=1.0, burst=1, per_host_concurrency=1, max_wait=0.5)
+
+    async def scenario():
+        async with scheduler.slot(URL) as slot:
+            slot.status(200)
+            with pytest.raises(HostBlocked):
+                async with scheduler.slot(URL):
+                    pass
+        async with scheduler.slot(URL, max_wait=2.0):
+            pass
+
+    asyncio.run(scenario())
+    assert scheduler.status()['example.com']['requests'] == 2
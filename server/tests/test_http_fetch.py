@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+import pytest
+
+from tools import http_fetch
+from tools.http_fetch import extract_html, looks_js_rendered, preferred_tier, record_tier, fetch_static, TIER_TTL
+
+ARTICLE = 'Useful sentence about the topic at hand. ' * 20
+
+
+def test_extract_html_drops_boilerplate_subtrees():
+    html = f"""
+    <html><head><title> My  Page </title><style>body {{ color: red }}</style></head>
+    <body>
+      <nav>Home | About</nav>
+      <div class="cookie banner">We use cookies</div>
+      <p>First paragraph.</p><script>var x = 1;</script>
+      <div aria-hidden="true">hidden text</div>
+      <p>Second<br>line &amp; more.</p>
+      <footer>Copyright</footer>
+    </body></html>
+    """
+    extracted = extract_html(html)
+    assert extracted['title'] == 'My Page'
+    content = extracted['content']
+    assert 'First paragraph.' in content
+    assert 'Second\nline & more.' in content
+    for noise in ('Home', 'cookies', 'var x', 'hidden text', 'Copyright', 'color: red'):
+        assert noise not in content
+
+
+def test_extract_html_prefers_a_substantial_article_or_main():
+    html = f"<body><p>Sidebar-ish intro</p><main><p>{ARTICLE}</p></main><p>Trailing links</p></body>"
+    content = extract_html(html)['content']
+    assert ARTICLE.strip() in content
+    assert 'Sidebar-ish intro' not in content
+    assert 'Trailing links' not in content
+
+
+def test_extract_html_keeps_the_whole_page_when_main_is_thin():
+    html = "<body><p>Intro text</p><article><p>Short</p></article><p>Outro text</p></body>"
+    content = extract_html(html)['content']
+    assert 'Intro text' in content and 'Short' in content and 'Outro text' in content
+
+
+def test_extract_html_tolerates_unclosed_tags():
+    content = extract_html('<div><p>one<span>two</div><p>three')['content']
+    assert 'one' in content and 'two' in content and 'three' in content
+
+
+def test_looks_js_rendered():
+    assert looks_js_rendered('<html></html>', 'tiny')
+    assert looks_js_rendered('<div id="root"></div>', 'x' * 500)
+    assert looks_js_rendered('<html></html>', 'Please enable JavaScript to continue. ' + 'x' * 200)
+    assert not looks_js_rendered('<div id="root"></div>', 'x' * 1500)
+    assert not looks_js_rendered('<p>article</p>', 'x' * 500)
+
+
+def test_preferred_tier_is_remembered_per_domain_until_it_expires(monkeypatch):
+    monkeypatch.setattr(http_fetch, 'domain_tiers', {})
+    assert preferred_tier('https://example.com/a') is None
+    record_tier('https://www.example.com/a', 'browser')
+    assert preferred_tier('https://example.com/other') == 'browser'
+    assert preferred_tier('https://other.example/') is None
+
+    now = http_fetch.time.time()
+    monkeypatch.setattr(http_fetch.time, 'time', lambda: now + TIER_TTL + 1)
+    assert preferred_tier('https://example.com/a') is None
+
+
+def serve(monkeypatch, handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_fetch, '_client', client)
+
+
+def test_fetch_static_flags_html_cut_at_the_byte_cap(monkeypatch):
+    body = f"<html><body><p>{ARTICLE * 10}</p></body></html>".encode()
+
+    async def chunks():
+        for start in range(0, len(body), 1000):
+            yield body[start:start + 1000]
+
+    serve(monkeypatch, lambda request: httpx.Response(200, headers={'content-type': 'text/html'}, content=chunks()))
+    monkeypatch.setattr(http_fetch, 'MAX_HTML_BYTES', 2000)
+
+    result = asyncio.run(fetch_static('https://cut.example/page'))
+    assert result['truncated'] is True
+    assert len(result['content']) < len(ARTICLE * 10)
+
+
+def test_fetch_static_whole_html_page(monkeypatch):
+    body = f"<html><head><title>T</title></head><body><p>{ARTICLE}</p></body></html>".encode()
+    serve(monkeypatch, lambda request: httpx.Response(200, headers={'content-type': 'text/html'}, content=body))
+
+    result = asyncio.run(fetch_static('https://whole.example/page'))
+    assert result['truncated'] is False
+    assert result['title'] == 'T'
+    assert result['content'].strip() == ARTICLE.strip()
+
+
+@pytest.mark.parametrize('status', [404, 500])
+def test_fetch_static_error_status(monkeypatch, status):
+    serve(monkeypatch, lambda request: httpx.Response(status, headers={'content-type': 'text/html'}, content=b'<p>x</p>'))
+    assert asyncio.run(fetch_static(f'https://status{status}.example/')) is None
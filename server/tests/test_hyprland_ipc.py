@@ -0,0 +1,154 @@
+import os
+import subprocess
+import time
+
+import pytest
+
+from tools.circuit_breaker import CircuitBreaker, breakers
+from tools.hyprland_ipc import HyprlandIPC, require_zen_window, ZenWindowMissing
+
+
+@pytest.fixture
+def fake_hyprctl(monkeypatch, tmp_path):
+    """Put a hyprctl on PATH that exits with the code in $FAKE_HYPRCTL_EXIT, with fresh breakers"""
+    script = tmp_path / 'hyprctl'
+    script.write_text('#!/bin/sh\nexit ${FAKE_HYPRCTL_EXIT:-0}\n')
+    script.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.delenv('HYPRLAND_INSTANCE_SIGNATURE', raising=False)
+    monkeypatch.setitem(breakers, 'hyprland', CircuitBreaker('hyprland', failure_threshold=3))
+    monkeypatch.setitem(breakers, 'zen_window', CircuitBreaker('zen_window', failure_threshold=1))
+    return monkeypatch
+
+
+def test_failed_cli_dispatch_counts_against_the_breaker(fake_hyprctl):
+    fake_hyprctl.setenv('FAKE_HYPRCTL_EXIT', '1')
+    with pytest.raises(subprocess.CalledProcessError):
+        HyprlandIPC().dispatch('workspace 3')
+    assert breakers['hyprland'].failures == 1
+
+
+def test_successful_cli_dispatch_counts_as_success(fake_hyprctl):
+    HyprlandIPC().dispatch('workspace 3')
+    assert breakers['hyprland'].failures == 0
+    assert breakers['hyprland'].stats['calls'] == 1
+
+
+def test_require_zen_window(monkeypatch):
+    from tools import hyprland_ipc
+    monkeypatch.setitem(breakers, 'hyprland', CircuitBreaker('hyprland'))
+    monkeypatch.setitem(breakers, 'zen_window', CircuitBreaker('zen_window', failure_threshold=1))
+
+    monkeypatch.setattr(hyprland_ipc, 'get_hyprland_clients', lambda: [
+        {'class': 'kitty', 'workspace': {'id': 1, 'name': '1'}},
+        {'class': 'zen', 'title': 'Zen', 'workspace': {'id': 2, 'name': '2'}},
+    ])
+    assert require_zen_window()['workspace_id'] == 2
+    assert breakers['zen_window'].state == 'closed'
+
+    monkeypatch.setattr(hyprland_ipc, 'get_hyprland_clients', lambda: [])
+    with pytest.raises(ZenWindowMissing, match='No Zen browser window'):
+        require_zen_window()
+    assert breakers['zen_window'].state == 'open'
+
+
+@pytest.fixture
+def fake_hyprland(monkeypatch):
+    """A FakeHyprland on temp sockets, with HyprlandIPC pointed at it and fresh breakers"""
+    from bench.fake_hyprland import FakeHyprland
+    # Registered first so the variables start() sets are restored afterwards
+    monkeypatch.setenv('HYPRLAND_INSTANCE_SIGNATURE', '')
+    monkeypatch.setenv('XDG_RUNTIME_DIR', '')
+    monkeypatch.setitem(breakers, 'hyprland', CircuitBreaker('hyprland', failure_threshold=3))
+    fake = FakeHyprland().start()
+    yield fake
+    fake.stop()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_query_goes_over_the_socket(fake_hyprland):
+    ipc = HyprlandIPC()
+    assert ipc.query('clients') == fake_hyprland.clients
+    assert ipc.query('activeworkspace') == {'id': 1, 'name': '1'}
+    assert fake_hyprland.requests == ['j/clients', 'j/activeworkspace']
+    assert ipc.stats['cli_fallbacks'] == 0
+
+
+def test_cached_queries_are_served_from_memory(fake_hyprland):
+    ipc = HyprlandIPC()
+    first = ipc.cached('clients')
+    second = ipc.cached('clients')
+    assert first == second == fake_hyprland.clients
+    assert fake_hyprland.requests == ['j/clients']
+    assert ipc.stats['cache_hits'] == 1
+    assert ipc.status()['listening']
+
+
+def test_relevant_events_invalidate_the_cache(fake_hyprland):
+    ipc = HyprlandIPC()
+    ipc.cached('clients')
+    ipc.cached('activeworkspace')
+    wait_for(lambda: len(fake_hyprland._subscribers) == 1)
+
+    fake_hyprland.emit('activewindow', 'kitty,~')
+    fake_hyprland.clients.append({'class': 'kitty', 'workspace': {'id': 1, 'name': '1'}})
+    fake_hyprland.emit('openwindow', '80a1,1,kitty,~')
+    wait_for(lambda: 'clients' not in ipc._cache)
+
+    # Focus churn didn't touch anything, and only the clients query went stale
+    assert 'activeworkspace' in ipc._cache
+    assert len(ipc.cached('clients')) == 2
+    assert fake_hyprland.requests.count('j/clients') == 2
+
+
+def test_answer_racing_an_event_is_not_cached(fake_hyprland, monkeypatch):
+    ipc = HyprlandIPC()
+    ipc.cached('monitors')
+    ipc._cache.clear()
+    query = ipc._query
+
+    def query_then_event(name):
+        value = query(name)
+        ipc._handle_event('openwindow')
+        return value
+
+    monkeypatch.setattr(ipc, '_query', query_then_event)
+    assert ipc.cached('clients') == fake_hyprland.clients
+    assert 'clients' not in ipc._cache
+
+
+def test_dispatches_go_out_as_one_batch(fake_hyprland):
+    ipc = HyprlandIPC()
+    ipc.cached('activeworkspace')
+    ipc.dispatch('togglespecialworkspace magic', None, 'workspace 3')
+    assert fake_hyprland.requests[-1] == '[[BATCH]]dispatch togglespecialworkspace magic;dispatch workspace 3'
+    assert fake_hyprland.dispatched == ['togglespecialworkspace magic', 'workspace 3']
+    # Our own dispatch made the cached workspace stale
+    assert ipc.cached('activeworkspace') == {'id': 3, 'name': '3'}
+
+
+def test_lost_event_socket_stops_caching(fake_hyprland):
+    ipc = HyprlandIPC()
+    ipc.cached('clients')
+    wait_for(lambda: len(fake_hyprland._subscribers) == 1)
+    fake_hyprland.stop()
+    wait_for(lambda: not ipc.status()['listening'])
+    assert ipc._cache == {}
+
+
+def test_lookups_degrade_when_the_breaker_is_open(monkeypatch):
+    from tools import hyprland_ipc
+    down = CircuitBreaker('hyprland', failure_threshold=1)
+    down.record_failure('compositor gone')
+    monkeypatch.setitem(breakers, 'hyprland', down)
+    monkeypatch.setattr(hyprland_ipc, 'hyprland', HyprlandIPC())
+    assert hyprland_ipc.get_hyprland_clients() == []
+    assert hyprland_ipc.current_workspace() == {'id': 1, 'name': '1', 'is_special': False}
+    with pytest.raises(ZenWindowMissing, match='compositor gone'):
+        require_zen_window()
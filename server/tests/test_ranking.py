@@ -0,0 +1,59 @@
+from tools.ranking import tokenize, split_passages, bm25_scores, rank_results
+
+FILLER = 'The weather was mild and the market opened on time with little news. '
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize('Hello, World! python_3') == ['hello', 'world', 'python_3']
+
+
+def test_split_passages_groups_paragraphs_up_to_the_target():
+    text = '\n\n'.join(['a' * 300] * 6)
+    passages = split_passages(text, target_chars=800)
+    assert len(passages) == 2
+    assert all(passage.count('a' * 300) == 3 for passage in passages)
+
+
+def test_split_passages_cuts_long_paragraphs_on_sentences():
+    text = 'This is one sentence. ' * 200
+    passages = split_passages(text, target_chars=200)
+    assert len(passages) > 5
+    assert all(len(passage) <= 400 for passage in passages)
+    assert all(passage.endswith('.') for passage in passages[:-1])
+
+
+def test_bm25_prefers_passages_with_rarer_query_terms():
+    passages = [
+        'python python python snake',
+        'the garbage collector in python frees memory',
+        'weather report for today',
+    ]
+    scores = bm25_scores('python garbage collector', passages)
+    assert scores.argmax() == 1
+    assert scores[2] == 0
+
+
+def test_bm25_without_query_terms_scores_zero():
+    assert list(bm25_scores('', ['some text'])) == [0.0]
+    assert len(bm25_scores('query', [])) == 0
+
+
+def test_rank_results_keeps_relevant_passages_within_budgets():
+    # Paragraphs of ~850 characters, one passage each
+    relevant = 'Rust borrow checker rules explained with lifetimes and references. ' * 13
+    results = [
+        {'url': 'https://a.example', 'content': '\n\n'.join([FILLER * 12, relevant, FILLER * 12])},
+        {'url': 'https://b.example', 'content': '\n\n'.join([FILLER * 12] * 3)},
+    ]
+    ranked = rank_results('rust borrow checker lifetimes', results, per_result_chars=1000, total_chars=2000)
+    assert ranked[0]['url'] == 'https://a.example'
+    assert ranked[0]['content'] == relevant.strip()
+    assert ranked[0]['original_length'] == len(results[0]['content'])
+    assert ranked[0]['relevance'] > 0
+    assert all(result['content_length'] <= 1000 for result in ranked)
+    assert sum(result['content_length'] for result in ranked) <= 2000
+
+
+def test_rank_results_without_content_returns_input():
+    results = [{'url': 'https://a.example', 'content': ''}]
+    assert rank_results('anything', results) is results
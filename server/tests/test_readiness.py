@@ -0,0 +1,110 @@
+import pytest
+
+from tools import readiness as readiness_module
+from tools.readiness import ReadinessTracker, STABLE_SECONDS, FAST_STABLE_SECONDS, NOT_BEFORE_SHARE
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(readiness_module.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(readiness_module.time, 'sleep', sleep)
+    return now
+
+
+def test_learned_time_is_a_moving_average_per_domain():
+    tracker = ReadinessTracker(alpha=0.5)
+    assert tracker.expected('https://example.com/a') is None
+
+    tracker.record('https://www.example.com/a', 2.0)
+    assert tracker.expected('https://example.com/b') == 2.0
+    tracker.record('https://example.com/c', 4.0)
+    assert tracker.expected('https://EXAMPLE.com/') == 3.0
+    tracker.record('https://example.com/c', 1.0)
+    assert tracker.expected('https://example.com/') == 2.0
+    assert tracker.expected('https://other.example/') is None
+    assert tracker.stats['ready'] == 3
+
+
+def test_oldest_domains_are_forgotten_first():
+    tracker = ReadinessTracker(max_domains=2)
+    tracker.record('https://a.example/', 1.0)
+    tracker.record('https://b.example/', 1.0)
+    tracker.record('https://a.example/', 1.0)
+    tracker.record('https://c.example/', 1.0)
+    assert tracker.expected('https://b.example/') is None
+    assert tracker.expected('https://a.example/') == 1.0
+    assert tracker.status()['domains'] == 2
+
+
+def test_plan_for_unknown_and_known_domains():
+    tracker = ReadinessTracker()
+    assert tracker.plan('https://new.example/') == (0.0, STABLE_SECONDS)
+    tracker.record('https://spa.example/', 5.0)
+    assert tracker.plan('https://spa.example/x') == (5.0 * NOT_BEFORE_SHARE, FAST_STABLE_SECONDS)
+
+
+def test_watch_needs_the_length_to_hold_for_the_stable_window(clock):
+    watch = ReadinessTracker().watch('https://new.example/', cap=10.0)
+    assert not watch.sample(0)
+    clock[0] += 1.0
+    # Still empty, an empty page never counts as ready
+    assert not watch.sample(0)
+    assert not watch.sample(500)
+    clock[0] += STABLE_SECONDS / 2
+    assert not watch.sample(500)
+    clock[0] += STABLE_SECONDS / 2
+    assert watch.sample(500)
+
+    info = watch.finish(True)
+    assert info == {'ready': True, 'seconds': 1.5, 'ready_seconds': 1.0, 'length': 500}
+    assert watch.tracker.expected('https://new.example/') == 1.0
+
+
+def test_watch_waits_out_not_before_on_a_known_domain(clock):
+    tracker = ReadinessTracker()
+    tracker.record('https://spa.example/', 2.0)
+    watch = tracker.watch('https://spa.example/page', cap=10.0)
+
+    # The loading skeleton holds still, but it's too early to trust it
+    assert not watch.sample(80)
+    clock[0] += 1.0
+    assert not watch.sample(80)
+    clock[0] += 0.7
+    assert watch.sample(80)
+
+
+def test_capped_watches_are_not_learned(clock):
+    tracker = ReadinessTracker()
+    watch = tracker.watch('https://slow.example/', cap=1.0)
+    watch.sample(10)
+    clock[0] += 1.0
+    assert watch.expired
+    assert watch.finish(False)['ready'] is False
+    assert tracker.expected('https://slow.example/') is None
+    assert tracker.stats['capped'] == 1
+
+
+def test_wait_until_stable_sync_polls_until_settled(clock, monkeypatch):
+    tracker = ReadinessTracker()
+    monkeypatch.setattr(readiness_module, 'readiness', tracker)
+    lengths = iter([0, 100, 300, 300, 300, 300, 300, 300, 300])
+
+    info = readiness_module.wait_until_stable_sync('https://example.com/', lambda: next(lengths), cap=5.0, interval=0.25)
+    assert info['ready'] is True
+    assert info['ready_seconds'] == 0.5
+    assert info['seconds'] == 1.0
+    assert tracker.expected('https://example.com/') == 0.5
+
+
+def test_wait_until_stable_sync_gives_up_at_the_cap(clock, monkeypatch):
+    monkeypatch.setattr(readiness_module, 'readiness', ReadinessTracker())
+    lengths = iter(range(1, 1000))
+
+    info = readiness_module.wait_until_stable_sync('https://ticker.example/', lambda: next(lengths), cap=2.0, interval=0.5)
+    assert info['ready'] is False
+    assert info['seconds'] == 2.0
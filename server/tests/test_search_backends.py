@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from tools import search_backends
+from tools.circuit_breaker import CircuitBreaker, CircuitOpen
+from tools.search_backends import SearchBackend, reciprocal_rank_fusion, fan_out_search, RRF_K
+
+
+def links(*urls):
+    return [{'url': url, 'title': url, 'snippet': ''} for url in urls]
+
+
+def test_rrf_ranks_links_found_by_several_backends_first():
+    fused = reciprocal_rank_fusion([
+        ('one', links('https://a.example', 'https://b.example', 'https://c.example')),
+        ('two', links('https://c.example', 'https://d.example')),
+    ], max_links=10)
+    assert [link['url'] for link in fused] == ['https://c.example', 'https://a.example', 'https://b.example', 'https://d.example']
+    assert fused[0]['backends'] == ['one', 'two']
+    assert fused[0]['rrf_score'] == round(1 / (RRF_K + 3) + 1 / (RRF_K + 1), 5)
+
+
+def test_rrf_merges_by_normalized_url_and_keeps_a_snippet():
+    fused = reciprocal_rank_fusion([
+        ('one', [{'url': 'https://www.a.example/page/', 'title': 'A', 'snippet': ''}]),
+        ('two', [{'url': 'http://a.example/page?utm_source=x', 'title': 'A', 'snippet': 'about a'}]),
+    ], max_links=10)
+    assert len(fused) == 1
+    assert fused[0]['url'] == 'https://www.a.example/page/'
+    assert fused[0]['snippet'] == 'about a'
+    assert fused[0]['backends'] == ['one', 'two']
+
+
+def test_rrf_counts_a_backend_once_per_url_and_caps_the_list():
+    fused = reciprocal_rank_fusion([
+        ('one', links('https://a.example', 'https://a.example/', 'https://b.example', 'https://c.example')),
+    ], max_links=2)
+    assert [link['url'] for link in fused] == ['https://a.example', 'https://b.example']
+    assert fused[0]['rrf_score'] == round(1 / (RRF_K + 1), 5)
+
+
+class FakeBackend(SearchBackend):
+    def __init__(self, name, urls=(), error=None, budget=5.0, fallback=False):
+        super().__init__(budget=budget)
+        self.name = name
+        self.urls = urls
+        self.error = error
+        self.fallback = fallback
+        self.calls = 0
+
+    async def search(self, query, max_links, on_link=None):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return links(*self.urls)[:max_links]
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(search_backends, 'breaker', lambda name, **options: CircuitBreaker(name, **options))
+
+
+def test_fan_out_streams_distinct_links_and_reports_fusion_per_backend():
+    streamed = []
+    ranked = []
+
+    async def on_link(link):
+        streamed.append(link['url'])
+
+    backends = [
+        FakeBackend('one', ['https://a.example', 'https://b.example']),
+        FakeBackend('two', ['https://b.example/', 'https://c.example']),
+        FakeBackend('broken', error=RuntimeError('markup changed')),
+    ]
+    fused = asyncio.run(fan_out_search('q', 2, backends, on_link=on_link, on_ranked=ranked.append))
+
+    assert streamed == ['https://a.example', 'https://b.example']
+    assert [link['url'] for link in fused] == ['https://b.example', 'https://a.example']
+    assert len(ranked) == 2
+    assert ranked[-1] == fused
+
+
+def test_fan_out_raises_when_every_backend_is_open(monkeypatch):
+    down = CircuitBreaker('down', failure_threshold=1)
+    down.record_failure('blocked')
+    monkeypatch.setattr(search_backends, 'breaker', lambda name, **options: down)
+    with pytest.raises(CircuitOpen, match='all search backends'):
+        asyncio.run(fan_out_search('q', 2, [FakeBackend('one', ['https://a.example'])]))
+
+
+def test_fallback_backends_only_run_when_the_others_find_nothing():
+    browser = FakeBackend('browser', ['https://z.example'], fallback=True)
+    fused = asyncio.run(fan_out_search('q', 2, [FakeBackend('html', ['https://a.example']), browser]))
+    assert [link['url'] for link in fused] == ['https://a.example']
+    assert browser.calls == 0
+
+    backends = [FakeBackend('html'), FakeBackend('broken', error=RuntimeError('blocked')), browser]
+    fused = asyncio.run(fan_out_search('q', 2, backends))
+    assert [link['url'] for link in fused] == ['https://z.example']
+    assert browser.calls == 1
+
+
+def test_fallback_backends_run_when_the_others_are_open(monkeypatch):
+    down = CircuitBreaker('down', failure_threshold=1)
+    down.record_failure('blocked')
+    monkeypatch.setattr(search_backends, 'breaker',
+                        lambda name, **options: down if name == 'search:html' else CircuitBreaker(name, **options))
+    browser = FakeBackend('browser', ['https://z.example'], fallback=True)
+    fused = asyncio.run(fan_out_search('q', 2, [FakeBackend('html', ['https://a.example']), browser]))
+    assert [link['url'] for link in fused] == ['https://z.example']
+
+
+def test_default_backends_keep_the_browser_as_a_fallback(monkeypatch):
+    monkeypatch.setattr(search_backends, 'SEARXNG_URL', None)
+    backends = search_backends.default_backends()
+    assert [(backend.name, backend.fallback) for backend in backends] == [
+        ('duckduckgo_html', False), ('duckduckgo_browser', True)
+    ]
@@ -0,0 +1,70 @@
+import pytest
+
+from tools.search_cache import SearchCache, normalize_query
+
+LINKS = [{'url': f'https://example.com/{i}', 'title': str(i), 'snippet': ''} for i in range(5)]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SearchCache(path=str(tmp_path / 'serp.db'))
+
+
+def test_normalize_query_ignores_case_punctuation_stopwords_and_order():
+    assert normalize_query('What is the Python GIL?') == normalize_query('python gil')
+    assert normalize_query('gil python') == 'gil python'
+    # A query of stopwords only still gets a key
+    assert normalize_query('Of the and') == 'and of the'
+
+
+def test_round_trip_and_hit_counts(cache):
+    assert cache.get('python gil', 5) is None
+    cache.put('python gil', 5, LINKS)
+    assert cache.get('What is the Python GIL?', 5) == LINKS
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_engines_are_cached_separately(cache):
+    cache.put('python gil', 5, LINKS, engine='duckduckgo')
+    assert cache.get('python gil', 5, engine='searxng') is None
+
+
+def test_shorter_list_only_serves_requests_it_was_fetched_for(cache):
+    cache.put('python gil', 3, LINKS[:3])
+    assert cache.get('python gil', 2) == LINKS[:2]
+    assert cache.get('python gil', 3) == LINKS[:3]
+    assert cache.get('python gil', 5) is None
+    # The engine had only three results even when asked for five
+    cache.put('rare query', 5, LINKS[:3])
+    assert cache.get('rare query', 5) == LINKS[:3]
+
+
+def test_expired_entries_are_misses(cache, monkeypatch):
+    from tools import search_cache
+    cache.put('python gil', 5, LINKS)
+    now = search_cache.time.time()
+    monkeypatch.setattr(search_cache.time, 'time', lambda: now + cache.ttl + 1)
+    assert cache.get('python gil', 5) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    from tools import search_cache
+    clock = [1000.0]
+    monkeypatch.setattr(search_cache.time, 'time', lambda: clock[0])
+    cache = SearchCache(path=str(tmp_path / 'serp.db'), max_entries=2)
+    for query in ('first', 'second'):
+        cache.put(query, 5, LINKS)
+        clock[0] += 1
+    cache.get('first', 5)
+    clock[0] += 1
+    cache.put('third', 5, LINKS)
+    assert cache.get('second', 5) is None
+    assert cache.get('first', 5) == LINKS
+    assert cache.get('third', 5) == LINKS
+
+
+def test_empty_results_are_not_stored(cache):
+    cache.put('python gil', 5, [])
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,115 @@
+from tools.tab_index import TabIndex
+from tools.url_scrape import find_matching_tab
+
+
+def tab(tab_id, index, url, window_id=1, active=False, **extra):
+    return {'tab_id': tab_id, 'index': index, 'url': url, 'title': f"Tab {tab_id}",
+            'window_id': window_id, 'active': active, **extra}
+
+
+def snapshot(*tabs, focused_window_id=1):
+    return {'type': 'event', 'event': 'tabs_snapshot', 'tabs': list(tabs), 'focused_window_id': focused_window_id}
+
+
+def urls(listing):
+    current = [listing['current_tab']['url']] if listing['current_tab'] else []
+    return current, [info['url'] for info in listing['other_tabs']]
+
+
+def test_snapshot_lists_the_focused_window_in_tab_order():
+    index = TabIndex()
+    assert not index.ready
+    index.handle_event(snapshot(
+        tab(12, 2, 'https://c.example/'),
+        tab(10, 0, 'https://a.example/'),
+        tab(11, 1, 'https://b.example/', active=True),
+        tab(13, 3, 'https://hidden.example/', hidden=True),
+        tab(20, 0, 'https://other-window.example/', window_id=2, active=True),
+    ))
+
+    assert index.ready
+    listing = index.listing()
+    assert listing['current_tab'] == {'id': 2, 'tab_id': 11, 'title': 'Tab 11', 'url': 'https://b.example/'}
+    assert [(info['id'], info['tab_id']) for info in listing['other_tabs']] == [(1, 10), (3, 12)]
+    assert index.status()['tabs'] == 5
+    assert index.status()['snapshots'] == 1
+
+
+def test_a_new_snapshot_replaces_the_old_tabs():
+    index = TabIndex()
+    index.handle_event(snapshot(tab(1, 0, 'https://old.example/', active=True)))
+    index.handle_event(snapshot(tab(2, 0, 'https://new.example/', active=True)))
+    assert urls(index.listing()) == (['https://new.example/'], [])
+
+
+def test_tab_updated_merges_into_known_tabs_and_adds_new_ones():
+    index = TabIndex()
+    index.handle_event(snapshot(tab(1, 0, 'https://a.example/', active=True)))
+    index.handle_event({'type': 'event', 'event': 'tab_updated',
+                        'tab': {'tab_id': 1, 'url': 'https://a.example/next', 'title': 'Next'}})
+    index.handle_event({'type': 'event', 'event': 'tab_updated', 'tab': tab(2, 1, 'https://b.example/')})
+
+    listing = index.listing()
+    # The partial update kept the fields it didn't mention
+    assert listing['current_tab'] == {'id': 1, 'tab_id': 1, 'title': 'Next', 'url': 'https://a.example/next'}
+    assert urls(listing)[1] == ['https://b.example/']
+
+
+def test_tab_activated_only_touches_its_window():
+    index = TabIndex()
+    index.handle_event(snapshot(
+        tab(1, 0, 'https://a.example/', active=True),
+        tab(2, 1, 'https://b.example/'),
+        tab(3, 0, 'https://c.example/', window_id=2, active=True),
+    ))
+    index.handle_event({'type': 'event', 'event': 'tab_activated', 'tab_id': 2, 'window_id': 1})
+
+    assert urls(index.listing()) == (['https://b.example/'], ['https://a.example/'])
+    index.handle_event({'type': 'event', 'event': 'window_focused', 'window_id': 2})
+    assert urls(index.listing()) == (['https://c.example/'], [])
+
+
+def test_window_focused_switches_the_listed_window():
+    index = TabIndex()
+    index.handle_event(snapshot(
+        tab(1, 0, 'https://a.example/', active=True),
+        tab(2, 0, 'https://b.example/', window_id=2, active=True),
+    ))
+    index.handle_event({'type': 'event', 'event': 'window_focused', 'window_id': 2})
+    assert urls(index.listing()) == (['https://b.example/'], [])
+
+    # Focus left the browser, nothing to list
+    index.handle_event({'type': 'event', 'event': 'window_focused', 'window_id': None})
+    assert index.listing() == {'current_tab': None, 'other_tabs': []}
+
+
+def test_disconnect_clears_the_index():
+    index = TabIndex()
+    index.handle_event(snapshot(tab(1, 0, 'https://a.example/', active=True)))
+    index.handle_event({'type': 'event', 'event': 'bridge_disconnected'})
+
+    assert not index.ready
+    assert index.status()['tabs'] == 0
+    assert index.listing() == {'current_tab': None, 'other_tabs': []}
+
+
+def test_unknown_events_are_ignored():
+    index = TabIndex()
+    index.handle_event({'type': 'event', 'event': 'download_finished'})
+    assert index.updated == 0.0
+    assert index.status()['seconds_since_update'] is None
+
+
+def test_urls_match_by_normalized_key():
+    index = TabIndex()
+    index.handle_event(snapshot(
+        tab(7, 0, 'https://www.Example.com/docs?page=2', active=True),
+        *[tab(100 + i, i + 1, f"https://filler{i}.example/") for i in range(9)],
+        tab(42, 10, 'http://news.example.org/story'),
+    ))
+    listing = index.listing()
+
+    assert find_matching_tab('http://example.com/docs', listing) == {'type': 'current', 'id': 1, 'tab_id': 7}
+    # Past Ctrl+8, but the browser tab id still makes it reachable
+    assert find_matching_tab('https://www.news.example.org/story', listing) == {'type': 'other', 'id': 11, 'tab_id': 42}
+    assert find_matching_tab('https://example.com/other', listing) is None
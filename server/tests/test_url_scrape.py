@@ -0,0 +1,64 @@
+import pytest
+
+from tools import url_scrape
+from tools.circuit_breaker import CircuitOpen
+from tools.url_scrape import ScrapeError
+
+
+@pytest.fixture
+def keystroke_path(monkeypatch):
+    """Force scrape_url onto the keystroke path with a Zen window on workspace 2"""
+    monkeypatch.setattr(url_scrape, 'fetch_document', lambda url, slot: None)
+    monkeypatch.setattr(url_scrape, 'ensure_available', lambda *names: None)
+    monkeypatch.setattr(type(url_scrape.extension_bridge), 'connected', property(lambda self: False))
+    monkeypatch.setattr(url_scrape.tab_index, 'ready', False)
+    monkeypatch.setattr(url_scrape, 'require_zen_window', lambda: {'workspace_id': 2, 'workspace_name': '2'})
+    monkeypatch.setattr(url_scrape, 'current_workspace', lambda: {'id': 1, 'name': '1', 'is_special': False})
+    monkeypatch.setattr(url_scrape.pyperclip, 'paste', lambda: '')
+    return monkeypatch
+
+
+@pytest.mark.parametrize('error', [
+    CircuitOpen('hyprland is unavailable (gone), retrying in 15s'),
+    OSError('connection refused'),
+])
+def test_hyprland_failures_mid_scrape_become_scrape_errors(keystroke_path, error):
+    def dispatch(*commands):
+        raise error
+
+    keystroke_path.setattr(url_scrape.hyprland, 'dispatch', dispatch)
+    with pytest.raises(ScrapeError, match=str(error).split(' ')[0]):
+        url_scrape._scrape_uncached('https://desktop.example/page')
+    assert url_scrape.scrape_url('https://desktop.example/page', bypass_cache=True).startswith("Can't scrape")
+
+
+def fake_wait(calls):
+    def wait_until_stable_sync(url, probe, cap, interval):
+        calls.append({'interval': interval, 'lengths': [probe() for _ in range(3)]})
+        return {'ready': True, 'ready_seconds': 0.4}
+    return wait_until_stable_sync
+
+
+def test_new_tab_readiness_polls_the_bridge_and_copies_once(monkeypatch):
+    calls, copies, requests = [], [], []
+    monkeypatch.setattr(type(url_scrape.extension_bridge), 'connected', property(lambda self: True))
+    monkeypatch.setattr(url_scrape.extension_bridge, 'request',
+                        lambda action, **params: requests.append(action) or {'length': 1200})
+    monkeypatch.setattr(url_scrape, 'copy_page_data', lambda wait=1.0: copies.append(wait) or '{"content": "page"}')
+    monkeypatch.setattr(url_scrape, 'wait_until_stable_sync', fake_wait(calls))
+
+    assert url_scrape._wait_for_new_tab('https://example.com/') == '{"content": "page"}'
+    assert requests == ['content_length'] * 3
+    assert calls[0]['lengths'] == [1200] * 3
+    assert len(copies) == 1
+
+
+def test_new_tab_readiness_without_the_bridge_copies_sparingly(keystroke_path):
+    calls, copies = [], []
+    keystroke_path.setattr(url_scrape, 'copy_page_data', lambda wait=1.0: copies.append(wait) or '{"content": "abc"}')
+    keystroke_path.setattr(url_scrape, 'wait_until_stable_sync', fake_wait(calls))
+
+    assert url_scrape._wait_for_new_tab('https://example.com/') == '{"content": "abc"}'
+    assert calls[0] == {'interval': url_scrape.KEYSTROKE_PROBE_INTERVAL, 'lengths': [3, 3, 3]}
+    # The last probe's copy is the result, no extra keystroke afterwards
+    assert len(copies) == 3
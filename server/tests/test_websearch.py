@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from tools import websearch
+from tools.search_backends import SearchBackend
+from tools.search_cache import SearchCache
+from tools.content_cache import ContentCache
+from tools.content_budget import ContentBudget
+
+
+class FakeBackend(SearchBackend):
+    def __init__(self, name, urls, delay=0.0):
+        super().__init__(budget=5.0)
+        self.name = name
+        self.urls = urls
+        self.delay = delay
+        self.calls = 0
+
+    async def search(self, query, max_links, on_link=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [{'url': url, 'title': url, 'snippet': ''} for url in self.urls[:max_links]]
+
+
+@pytest.fixture
+def search_env(monkeypatch, tmp_path):
+    cache = SearchCache(path=str(tmp_path / 'serp.db'))
+    backends = []
+    monkeypatch.setattr(websearch, 'search_cache', cache)
+    monkeypatch.setattr(websearch, 'default_backends', lambda use_duckduckgo=True: backends)
+    monkeypatch.setattr(websearch, '_warm_host', lambda url: None)
+    return cache, backends
+
+
+def test_second_identical_query_is_a_cache_hit(search_env):
+    cache, backends = search_env
+    backend = FakeBackend('fake-hit', ['https://example.com/a', 'https://example.com/b'])
+    backends.append(backend)
+
+    first = asyncio.run(websearch._search_links('python asyncio', 2))
+    second = asyncio.run(websearch._search_links('python asyncio', 2))
+
+    assert [link['url'] for link in second] == [link['url'] for link in first]
+    assert backend.calls == 1
+    assert cache.hits == 1
+
+
+def test_cache_is_written_before_slow_backends_finish(search_env):
+    cache, backends = search_env
+    backends.append(FakeBackend('fake-fast', ['https://example.com/fast']))
+    backends.append(FakeBackend('fake-slow', ['https://example.com/slow'], delay=3.0))
+    ranked = []
+
+    async def search_then_give_up():
+        task = asyncio.create_task(websearch._search_links('rust lifetimes', 2, on_ranked=ranked.append))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(search_then_give_up())
+
+    assert [link['url'] for link in ranked[-1]] == ['https://example.com/fast']
+    cached = cache.get('rust lifetimes', 1, engine='fake-fast+fake-slow')
+    assert [link['url'] for link in cached] == ['https://example.com/fast']
+
+
+def test_websearch_keeps_searching_after_enough_pages(search_env, monkeypatch):
+    cache, backends = search_env
+    backends.append(FakeBackend('fake-first', ['https://example.com/b', 'https://example.com/a'], delay=0.05))
+    backends.append(FakeBackend('fake-second', ['https://example.com/a', 'https://example.com/c'], delay=0.3))
+
+    async def scrape_two(pool, links, **options):
+        results = []
+        while len(results) < 2:
+            link = await links.get()
+            results.append({'url': link['url'], 'title': link['title'], 'content': link['url'], 'content_length': 1})
+        # Scrapes finish out of search order
+        return results[::-1]
+
+    monkeypatch.setattr(websearch, '_scrape_7_parallel_contexts', scrape_two)
+
+    async def search():
+        response = await websearch.scrape_web_content('go generics', max_links=3, dedupe=False)
+        # The slower backend is still running, it must finish rather than be cancelled
+        await asyncio.sleep(0.5)
+        return response
+
+    response = asyncio.run(search())
+
+    assert [result['url'] for result in response['results']] == ['https://example.com/b', 'https://example.com/a']
+    cached = cache.get('go generics', 3, engine='fake-first+fake-second')
+    assert [link['url'] for link in cached] == ['https://example.com/a', 'https://example.com/b', 'https://example.com/c']
+
+
+def test_content_cache_gets_pages_before_the_call_budget_cuts_them(monkeypatch):
+    cache = ContentCache()
+    pages = {
+        'https://example.com/one': 'one ' * 3750,
+        'https://example.com/two': 'two ' * 3750,
+        'https://example.com/huge': 'big ' * 1000,
+    }
+
+    async def fetch_static(url):
+        return {'url': url, 'title': url, 'content': pages[url], 'kind': 'html'}
+
+    monkeypatch.setattr(websearch, 'content_cache', cache)
+    monkeypatch.setattr(websearch, 'fetch_static', fetch_static)
+    monkeypatch.setattr(websearch, 'preferred_tier', lambda url: 'http')
+    monkeypatch.setattr(websearch, 'record_tier', lambda url, tier: None)
+
+    budget = ContentBudget(per_page=200000, total=21000)
+    links = [{'url': url, 'title': url} for url in pages if url != 'https://example.com/huge']
+    results = asyncio.run(websearch._scrape_7_parallel_contexts(None, links, budget=budget, max_concurrency=1))
+
+    by_url = {result['url']: result for result in results}
+    assert by_url['https://example.com/one']['content_length'] == 14999
+    assert by_url['https://example.com/two']['content_length'] == 21000 - 14999
+    # The second page went out truncated, but the cache holds all of it
+    assert cache.get('https://example.com/two')['content'] == pages['https://example.com/two'].strip()
+
+    # Pages cut by the per-page cap itself aren't cached as if complete
+    budget = ContentBudget(per_page=1000, total=21000)
+    huge = [{'url': 'https://example.com/huge', 'title': 'huge'}]
+    results = asyncio.run(websearch._scrape_7_parallel_contexts(None, huge, budget=budget))
+    assert results[0]['content_length'] <= 1000
+    assert cache.get('https://example.com/huge') is None
+
+
+def test_json_documents_keep_their_indentation(monkeypatch):
+    document = '{\n "name": "mcp",\n "tags": [\n  "search",\n  "scrape"\n ],\n "notes": "' + 'x' * 200 + '"\n}'
+
+    async def fetch_static(url):
+        return {'url': url, 'title': 'data.json', 'content': document, 'kind': 'json'}
+
+    monkeypatch.setattr(websearch, 'content_cache', ContentCache())
+    monkeypatch.setattr(websearch, 'fetch_static', fetch_static)
+    monkeypatch.setattr(websearch, 'record_tier', lambda url, tier: None)
+
+    links = [{'url': 'https://example.com/data.json', 'title': 'data'}]
+    results = asyncio.run(websearch._scrape_7_parallel_contexts(None, links, budget=ContentBudget()))
+    assert results[0]['content'] == document
@@ -0,0 +1,294 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+# Launch browser with stealth settings but NOT headless
+LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-extensions',
+    '--disable-plugins',
+    '--disable-default-apps',
+    '--no-first-run',
+    '--disable-background-networking',
+    '--disable-ipc-flooding-protection',
+    '--disable-hang-monitor',
+    '--disable-prompt-on-repost',
+    '--disable-sync',
+    '--force-color-profile=srgb',
+    '--metrics-recording-only',
+    '--use-mock-keychain',
+    '--disable-component-extensions-with-background-pages',
+    '--mute-audio',
+    '--no-default-browser-check',
+    '--autoplay-policy=user-gesture-required',
+    '--disable-background-mode',
+    '--disable-notifications'
+]
+
+CONTEXT_OPTIONS = {
+    'user_agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    'viewport': {'width': 1366, 'height': 768},
+    'locale': 'en-US',
+    'timezone_id': 'America/New_York',
+    'ignore_https_errors': True,
+    'extra_http_headers': {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+    }
+}
+
+# Enhanced stealth techniques
+STEALTH_SCRIPT = """
+    // Override the `plugins` property to use a custom getter.
+    Object.defineProperty(navigator, 'plugins', {
+        get: function() {
+            return [1, 2, 3, 4, 5];
+        },
+    });
+
+    // Override the `languages` property to use a custom getter.
+    Object.defineProperty(navigator, 'languages', {
+        get: function() {
+            return ['en-US', 'en'];
+        },
+    });
+
+    // Override the webdriver property
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+
+    // Mock chrome object
+    window.chrome = {
+        runtime: {},
+    };
+
+    // Mock permissions
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: 'granted' }) :
+            originalQuery(parameters)
+    );
+"""
+
+
+class _PooledContext:
+    """A browser context plus the bookkeeping needed to recycle it"""
+
+    def __init__(self, context, browser):
+        self.context = context
+        self.browser = browser
+        self.uses = 0
+        self.closed = False
+        context.on('close', lambda _: self._mark_closed())
+
+    def _mark_closed(self):
+        self.closed = True
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium instance with a pool of warm, stealth-configured contexts.
+
+    The browser is launched lazily on the first borrow and shut down again after
+    `idle_timeout` seconds without any borrows. Each context is recycled after
+    `max_uses_per_context` borrows, and contexts or browsers that died while idle
+    are replaced transparently on the next borrow.
+    """
+
+    def __init__(self, max_contexts: int = 7, max_uses_per_context: int = 50, idle_timeout: float = 300.0, headless: bool = False):
+        self.max_contexts = max_contexts
+        self.headless = headless
+        self.max_uses_per_context = max_uses_per_context
+        self.idle_timeout = idle_timeout
+
+        self._playwright = None
+        self._browser = None
+        self._idle = []
+        self._in_use = 0
+        self._last_used = time.monotonic()
+        self._lock = None
+        self._slots = None
+        self._idle_task = None
+
+        self.stats = {
+            'launches': 0,
+            'borrows': 0,
+            'contexts_created': 0,
+            'contexts_recycled': 0,
+            'idle_shutdowns': 0,
+        }
+
+    def _ensure_primitives(self):
+        # Created on first use so they bind to the server's running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_contexts)
+
+    async def _ensure_browser(self):
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            await self._shutdown_locked()
+            print("Browser pool: launching Chromium")
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+            self.stats['launches'] += 1
+
+            if self._idle_task is None or self._idle_task.done():
+                self._idle_task = asyncio.create_task(self._idle_watcher())
+            return self._browser
+
+    async def _new_context(self, browser) -> _PooledContext:
+        context = await browser.new_context(**CONTEXT_OPTIONS)
+        await context.add_init_script(STEALTH_SCRIPT)
+        self.stats['contexts_created'] += 1
+        return _PooledContext(context, browser)
+
+    def _is_healthy(self, entry: _PooledContext) -> bool:
+        return (
+            not entry.closed
+            and entry.browser is self._browser
+            and entry.browser.is_connected()
+            and entry.uses < self.max_uses_per_context
+        )
+
+    async def _discard(self, entry: _PooledContext):
+        self.stats['contexts_recycled'] += 1
+        if entry.closed or not entry.browser.is_connected():
+            return
+        try:
+            await entry.context.close()
+        except Exception as e:
+            print(f"Browser pool: error closing context: {e}")
+
+    async def acquire(self) -> _PooledContext:
+        """Borrow a warm context, launching the browser or a fresh context if needed"""
+        self._ensure_primitives()
+        await self._slots.acquire()
+        # Counted before any await, so the idle watcher can't close the browser under this borrow
+        self._in_use += 1
+        self._last_used = time.monotonic()
+        try:
+            browser = await self._ensure_browser()
+
+            entry = None
+            while self._idle:
+                candidate = self._idle.pop()
+                if self._is_healthy(candidate):
+                    entry = candidate
+                    break
+                await self._discard(candidate)
+
+            if entry is None:
+                entry = await self._new_context(browser)
+
+            entry.uses += 1
+            self._last_used = time.monotonic()
+            self.stats['borrows'] += 1
+            return entry
+        except BaseException:
+            self._in_use -= 1
+            self._slots.release()
+            raise
+
+    async def release(self, entry: _PooledContext):
+        """Return a borrowed context, closing stray pages and recycling it if worn out"""
+        self._in_use -= 1
+        self._last_used = time.monotonic()
+        try:
+            if self._is_healthy(entry):
+                for page in list(entry.context.pages):
+                    await page.close()
+                self._idle.append(entry)
+            else:
+                await self._discard(entry)
+        except Exception as e:
+            print(f"Browser pool: dropping context after release error: {e}")
+            await self._discard(entry)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def context(self):
+        """Async context manager yielding a borrowed Playwright BrowserContext"""
+        entry = await self.acquire()
+        try:
+            yield entry.context
+        finally:
+            await self.release(entry)
+
+    async def warm(self, count: int = None):
+        """Pre-create up to `count` idle contexts so the next call skips startup"""
+        self._ensure_primitives()
+        browser = await self._ensure_browser()
+        count = min(count or self.max_contexts, self.max_contexts)
+        while len(self._idle) + self._in_use < count:
+            self._idle.append(await self._new_context(browser))
+
+    async def _idle_watcher(self):
+        interval = max(1.0, min(self.idle_timeout / 4, 30.0))
+        while self._browser is not None:
+            await asyncio.sleep(interval)
+            idle_for = time.monotonic() - self._last_used
+            if self._in_use == 0 and idle_for >= self.idle_timeout:
+                async with self._lock:
+                    # A borrow may have started while we waited for the lock, keep watching then
+                    if self._in_use == 0 and time.monotonic() - self._last_used >= self.idle_timeout:
+                        print(f"Browser pool: idle for {idle_for:.0f}s, shutting down browser")
+                        await self._shutdown_locked()
+                        self.stats['idle_shutdowns'] += 1
+                        return
+
+    async def _shutdown_locked(self):
+        idle, self._idle = self._idle, []
+        for entry in idle:
+            await self._discard(entry)
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                print(f"Browser pool: error closing browser: {e}")
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                print(f"Browser pool: error stopping playwright: {e}")
+            self._playwright = None
+
+    async def close(self):
+        """Shut down all contexts and the browser"""
+        self._ensure_primitives()
+        async with self._lock:
+            await self._shutdown_locked()
+        if self._idle_task is not None and self._idle_task is not asyncio.current_task():
+            self._idle_task.cancel()
+            self._idle_task = None
+
+    def status(self) -> dict:
+        return {
+            'browser_running': self._browser is not None and self._browser.is_connected(),
+            'idle_contexts': len(self._idle),
+            'in_use_contexts': self._in_use,
+            'seconds_since_last_use': round(time.monotonic() - self._last_used, 1),
+            **self.stats,
+        }
+
+
+# Shared pool owned by the server process
+browser_pool = BrowserPool()
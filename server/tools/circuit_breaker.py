@@ -0,0 +1,167 @@
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency that is known to be down"""
+
+
+class CircuitBreaker:
+    """
+    Failure counter for one external dependency (a search engine, a CLI tool, a window).
+
+    After `failure_threshold` consecutive failures the breaker opens and calls
+    fail immediately with the last error as the reason. Once `cooldown` seconds
+    have passed a single trial call is let through (half-open): success closes
+    the breaker, failure opens it again with the cooldown doubled, up to
+    `max_cooldown`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def reason(self) -> str:
+        return f"{self.name} is unavailable ({self.last_error}), retrying in {self.retry_in():.0f}s"
+
+    def allow(self):
+        """Raise CircuitOpen unless a call may go ahead now"""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == OPEN or (self.state == HALF_OPEN and self._trial_in_flight):
+                self.stats['rejected'] += 1
+                raise CircuitOpen(self.reason())
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = True
+            self.stats['calls'] += 1
+
+    def available(self) -> bool:
+        """Non-raising peek, without claiming the half-open trial"""
+        with self._lock:
+            return self.state != OPEN or self.retry_in() <= 0
+
+    def check(self):
+        """Raise CircuitOpen, counted as a rejection, while open; unlike allow() it never claims the half-open trial"""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() > 0:
+                self.stats['rejected'] += 1
+                raise CircuitOpen(self.reason())
+
+    def release(self):
+        """The call was abandoned (e.g. cancelled) before it could tell anything, free the half-open trial"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"Circuit breaker {self.name}: recovered")
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._trial_in_flight = False
+
+    def record_failure(self, error, fatal: bool = False):
+        """Count a failure; `fatal` (e.g. a missing binary) opens the breaker straight away"""
+        with self._lock:
+            self.failures += 1
+            self.stats['failures'] += 1
+            # First line only, some errors (Playwright's) carry a whole banner
+            self.last_error = (str(error) or type(error).__name__).splitlines()[0][:200]
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            if self.state == HALF_OPEN or fatal or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.stats['opened'] += 1
+                    print(f"Circuit breaker {self.name}: open for {self.cooldown:.0f}s after {self.failures} failures ({self.last_error})")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def __enter__(self):
+        self.allow()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is None:
+            self.record_success()
+        elif not isinstance(exc, Exception):
+            self.release()
+        elif not isinstance(exc, CircuitOpen):
+            self.record_failure(exc)
+        return False
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'last_error': self.last_error,
+                'retry_in': round(self.retry_in(), 1) if self.state != CLOSED else 0.0,
+                **self.stats
+            }
+
+
+# One breaker per dependency, shared by every tool that uses it
+breakers: Dict[str, CircuitBreaker] = {
+    'hyprland': CircuitBreaker('hyprland', failure_threshold=3, cooldown=15.0),
+    'wtype': CircuitBreaker('wtype', failure_threshold=2, cooldown=30.0),
+    'zen_window': CircuitBreaker('zen_window', failure_threshold=1, cooldown=10.0),
+}
+_breakers_lock = threading.Lock()
+
+
+def breaker(name: str, **options) -> CircuitBreaker:
+    """The breaker for `name`, created with `options` on first use"""
+    with _breakers_lock:
+        if name not in breakers:
+            breakers[name] = CircuitBreaker(name, **options)
+        return breakers[name]
+
+
+def ensure_available(*names: str):
+    """Fail fast with the reason of the first named dependency that is known to be down"""
+    for name in names:
+        breakers[name].check()
+
+
+def guarded_run(name: str, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run for an external CLI like wtype, counting a missing binary or non-zero exit against its breaker"""
+    cli_breaker = breakers[name]
+    cli_breaker.allow()
+    try:
+        result = subprocess.run(args, **kwargs)
+    except FileNotFoundError as e:
+        cli_breaker.record_failure(f"{args[0]} is not installed", fatal=True)
+        raise CircuitOpen(cli_breaker.reason()) from e
+    if result.returncode != 0:
+        cli_breaker.record_failure(f"{args[0]} exited with {result.returncode}")
+    else:
+        cli_breaker.record_success()
+    return result
+
+
+def breakers_status() -> dict:
+    with _breakers_lock:
+        return {name: cb.status() for name, cb in breakers.items()}
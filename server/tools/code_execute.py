@@ -1,11 +1,17 @@
 def codeexecuter(code:str) -> str:
+    import os
     import subprocess
-    with open("temp_script.py", "w") as f:
+    import tempfile
+    # One script file per call so concurrent executions don't overwrite each other
+    with tempfile.NamedTemporaryFile("w", suffix=".py", prefix="temp_script_", dir=".", delete=False) as f:
         f.write(code)
+        script_path = f.name
     try:
-        result = subprocess.run(["python", "temp_script.py"], capture_output=True, text=True)
+        result = subprocess.run(["python", script_path], capture_output=True, text=True)
         return result.stdout
     except Exception as e:
         return f"Error executing code: {str(e)}"
+    finally:
+        os.remove(script_path)
     
 codeexecuter_description = "Execute Python code and return output, make sure it's run and go.. since the there is no way to interact with the code being run, just the output is shared, Ideally use this tool to test certain things or perform analysis on the code, not to run long running tasks or tasks that require user input, as it will not work as expected."
\ No newline at end of file
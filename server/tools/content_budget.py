@@ -0,0 +1,111 @@
+import asyncio
+import os
+import resource
+from typing import Dict, Optional
+
+# Per page and per websearch call, in characters of extracted text
+MAX_PAGE_CHARS = 200_000
+MAX_CALL_CHARS = 1_500_000
+
+# Pages whose HTML alone is this large are dropped before extraction
+MAX_PAGE_BYTES = 20 * 1024 * 1024
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        # Only the lifetime peak is available here, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ContentBudget:
+    """
+    Caps how much extracted text one websearch call holds on to.
+
+    Every page gets at most `per_page` characters, and all pages of the call
+    together at most `total`. The extraction script and the text cleaner are
+    told `per_page` up front so an oversized page is cut in the browser
+    instead of being copied into the server first; the call's remaining
+    allowance is charged afterwards by take(), so the content cache still
+    gets the whole page. Once the budget is spent, remaining pages are
+    skipped without being fetched.
+    """
+
+    def __init__(self, per_page: int = MAX_PAGE_CHARS, total: int = MAX_CALL_CHARS):
+        self.per_page = per_page
+        self.total = total
+        self.used = 0
+        self.truncated = 0
+        self.skipped = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.used >= self.total
+
+    def allowance(self) -> int:
+        """Characters the next page may use"""
+        return max(0, min(self.per_page, self.total - self.used))
+
+    def take(self, text: str) -> str:
+        """Charge a page's text against the budget, cutting it down to the allowance"""
+        allowance = self.allowance()
+        # Text already cut to the allowance by the extractor counts as truncated too
+        if len(text) >= allowance:
+            text = text[:allowance]
+            self.truncated += 1
+        self.used += len(text)
+        return text
+
+    def skip(self):
+        self.skipped += 1
+
+    def report(self) -> Dict[str, int]:
+        return {
+            'content_chars': self.used,
+            'budget_chars': self.total,
+            'page_budget_chars': self.per_page,
+            'pages_truncated': self.truncated,
+            'pages_skipped': self.skipped
+        }
+
+
+class PeakMemory:
+    """
+    Samples the server process's RSS in the background while a call runs and
+    reports its peak. Calls running at the same time share the process, so the
+    growth is an upper bound for one call, not its own footprint.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self):
+        while True:
+            self.peak = max(self.peak, current_rss())
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self):
+        self.start = self.peak = current_rss()
+        self._task = asyncio.create_task(self._sample())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self.peak = max(self.peak, current_rss())
+
+    def report(self) -> Dict[str, float]:
+        mb = 1024 * 1024
+        return {
+            'process_rss_start_mb': round(self.start / mb, 1),
+            'process_rss_peak_mb': round(self.peak / mb, 1),
+            'process_rss_growth_mb': round((self.peak - self.start) / mb, 1)
+        }
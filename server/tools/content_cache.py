@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+# Query parameters that never change page content, utm_* by prefix, the rest by exact name
+TRACKING_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'ref_url'}
+
+# Per-domain freshness, matched against the domain and its parents
+DOMAIN_TTLS = {
+    'news.ycombinator.com': 300,
+    'reddit.com': 900,
+    'twitter.com': 300,
+    'x.com': 300,
+    'cnn.com': 900,
+    'bbc.com': 900,
+    'reuters.com': 900,
+    'wikipedia.org': 7 * 24 * 3600,
+    'docs.python.org': 7 * 24 * 3600,
+    'stackoverflow.com': 24 * 3600,
+    'github.com': 3600,
+}
+DEFAULT_TTL = 6 * 3600
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def cache_key(url: str) -> str:
+    """Normalize URL for caching: no protocol, www, fragment, trailing slash or tracking params"""
+    parsed = urlparse(url)
+    domain = parsed.netloc.lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    path = parsed.path.rstrip('/') or '/'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not _is_tracking(k)
+    )
+    return domain + path + ('?' + urlencode(query) if query else '')
+
+
+def ttl_for(url: str) -> float:
+    domain = urlparse(url).netloc.lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    parts = domain.split('.')
+    for i in range(len(parts) - 1):
+        ttl = DOMAIN_TTLS.get('.'.join(parts[i:]))
+        if ttl is not None:
+            return ttl
+    return DEFAULT_TTL
+
+
+class ContentCache:
+    """
+    In-memory store of extracted page content shared by websearch and scrape_url.
+
+    Entries are keyed by normalized URL, expire after their domain's TTL, and the
+    least recently used ones are evicted once the total text size exceeds
+    `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return {'url', 'title', 'content', 'fetched_at'} for a fresh entry, else None"""
+        key = cache_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry['fetched_at'] > ttl_for(url):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, url: str, title: str, content: str):
+        if not content:
+            return
+        key = cache_key(url)
+        entry = {
+            'url': url,
+            'title': title or '',
+            'content': content,
+            'fetched_at': time.time(),
+        }
+        size = len(content.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            entry['size'] = size
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, url: str):
+        with self._lock:
+            self._remove(cache_key(url))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry['size']
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Shared page-content store for websearch and scrape_url
+content_cache = ContentCache()
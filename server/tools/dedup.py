@@ -0,0 +1,126 @@
+import hashlib
+import re
+from typing import List, Dict, Tuple
+import numpy as np
+
+TOKEN_RE = re.compile(r'\w+')
+BITS = np.arange(64, dtype=np.uint64)
+
+# Pigeonhole banding: two hashes within 3 bits share at least one of 4 16-bit bands
+BANDS = 4
+BAND_BITS = 64 // BANDS
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash of the word shingles in `text`"""
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) < shingle_size:
+        shingles = [' '.join(tokens)] if tokens else []
+    else:
+        shingles = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    if not shingles:
+        return 0
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    # Column-wise vote: +1 where the bit is set, -1 where it is not
+    bits = ((hashes[:, None] >> BITS) & np.uint64(1)).astype(np.int32)
+    votes = bits.sum(axis=0) * 2 - len(shingles)
+    return int(sum(1 << i for i in range(64) if votes[i] > 0))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class _SimHashIndex:
+    """Banded index answering 'is there a stored hash within max_distance bits'"""
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self._bands = [dict() for _ in range(BANDS)]
+
+    def _keys(self, value: int):
+        mask = (1 << BAND_BITS) - 1
+        return [(value >> (i * BAND_BITS)) & mask for i in range(BANDS)]
+
+    def find(self, value: int):
+        for band, key in zip(self._bands, self._keys(value)):
+            for stored, payload in band.get(key, ()):
+                if hamming(stored, value) <= self.max_distance:
+                    return stored, payload
+        return None
+
+    def add(self, value: int, payload):
+        for band, key in zip(self._bands, self._keys(value)):
+            band.setdefault(key, []).append((value, payload))
+
+
+def dedupe_results(results: List[Dict], max_distance: int = 3, min_passage_words: int = 8, min_content_length: int = 100) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Collapse near-identical pages and passages across scraped results.
+
+    Pages whose SimHash is within `max_distance` bits of a better-ranked page are
+    dropped and listed under that page's `mirrors`. Paragraphs of at least
+    `min_passage_words` words that already appeared in a better-ranked result (or
+    earlier on the same page) are removed, and pages left with less than
+    `min_content_length` characters are dropped. Returns (results, merge report).
+    """
+    report = []
+    page_index = _SimHashIndex(max_distance)
+    kept = []
+    for result in results:
+        content = result.get('content', '')
+        fingerprint = simhash(content)
+        match = page_index.find(fingerprint) if fingerprint else None
+        if match is not None:
+            stored, original = match
+            original.setdefault('mirrors', []).append(result['url'])
+            report.append({
+                'type': 'page',
+                'url': result['url'],
+                'duplicate_of': original['url'],
+                'distance': hamming(stored, fingerprint),
+                'chars_removed': len(content)
+            })
+            continue
+        result = dict(result)
+        page_index.add(fingerprint, result)
+        kept.append(result)
+
+    passage_index = _SimHashIndex(max_distance)
+    deduped = []
+    for result in kept:
+        paragraphs = result.get('content', '').split('\n\n')
+        unique = []
+        removed = 0
+        for paragraph in paragraphs:
+            if len(TOKEN_RE.findall(paragraph)) < min_passage_words:
+                unique.append(paragraph)
+                continue
+            fingerprint = simhash(paragraph)
+            match = passage_index.find(fingerprint)
+            if match is not None:
+                removed += len(paragraph)
+                continue
+            passage_index.add(fingerprint, result['url'])
+            unique.append(paragraph)
+
+        if removed:
+            result['content'] = '\n\n'.join(unique).strip()
+            result['content_length'] = len(result['content'])
+            report.append({
+                'type': 'passages',
+                'url': result['url'],
+                'chars_removed': removed
+            })
+        # A page made up almost entirely of repeated passages adds nothing on its own
+        if removed and result['content_length'] < min_content_length:
+            report[-1]['type'] = 'page'
+            report[-1]['chars_removed'] += result['content_length']
+            continue
+        deduped.append(result)
+
+    return deduped, report
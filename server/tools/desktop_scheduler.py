@@ -0,0 +1,172 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, Hashable, Optional
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class DesktopTimeout(Exception):
+    """Raised when a desktop job did not finish within the caller's timeout"""
+
+
+class _Job:
+    def __init__(self, name: str, key: Optional[Hashable], fn, args, kwargs):
+        self.name = name
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued = time.monotonic()
+        self.waiters = 1
+
+
+class DesktopScheduler:
+    """
+    Single seat for everything that drives the real desktop.
+
+    Keystrokes, workspace switches and clipboard reads from different tools would
+    corrupt each other if they interleaved, so desktop jobs run one at a time on a
+    dedicated worker thread, highest priority first and FIFO within a priority.
+    Callers waiting on a job with the same key as one already queued or running
+    share its result instead of queueing a duplicate.
+
+    coalesce() offers the same sharing for work that does not need the seat,
+    such as scrapes served through the extension bridge.
+    """
+
+    def __init__(self, default_timeout: float = 60.0):
+        self.default_timeout = default_timeout
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._queued: Dict[Hashable, _Job] = {}
+        self._shared: Dict[Hashable, Future] = {}
+        self._running: Optional[_Job] = None
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {
+            'jobs': 0,
+            'coalesced': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0
+        }
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name='desktop-scheduler', daemon=True)
+            self._worker.start()
+
+    def _submit(self, name: str, fn, args, kwargs, key: Optional[Hashable], priority: int) -> _Job:
+        with self._cond:
+            if key is not None and key in self._queued:
+                job = self._queued[key]
+                job.waiters += 1
+                self.stats['coalesced'] += 1
+                print(f"Desktop scheduler: {name} joined an identical job already in flight")
+                return job
+            job = _Job(name, key, fn, args, kwargs)
+            if key is not None:
+                self._queued[key] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._ensure_worker()
+            self._cond.notify()
+            return job
+
+    def run(self, name: str, fn, *args, key: Optional[Hashable] = None, priority: int = PRIORITY_NORMAL,
+            timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run fn on the desktop seat and block until it is done, raising DesktopTimeout after `timeout` seconds"""
+        job = self._submit(name, fn, args, kwargs, key, priority)
+        timeout = self.default_timeout if timeout is None else timeout
+        try:
+            return job.future.result(timeout)
+        except FutureTimeout:
+            with self._cond:
+                self.stats['timeouts'] += 1
+                job.waiters -= 1
+                # Nobody is waiting for it any more, drop it unless it already started
+                if job.waiters <= 0 and job.future.cancel() and self._queued.get(key) is job:
+                    del self._queued[key]
+                depth = sum(1 for _, _, queued in self._heap if not queued.future.cancelled())
+            raise DesktopTimeout(f"{name} did not get through the desktop queue within {timeout:g}s ({depth} jobs queued)")
+
+    def coalesce(self, key: Hashable, fn, *args, **kwargs) -> Any:
+        """Run fn in the calling thread unless an identical call is in flight, then share its result"""
+        with self._cond:
+            future = self._shared.get(key)
+            owner = future is None
+            if owner:
+                future = self._shared[key] = Future()
+                future.set_running_or_notify_cancel()
+            else:
+                self.stats['coalesced'] += 1
+        if not owner:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._cond:
+                del self._shared[key]
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job = heapq.heappop(self._heap)
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._running = job
+                wait = time.monotonic() - job.enqueued
+                self.stats['jobs'] += 1
+                self.stats['total_wait'] += wait
+                self.stats['max_wait'] = max(self.stats['max_wait'], wait)
+            if wait > 1:
+                print(f"Desktop scheduler: {job.name} waited {wait:.1f}s for the desktop")
+
+            error = None
+            result = None
+            try:
+                result = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:
+                error = e
+
+            with self._cond:
+                self._running = None
+                if job.key is not None and self._queued.get(job.key) is job:
+                    del self._queued[job.key]
+                if error is not None:
+                    self.stats['errors'] += 1
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            queued = [job for _, _, job in sorted(self._heap) if not job.future.cancelled()]
+            return {
+                'queue_depth': len(queued),
+                'running': self._running.name if self._running else None,
+                'oldest_wait': round(now - min(job.enqueued for job in queued), 2) if queued else 0.0,
+                'avg_wait': round(self.stats['total_wait'] / self.stats['jobs'], 3) if self.stats['jobs'] else 0.0,
+                'shared_in_flight': len(self._shared),
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats.items()}
+            }
+
+
+# Shared seat for all desktop-automation tools
+desktop_scheduler = DesktopScheduler()
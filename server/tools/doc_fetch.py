@@ -0,0 +1,203 @@
+import asyncio
+import codecs
+import io
+import json
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+from urllib.parse import urlparse, unquote
+
+# PDFs need the whole file before anything can be read, text is decoded as it arrives
+MAX_PDF_BYTES = 25 * 1024 * 1024
+MAX_TEXT_BYTES = 5 * 1024 * 1024
+MAX_PDF_PAGES = 200
+EXTRACT_TIMEOUT = 30.0
+
+TEXT_TYPES = {'text/plain', 'text/markdown', 'text/x-markdown', 'text/csv', 'text/x-rst'}
+JSON_TYPES = {'application/json', 'application/ld+json', 'text/json'}
+GENERIC_TYPES = {'', 'application/octet-stream', 'binary/octet-stream'}
+DOCUMENT_SUFFIXES = {
+    '.pdf': 'pdf', '.txt': 'text', '.md': 'text', '.csv': 'text', '.rst': 'text', '.json': 'json'
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def document_kind(content_type: str, url: str = '', head: bytes = b'') -> Optional[str]:
+    """'pdf', 'text' or 'json' when the response is a document we read without a browser, else None"""
+    mime = content_type.split(';', 1)[0].strip().lower()
+    if mime == 'application/pdf' or head.startswith(b'%PDF-'):
+        return 'pdf'
+    if mime in JSON_TYPES or mime.endswith('+json'):
+        return 'json'
+    if mime in TEXT_TYPES:
+        return 'text'
+    # Servers often label downloads generically, trust the file name then
+    if mime in GENERIC_TYPES:
+        return DOCUMENT_SUFFIXES.get(os.path.splitext(urlparse(url).path)[1].lower())
+    return None
+
+
+def needs_peek(content_type: str) -> bool:
+    """Generically labelled responses may still be PDFs, worth a look at their first bytes"""
+    return content_type.split(';', 1)[0].strip().lower() in GENERIC_TYPES
+
+
+def url_looks_like_document(url: str) -> bool:
+    return os.path.splitext(urlparse(url).path)[1].lower() in DOCUMENT_SUFFIXES
+
+
+def _pdf_text(data: bytes) -> Dict[str, str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+
+    if PdfReader is not None:
+        reader = PdfReader(io.BytesIO(data), strict=False)
+        pages = []
+        for page in reader.pages[:MAX_PDF_PAGES]:
+            pages.append(page.extract_text() or '')
+        title = ''
+        try:
+            title = (reader.metadata.title or '') if reader.metadata else ''
+        except Exception:
+            pass
+        return {'title': str(title), 'content': '\n\n'.join(pages)}
+
+    # poppler's pdftotext is around on most desktops even without pypdf
+    if shutil.which('pdftotext'):
+        result = subprocess.run(
+            ['pdftotext', '-l', str(MAX_PDF_PAGES), '-layout', '-', '-'],
+            input=data, capture_output=True, timeout=EXTRACT_TIMEOUT
+        )
+        return {'title': '', 'content': result.stdout.decode('utf-8', errors='replace')}
+
+    raise RuntimeError("no PDF text extractor available, install pypdf or poppler's pdftotext")
+
+
+def extract_document(kind: str, data: bytes) -> Dict[str, str]:
+    """Runs in a worker process: turn a downloaded document into {'title', 'content'}"""
+    if kind == 'pdf':
+        return _pdf_text(data)
+    raise ValueError(f"no worker extraction for {kind}")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=2)
+        return _pool
+
+
+def _reset_pool():
+    # A worker died (e.g. a malformed PDF crashed the parser), start fresh next time
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class DocumentReader:
+    """
+    Accumulates a streamed document response under a byte cap.
+
+    Text and JSON are decoded incrementally as chunks arrive; PDFs are buffered
+    and handed to a worker process, so a large file never ties up the server's
+    event loop or tool threads.
+    """
+
+    def __init__(self, url: str, kind: str, encoding: Optional[str] = None):
+        self.url = url
+        self.kind = kind
+        self.size = 0
+        self.truncated = False
+        self._chunks = []
+        self._text = []
+        self._decoder = None
+        if kind != 'pdf':
+            try:
+                self._decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+            except LookupError:
+                self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    @property
+    def limit(self) -> int:
+        return MAX_PDF_BYTES if self.kind == 'pdf' else MAX_TEXT_BYTES
+
+    def feed(self, chunk: bytes) -> bool:
+        """Take the next chunk, False once the byte cap is reached and reading should stop"""
+        room = self.limit - self.size
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self.truncated = True
+        self.size += len(chunk)
+        if self._decoder is not None:
+            self._text.append(self._decoder.decode(chunk))
+        else:
+            self._chunks.append(chunk)
+        return not self.truncated
+
+    def _title_from_url(self) -> str:
+        return unquote(os.path.basename(urlparse(self.url).path)) or self.url
+
+    def _result(self, title: str, content: str) -> Dict[str, str]:
+        return {
+            'url': self.url,
+            'title': title or self._title_from_url(),
+            'content': content,
+            'kind': self.kind,
+            'bytes': self.size,
+            'truncated': self.truncated
+        }
+
+    def _text_result(self) -> Dict[str, str]:
+        self._text.append(self._decoder.decode(b'', final=True))
+        content = ''.join(self._text)
+        if self.kind == 'json' and not self.truncated:
+            try:
+                # Indented JSON reads (and passage-ranks) much better than one long line
+                content = json.dumps(json.loads(content), indent=1, ensure_ascii=False)
+            except ValueError:
+                pass
+        return self._result('', content)
+
+    def _pdf_check(self):
+        if self.truncated:
+            # The cross-reference table sits at the end, a cut-off PDF can't be read
+            raise ValueError(f"PDF is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB")
+
+    def extract(self) -> Dict[str, str]:
+        """Blocking extraction, for the sync tool threads"""
+        if self.kind != 'pdf':
+            return self._text_result()
+        self._pdf_check()
+        try:
+            extracted = _get_pool().submit(extract_document, self.kind, b''.join(self._chunks)).result(EXTRACT_TIMEOUT)
+        except BrokenProcessPool:
+            _reset_pool()
+            raise
+        return self._result(extracted['title'], extracted['content'])
+
+    async def aextract(self) -> Dict[str, str]:
+        """Same as extract() without blocking the event loop"""
+        if self.kind != 'pdf':
+            return self._text_result()
+        self._pdf_check()
+        loop = asyncio.get_running_loop()
+        try:
+            extracted = await asyncio.wait_for(
+                loop.run_in_executor(_get_pool(), extract_document, self.kind, b''.join(self._chunks)),
+                EXTRACT_TIMEOUT
+            )
+        except BrokenProcessPool:
+            _reset_pool()
+            raise
+        return self._result(extracted['title'], extracted['content'])
@@ -0,0 +1,219 @@
+import asyncio
+import itertools
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+BRIDGE_HOST = '127.0.0.1'
+BRIDGE_PORT = 8766
+
+# Large page content arrives as a series of chunk frames (256k characters
+# each from the extension), so a single frame stays well below this
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+
+# Only the extension may connect, not a web page that happens to know the port
+ALLOWED_ORIGINS = ('moz-extension://', 'chrome-extension://')
+
+
+class BridgeError(Exception):
+    """Raised when the extension is not connected, did not acknowledge, or reported an error"""
+
+
+class ExtensionBridge:
+    """
+    Local WebSocket channel to the browser extension.
+
+    The extension's background script connects to ws://127.0.0.1:8766 and keeps
+    the socket open. Each request carries an id; the extension acknowledges it
+    immediately and answers with a result (or error) under the same id once the
+    work is done, so callers wait on the browser rather than on fixed sleeps.
+
+    The server runs on its own thread and event loop so both the blocking
+    UI-automation tools (via request()) and async code (via arequest()) can use it.
+    Results too large for one frame are preceded by {'type': 'chunk', 'field',
+    'index', 'data'} messages which are joined back into that field of the result
+    in index order; a result missing any of its chunks fails with BridgeError.
+    Unsolicited {'type': 'event'} messages from the extension go to the handlers
+    registered with add_event_handler(), which get a synthetic
+    'bridge_disconnected' event when the extension goes away.
+    """
+
+    def __init__(self, host: str = BRIDGE_HOST, port: int = BRIDGE_PORT, ack_timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.ack_timeout = ack_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connection = None
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._event_handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self.stats = {'connections': 0, 'requests': 0, 'errors': 0, 'timeouts': 0}
+
+    def add_event_handler(self, handler: Callable[[Dict[str, Any]], None]):
+        """Call `handler(message)` on the bridge thread for every event the extension pushes"""
+        self._event_handlers.append(handler)
+
+    def _emit(self, message: Dict[str, Any]):
+        for handler in self._event_handlers:
+            try:
+                handler(message)
+            except Exception as e:
+                print(f"Extension bridge: event handler failed on {message.get('event')}: {e}")
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None
+
+    def start(self):
+        """Start the WebSocket server in the background, safe to call more than once"""
+        if self._thread is not None:
+            return self
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._serve(ready))
+
+        self._thread = threading.Thread(target=run, name='extension-bridge', daemon=True)
+        self._thread.start()
+        ready.wait(5)
+        return self
+
+    async def _serve(self, ready: threading.Event):
+        try:
+            async with serve(self._handle, self.host, self.port, max_size=MAX_MESSAGE_BYTES) as server:
+                print(f"Extension bridge: listening on ws://{self.host}:{self.port}")
+                ready.set()
+                await server.serve_forever()
+        except OSError as e:
+            print(f"Extension bridge: could not listen on {self.host}:{self.port}: {e}")
+            ready.set()
+
+    async def _handle(self, connection):
+        origin = connection.request.headers.get('Origin', '') if connection.request else ''
+        if not origin.startswith(ALLOWED_ORIGINS):
+            print(f"Extension bridge: rejected connection from origin {origin!r}")
+            await connection.close(1008, 'extension origin required')
+            return
+
+        # The newest connection wins, e.g. after the extension reloads
+        previous = self._connection
+        self._connection = connection
+        self.stats['connections'] += 1
+        print("Extension bridge: extension connected")
+        if previous is not None:
+            await previous.close(1000, 'replaced by a newer connection')
+
+        try:
+            async for message in connection:
+                try:
+                    self._dispatch(json.loads(message))
+                except (json.JSONDecodeError, TypeError) as e:
+                    print(f"Extension bridge: ignoring malformed message: {e}")
+        except ConnectionClosed:
+            pass
+        finally:
+            if self._connection is connection:
+                self._connection = None
+                print("Extension bridge: extension disconnected")
+                self._emit({'type': 'event', 'event': 'bridge_disconnected'})
+            for entry in list(self._pending.values()):
+                if entry['connection'] is connection and not entry['result'].done():
+                    entry['result'].set_exception(BridgeError("extension disconnected"))
+
+    def _dispatch(self, message: Dict[str, Any]):
+        if message.get('type') == 'event':
+            self._emit(message)
+            return
+        entry = self._pending.get(message.get('id'))
+        if entry is None:
+            return
+        if not entry['ack'].done():
+            entry['ack'].set_result(True)
+        if message.get('type') == 'chunk':
+            parts = entry['chunks'].setdefault(message.get('field'), {})
+            parts[message.get('index', len(parts))] = message.get('data') or ''
+        elif message.get('type') == 'result' and not entry['result'].done():
+            data = message.get('data')
+            if isinstance(data, dict):
+                counts = data.pop('chunk_counts', None) or {}
+                for field in data.pop('chunked_fields', None) or []:
+                    parts = entry['chunks'].pop(field, {})
+                    expected = counts.get(field, len(parts))
+                    missing = [index for index in range(expected) if index not in parts]
+                    if missing:
+                        # Half a page passed off as the whole page is worse than an error
+                        entry['result'].set_exception(BridgeError(
+                            f"{field} arrived incomplete, missing {len(missing)} of {expected} chunks"
+                        ))
+                        return
+                    data[field] = ''.join(parts[index] for index in range(expected))
+            entry['result'].set_result(message)
+
+    async def _request(self, action: str, params: Dict[str, Any], timeout: float) -> Any:
+        connection = self._connection
+        if connection is None:
+            raise BridgeError("extension is not connected")
+
+        request_id = next(self._ids)
+        loop = asyncio.get_running_loop()
+        entry = self._pending[request_id] = {
+            'connection': connection,
+            'ack': loop.create_future(),
+            'result': loop.create_future(),
+            'chunks': {}
+        }
+        self.stats['requests'] += 1
+        try:
+            await connection.send(json.dumps({'id': request_id, 'action': action, 'params': params}))
+            try:
+                await asyncio.wait_for(asyncio.shield(entry['ack']), self.ack_timeout)
+            except asyncio.TimeoutError:
+                raise BridgeError(f"extension did not acknowledge {action} within {self.ack_timeout:.1f}s")
+            try:
+                message = await asyncio.wait_for(entry['result'], timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                raise BridgeError(f"{action} timed out after {timeout:.1f}s")
+        except ConnectionClosed:
+            raise BridgeError("extension disconnected")
+        except BridgeError:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+        if not message.get('ok'):
+            self.stats['errors'] += 1
+            raise BridgeError(message.get('error') or f"{action} failed")
+        return message.get('data')
+
+    def request(self, action: str, timeout: float = 10.0, **params) -> Any:
+        """Send a request to the extension and block until it answers"""
+        if self._loop is None or not self.connected:
+            raise BridgeError("extension is not connected")
+        future = asyncio.run_coroutine_threadsafe(self._request(action, params, timeout), self._loop)
+        return future.result()
+
+    async def arequest(self, action: str, timeout: float = 10.0, **params) -> Any:
+        """Async variant of request() for code running on another event loop"""
+        if self._loop is None or not self.connected:
+            raise BridgeError("extension is not connected")
+        future = asyncio.run_coroutine_threadsafe(self._request(action, params, timeout), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def status(self) -> dict:
+        return {
+            'listening': self._thread is not None,
+            'connected': self.connected,
+            'pending': len(self._pending),
+            **self.stats
+        }
+
+
+# Shared bridge, started by main.py
+extension_bridge = ExtensionBridge()
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class HostBlocked(Exception):
+    """Raised when a host is blacklisted or backing off for longer than the caller will wait"""
+
+
+class _HostState:
+    def __init__(self, rate: float, burst: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.backoff_until = 0.0
+        self.backoff_seconds = 0.0
+        self.failures = []
+        self.blacklisted_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.timeouts = 0
+
+
+class FetchSlot:
+    """Handle for one scheduled fetch, used to report how it went"""
+
+    def __init__(self, scheduler, host: str):
+        self._scheduler = scheduler
+        self.host = host
+        self.outcome = None
+
+    def status(self, code: int, retry_after: Optional[str] = None):
+        """Report the HTTP status of the response"""
+        if code in (429, 503):
+            self.outcome = 'throttled'
+            self._scheduler._throttled(self.host, retry_after)
+        else:
+            self.outcome = 'ok'
+            self._scheduler._succeeded(self.host)
+
+    def timed_out(self):
+        """Report a timeout or a fetch that produced nothing usable"""
+        self.outcome = 'timeout'
+        self._scheduler._timed_out(self.host)
+
+
+class HostScheduler:
+    """
+    Politeness scheduler in front of every page fetch.
+
+    Each host gets at most `per_host_concurrency` fetches in flight and a token
+    bucket refilled at `rate` requests/second (bursting to `burst`). A 429/503
+    puts the host into exponential backoff (honoring Retry-After), and a host
+    that times out `blacklist_after` times within `failure_window` seconds is
+    refused outright for `blacklist_seconds`.
+
+    State is guarded by a thread lock so the async web tools and the blocking
+    UI-automation tools share the same view of every host.
+    """
+
+    def __init__(self, per_host_concurrency: int = 2, rate: float = 2.0, burst: int = 4,
+                 max_wait: float = 10.0, blacklist_after: int = 3, failure_window: float = 600.0,
+                 blacklist_seconds: float = 600.0, max_backoff: float = 120.0):
+        self.per_host_concurrency = per_host_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.blacklist_after = blacklist_after
+        self.failure_window = failure_window
+        self.blacklist_seconds = blacklist_seconds
+        self.max_backoff = max_backoff
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        host = urlparse(url).netloc.lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.rate, self.burst)
+        return state
+
+    def _try_reserve(self, host: str, max_wait: Optional[float] = None) -> float:
+        """Take a slot and a token for `host` and return 0, or return how long to wait"""
+        if max_wait is None:
+            max_wait = self.max_wait
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(host)
+            if state.blacklisted_until > now:
+                raise HostBlocked(f"{host} is blacklisted for another {state.blacklisted_until - now:.0f}s after repeated timeouts")
+            if state.backoff_until > now:
+                wait = state.backoff_until - now
+                if wait > max_wait:
+                    raise HostBlocked(f"{host} is rate limiting us, backing off for another {wait:.0f}s")
+                return wait
+
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+            state.updated = now
+            if state.in_flight >= self.per_host_concurrency:
+                return 0.05
+            if state.tokens < 1:
+                return (1 - state.tokens) / self.rate
+
+            state.tokens -= 1
+            state.in_flight += 1
+            state.requests += 1
+            return 0.0
+
+    def _release(self, host: str):
+        with self._lock:
+            self._state(host).in_flight -= 1
+
+    def _succeeded(self, host: str):
+        with self._lock:
+            state = self._state(host)
+            state.backoff_seconds = 0.0
+            state.failures.clear()
+
+    def _throttled(self, host: str, retry_after: Optional[str]):
+        with self._lock:
+            state = self._state(host)
+            state.throttled += 1
+            state.backoff_seconds = min(self.max_backoff, max(1.0, state.backoff_seconds * 2))
+            wait = state.backoff_seconds
+            if retry_after and retry_after.strip().isdigit():
+                wait = min(self.max_backoff, float(retry_after))
+            state.backoff_until = time.monotonic() + wait
+            print(f"Host scheduler: {host} throttled us, backing off {wait:.0f}s")
+
+    def _timed_out(self, host: str):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(host)
+            state.timeouts += 1
+            state.failures = [t for t in state.failures if now - t < self.failure_window] + [now]
+            if len(state.failures) >= self.blacklist_after:
+                state.blacklisted_until = now + self.blacklist_seconds
+                state.failures.clear()
+                print(f"Host scheduler: blacklisting {host} for {self.blacklist_seconds:.0f}s after repeated timeouts")
+
+    def _deadline_check(self, host: str, waited: float, wait: float, max_wait: Optional[float] = None):
+        if waited + wait > (self.max_wait if max_wait is None else max_wait):
+            raise HostBlocked(f"Timed out waiting {waited:.1f}s for a fetch slot on {host}")
+
+    @asynccontextmanager
+    async def slot(self, url: str, max_wait: Optional[float] = None):
+        """
+        Async context manager that waits for a polite fetch slot on the URL's host,
+        for up to `max_wait` seconds (the scheduler's default if None)
+        """
+        host = self.host_of(url)
+        waited = 0.0
+        while True:
+            wait = self._try_reserve(host, max_wait)
+            if wait == 0:
+                break
+            self._deadline_check(host, waited, wait, max_wait)
+            await asyncio.sleep(wait)
+            waited += wait
+        try:
+            yield FetchSlot(self, host)
+        finally:
+            self._release(host)
+
+    @contextmanager
+    def slot_sync(self, url: str, max_wait: Optional[float] = None):
+        """Blocking variant of slot() for the UI-automation tools"""
+        host = self.host_of(url)
+        waited = 0.0
+        while True:
+            wait = self._try_reserve(host, max_wait)
+            if wait == 0:
+                break
+            self._deadline_check(host, waited, wait, max_wait)
+            time.sleep(wait)
+            waited += wait
+        try:
+            yield FetchSlot(self, host)
+        finally:
+            self._release(host)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    'in_flight': state.in_flight,
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                    'timeouts': state.timeouts,
+                    'backoff_remaining': round(max(0.0, state.backoff_until - now), 1),
+                    'blacklisted_remaining': round(max(0.0, state.blacklisted_until - now), 1),
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+# Shared scheduler for all page fetches
+host_scheduler = HostScheduler()
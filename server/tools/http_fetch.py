@@ -0,0 +1,331 @@
+import re
+import time
+from html.parser import HTMLParser
+from html import unescape
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import httpx
+from tools.browser_pool import CONTEXT_OPTIONS
+from tools.host_scheduler import host_scheduler, HostBlocked
+from tools.doc_fetch import DocumentReader, document_kind, needs_peek
+
+# Elements that never contain readable content
+SKIP_TAGS = {
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'nav', 'header',
+    'footer', 'aside', 'form', 'iframe', 'object', 'embed', 'button', 'select'
+}
+
+# class/id tokens marking boilerplate, mirrors the selectors used in the browser path
+NOISE_TOKENS = {
+    'nav', 'menu', 'sidebar', 'advertisement', 'ad', 'ads', 'popup', 'modal',
+    'cookie', 'gdpr', 'newsletter', 'social', 'share', 'comment', 'comments',
+    'related', 'banner', 'promotion', 'widget'
+}
+
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'table', 'tr',
+    'pre', 'blockquote', 'dd', 'dt', 'dl', 'figcaption', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6'
+}
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+}
+
+MAIN_TAGS = {'article', 'main'}
+
+# Empty mount points left behind by client-side rendered apps
+SPA_SHELL = re.compile(r'<div[^>]+id=["\'](root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>', re.I)
+NEEDS_JS = re.compile(r'(enable|requires?) javascript|javascript is (disabled|required)', re.I)
+
+MAX_HTML_BYTES = 5 * 1024 * 1024
+MIN_CONTENT_LENGTH = 100
+
+# Remember for each domain which tier produced content, so later visits skip straight to it
+TIER_TTL = 24 * 3600
+domain_tiers: Dict[str, Dict] = {}
+
+_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+
+
+class _ContentExtractor(HTMLParser):
+    """Single-pass HTML to text extractor that drops boilerplate subtrees"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.title = ''
+        self.main_regions = []
+        self._stack = []
+        self._skip = 0
+        self._in_title = False
+
+    def _is_noise(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            return True
+        for name, value in attrs:
+            if name in ('class', 'id') and value:
+                if any(token in NOISE_TOKENS for token in value.lower().split()):
+                    return True
+            if name == 'aria-hidden' and value == 'true':
+                return True
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._in_title = True
+            return
+        if tag in VOID_TAGS:
+            if tag in ('br', 'hr') and not self._skip:
+                self.parts.append('\n')
+            return
+
+        skip = self._is_noise(tag, attrs)
+        is_main = not skip and (tag in MAIN_TAGS or ('role', 'main') in attrs)
+        self._stack.append((tag, skip, len(self.parts) if is_main else None))
+        if skip:
+            self._skip += 1
+        elif tag in BLOCK_TAGS and not self._skip:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+            return
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        # Pop up to the matching tag, tolerating unclosed children
+        while self._stack:
+            open_tag, skip, main_start = self._stack.pop()
+            if skip:
+                self._skip -= 1
+            if main_start is not None:
+                self.main_regions.append((main_start, len(self.parts)))
+            if open_tag == tag:
+                break
+        if tag in BLOCK_TAGS and not self._skip:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        # Prefer the largest article/main region when it holds substantial content
+        best = ''
+        for start, end in self.main_regions:
+            region = ''.join(self.parts[start:end])
+            if len(region) > len(best):
+                best = region
+        if len(best.strip()) > 500:
+            return best
+        return ''.join(self.parts)
+
+
+def extract_html(html: str) -> Dict[str, str]:
+    """Extract the title and readable text from an HTML document"""
+    parser = _ContentExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        print(f"HTML extraction error: {e}")
+    return {
+        'title': ' '.join(unescape(parser.title).split()),
+        'content': parser.text()
+    }
+
+
+def looks_js_rendered(html: str, text: str) -> bool:
+    """Heuristic: the static HTML is an app shell that needs a browser to render"""
+    if len(text.strip()) < MIN_CONTENT_LENGTH:
+        return True
+    if SPA_SHELL.search(html) and len(text.strip()) < 1000:
+        return True
+    return len(text.strip()) < 1000 and bool(NEEDS_JS.search(text))
+
+
+def domain_of(url: str) -> str:
+    """Lower-cased host without a leading www., the key for per-domain memory"""
+    domain = urlparse(url).netloc.lower()
+    return domain[4:] if domain.startswith('www.') else domain
+
+
+def preferred_tier(url: str) -> Optional[str]:
+    """Return 'http' or 'browser' if a recent visit to this domain settled it"""
+    entry = domain_tiers.get(domain_of(url))
+    if entry is None or time.time() - entry['updated'] > TIER_TTL:
+        return None
+    return entry['tier']
+
+
+def record_tier(url: str, tier: str):
+    domain_tiers[domain_of(url)] = {'tier': tier, 'updated': time.time()}
+
+
+def _client_options() -> Dict:
+    headers = dict(CONTEXT_OPTIONS['extra_http_headers'])
+    headers['User-Agent'] = CONTEXT_OPTIONS['user_agent']
+    headers.pop('Connection', None)
+    return {
+        'headers': headers,
+        'follow_redirects': True,
+        'verify': False,
+        'timeout': httpx.Timeout(8.0, connect=4.0),
+        'limits': httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0)
+    }
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled HTTP client, keeps connections alive between tool calls"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(**_client_options())
+    return _client
+
+
+def get_sync_http_client() -> httpx.Client:
+    """Blocking counterpart of get_http_client() for the sync tool threads"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+async def _read_document(response: httpx.Response, content_type: str) -> Optional[DocumentReader]:
+    """Stream a PDF, text or JSON response into a DocumentReader, None if it is none of those"""
+    url = str(response.url)
+    chunks = response.aiter_bytes()
+    head = b''
+    kind = document_kind(content_type, url)
+    if kind is None and needs_peek(content_type):
+        head = await anext(chunks, b'')
+        kind = document_kind(content_type, url, head)
+    if kind is None:
+        return None
+    reader = DocumentReader(url, kind, response.charset_encoding)
+    if reader.feed(head):
+        async for chunk in chunks:
+            if not reader.feed(chunk):
+                break
+    return reader
+
+
+def _read_document_sync(response: httpx.Response, content_type: str) -> Optional[DocumentReader]:
+    url = str(response.url)
+    chunks = response.iter_bytes()
+    head = b''
+    kind = document_kind(content_type, url)
+    if kind is None and needs_peek(content_type):
+        head = next(chunks, b'')
+        kind = document_kind(content_type, url, head)
+    if kind is None:
+        return None
+    reader = DocumentReader(url, kind, response.charset_encoding)
+    if reader.feed(head):
+        for chunk in chunks:
+            if not reader.feed(chunk):
+                break
+    return reader
+
+
+def fetch_document(url: str, slot) -> Optional[Dict[str, str]]:
+    """
+    Blocking check whether `url` is a PDF, text or JSON document and if so read it.
+
+    HTML responses are dropped right after the headers, so the browser path only
+    loses one round trip. Returns {'url', 'title', 'content', 'kind', 'bytes',
+    'truncated'} or None.
+    """
+    try:
+        with get_sync_http_client().stream('GET', url, timeout=httpx.Timeout(5.0, connect=3.0)) as response:
+            # Report every answer, a 429 or 503 here has to back the host off too
+            slot.status(response.status_code, response.headers.get('retry-after'))
+            content_type = response.headers.get('content-type', '')
+            if response.status_code >= 400 or 'html' in content_type:
+                return None
+            reader = _read_document_sync(response, content_type)
+    except (httpx.HTTPError, UnicodeDecodeError) as e:
+        print(f"Document check for {url} failed: {e}")
+        return None
+    if reader is None:
+        return None
+    try:
+        return reader.extract()
+    except Exception as e:
+        print(f"Could not extract {reader.kind} document {url}: {e}")
+        return None
+
+
+async def fetch_static(url: str) -> Optional[Dict[str, str]]:
+    """
+    Fetch a page over plain HTTP and extract its main content in Python.
+
+    PDF, plain text and JSON responses are streamed under a byte cap and
+    extracted off the event loop instead (see doc_fetch), with 'kind', 'bytes'
+    and 'truncated' added to the result.
+    
+    Returns {'url', 'title', 'content', 'truncated'} or None when the page is
+    some other type, failed to load, or looks like it needs JavaScript to render.
+    """
+    client = get_http_client()
+    document = None
+    truncated = False
+    try:
+        async with host_scheduler.slot(url) as slot:
+            try:
+                async with client.stream('GET', url) as response:
+                    slot.status(response.status_code, response.headers.get('retry-after'))
+                    if response.status_code >= 400:
+                        print(f"HTTP tier: {url} returned {response.status_code}")
+                        return None
+                    content_type = response.headers.get('content-type', '')
+                    if 'html' not in content_type:
+                        document = await _read_document(response, content_type)
+                        if document is None:
+                            return None
+                    else:
+                        chunks = []
+                        size = 0
+                        async for chunk in response.aiter_bytes():
+                            chunks.append(chunk)
+                            size += len(chunk)
+                            if size > MAX_HTML_BYTES:
+                                truncated = True
+                                break
+                        encoding = response.encoding or 'utf-8'
+                        html = b''.join(chunks).decode(encoding, errors='replace')
+            except httpx.TimeoutException as e:
+                slot.timed_out()
+                print(f"HTTP tier: timed out fetching {url}: {e}")
+                return None
+    except HostBlocked as e:
+        print(f"HTTP tier: skipping {url}: {e}")
+        return None
+    except (httpx.HTTPError, UnicodeDecodeError, LookupError) as e:
+        print(f"HTTP tier: error fetching {url}: {e}")
+        return None
+
+    # Documents are extracted after the connection and host slot are released
+    if document is not None:
+        try:
+            return await document.aextract()
+        except Exception as e:
+            print(f"HTTP tier: could not extract {document.kind} document {url}: {e}")
+            return None
+
+    extracted = extract_html(html)
+    if looks_js_rendered(html, extracted['content']):
+        print(f"HTTP tier: {url} looks JS-rendered, escalating to browser")
+        return None
+
+    return {
+        'url': str(response.url),
+        'title': extracted['title'],
+        'content': extracted['content'],
+        'truncated': truncated
+    }
@@ -0,0 +1,330 @@
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Optional
+from tools.circuit_breaker import breakers, CircuitOpen
+
+# Events that make a cached query stale. Focus and title churn is ignored on
+# purpose, nothing here depends on it.
+INVALIDATES = {
+    'clients': {
+        'openwindow', 'closewindow', 'movewindow', 'movewindowv2',
+        'moveworkspace', 'moveworkspacev2'
+    },
+    'activeworkspace': {
+        'workspace', 'workspacev2', 'focusedmon', 'focusedmonv2',
+        'renameworkspace', 'destroyworkspace', 'destroyworkspacev2',
+        'moveworkspace', 'moveworkspacev2'
+    },
+    'monitors': {
+        'workspace', 'workspacev2', 'focusedmon', 'focusedmonv2',
+        'activespecial', 'activespecialv2', 'monitoradded', 'monitoraddedv2',
+        'monitorremoved', 'monitorremovedv2'
+    },
+}
+
+# Don't retry a missing event socket on every lookup
+RECONNECT_INTERVAL = 5.0
+
+# What a query or dispatch raises: compositor unreachable, hyprctl failed, or its breaker is open
+HYPRLAND_ERRORS = (CircuitOpen, OSError, subprocess.CalledProcessError)
+
+
+class ZenWindowMissing(Exception):
+    """No Zen browser window to drive, with the reason"""
+
+
+class HyprlandIPC:
+    """
+    Talks to Hyprland over its UNIX sockets instead of spawning hyprctl.
+
+    Queries go to .socket.sock ('j/clients' etc.), several dispatches are sent
+    as one [[BATCH]] request, and a listener on .socket2.sock marks cached
+    query results stale when a relevant event arrives, so between events a
+    lookup is just a dict read. Without the sockets (not running under
+    Hyprland, or an unusual setup) everything falls back to the hyprctl CLI.
+    Queries and dispatches go through the 'hyprland' circuit breaker, so once
+    the compositor is unreachable callers get CircuitOpen right away.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, Any] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._listening = False
+        self._last_connect_attempt = 0.0
+        self.stats = {'queries': 0, 'cache_hits': 0, 'dispatches': 0, 'events': 0, 'cli_fallbacks': 0}
+
+    @staticmethod
+    def socket_path(name: str) -> Optional[str]:
+        signature = os.environ.get('HYPRLAND_INSTANCE_SIGNATURE')
+        if not signature:
+            return None
+        runtime_dir = os.environ.get('XDG_RUNTIME_DIR', f'/run/user/{os.getuid()}')
+        # Newer Hyprland keeps its sockets under $XDG_RUNTIME_DIR, older under /tmp
+        for base in (os.path.join(runtime_dir, 'hypr'), '/tmp/hypr'):
+            path = os.path.join(base, signature, name)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _send(self, path: str, command: str) -> str:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(2.0)
+            sock.connect(path)
+            sock.sendall(command.encode('utf-8'))
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return b''.join(chunks).decode('utf-8', errors='replace')
+
+    def _guarded(self, fn, *args):
+        hypr = breakers['hyprland']
+        hypr.allow()
+        try:
+            result = fn(*args)
+        except FileNotFoundError:
+            hypr.record_failure("no Hyprland socket and hyprctl is not installed", fatal=True)
+            raise
+        except Exception as e:
+            hypr.record_failure(e)
+            raise
+        except BaseException:
+            hypr.release()
+            raise
+        hypr.record_success()
+        return result
+
+    def query(self, name: str) -> Any:
+        """Run a JSON query such as 'clients', 'activeworkspace' or 'monitors', always fresh"""
+        return self._guarded(self._query, name)
+
+    def _query(self, name: str) -> Any:
+        self.stats['queries'] += 1
+        path = self.socket_path('.socket.sock')
+        if path is not None:
+            return json.loads(self._send(path, f'j/{name}'))
+        self.stats['cli_fallbacks'] += 1
+        result = subprocess.run(['hyprctl', name, '-j'], capture_output=True, text=True, check=True)
+        return json.loads(result.stdout)
+
+    def cached(self, name: str) -> Any:
+        """Like query(), but served from the event-invalidated cache while the event socket is up"""
+        self._ensure_listener()
+        with self._lock:
+            if self._listening and name in self._cache:
+                self.stats['cache_hits'] += 1
+                return self._cache[name]
+            generation = self._generation
+        value = self.query(name)
+        with self._lock:
+            # Only keep it if no event arrived while we were asking
+            if self._listening and self._generation == generation:
+                self._cache[name] = value
+        return value
+
+    def dispatch(self, *commands: str):
+        """Run dispatchers like 'workspace 3' or 'togglespecialworkspace magic' in one round trip"""
+        commands = [command for command in commands if command]
+        if not commands:
+            return
+        self._guarded(self._dispatch, commands)
+
+    def _dispatch(self, commands):
+        self.stats['dispatches'] += 1
+        # Our own dispatches move things around before the events reach us
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+        path = self.socket_path('.socket.sock')
+        if path is not None:
+            reply = self._send(path, '[[BATCH]]' + ';'.join(f'dispatch {command}' for command in commands))
+            if 'ok' not in reply:
+                print(f"Hyprland dispatch {commands} replied: {reply.strip()}")
+            return
+        self.stats['cli_fallbacks'] += 1
+        # check=True so a failed dispatch counts against the breaker instead of passing as success
+        subprocess.run(['hyprctl', '--batch', ' ; '.join(f'dispatch {command}' for command in commands)], capture_output=True, check=True)
+
+    def _ensure_listener(self):
+        if self._listening:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._listening or now - self._last_connect_attempt < RECONNECT_INTERVAL:
+                return
+            self._last_connect_attempt = now
+        path = self.socket_path('.socket2.sock')
+        if path is None:
+            return
+        try:
+            events = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            events.connect(path)
+        except OSError as e:
+            print(f"Hyprland event socket unavailable, lookups won't be cached: {e}")
+            return
+        with self._lock:
+            self._cache.clear()
+            self._listening = True
+        self._listener = threading.Thread(target=self._listen, args=(events,), name='hyprland-events', daemon=True)
+        self._listener.start()
+
+    def _listen(self, events: socket.socket):
+        buffer = b''
+        try:
+            with events:
+                while True:
+                    chunk = events.recv(65536)
+                    if not chunk:
+                        break
+                    buffer += chunk
+                    *lines, buffer = buffer.split(b'\n')
+                    for line in lines:
+                        self._handle_event(line.decode('utf-8', errors='replace').split('>>', 1)[0])
+        except OSError as e:
+            print(f"Hyprland event socket error: {e}")
+        finally:
+            with self._lock:
+                self._listening = False
+                self._cache.clear()
+                self._generation += 1
+
+    def _handle_event(self, event: str):
+        self.stats['events'] += 1
+        with self._lock:
+            stale = [name for name, triggers in INVALIDATES.items() if event in triggers]
+            if stale:
+                self._generation += 1
+                for name in stale:
+                    self._cache.pop(name, None)
+
+    def status(self) -> dict:
+        return {
+            'socket': self.socket_path('.socket.sock') is not None,
+            'listening': self._listening,
+            'cached': sorted(self._cache),
+            **self.stats
+        }
+
+
+# Shared client for every tool that touches the compositor
+hyprland = HyprlandIPC()
+
+
+def get_hyprland_clients():
+    """Get all client windows from Hyprland"""
+    try:
+        return hyprland.cached('clients')
+    except HYPRLAND_ERRORS as e:
+        print(f"Error getting Hyprland clients: {e}")
+        return []
+    except json.JSONDecodeError as e:
+        print(f"Error parsing JSON: {e}")
+        return []
+
+
+def find_zen_workspace():
+    """Find workspace containing window with class 'zen'"""
+    clients = get_hyprland_clients()
+    
+    zen_windows = []
+    
+    for client in clients:
+        # Check if the window class contains 'zen' (case-insensitive)
+        if 'zen' in client.get('class', '').lower():
+            workspace_id = client.get('workspace', {}).get('id', 'Unknown')
+            workspace_name = client.get('workspace', {}).get('name', 'Unknown')
+            
+            zen_windows.append({
+                'title': client.get('title', 'Unknown'),
+                'class': client.get('class', 'Unknown'),
+                'workspace_id': workspace_id,
+                'workspace_name': workspace_name
+            })
+    
+    return zen_windows
+
+
+def require_zen_window():
+    """The first Zen browser window, recorded on the zen_window breaker; raises ZenWindowMissing if there is none"""
+    zen_windows = find_zen_workspace()
+    if not zen_windows:
+        # An unreachable compositor isn't a missing window, its own breaker has that
+        if breakers['hyprland'].failures:
+            raise ZenWindowMissing(f"Could not query Hyprland: {breakers['hyprland'].last_error}")
+        breakers['zen_window'].record_failure("no Zen browser window is open")
+        raise ZenWindowMissing("No Zen browser window found")
+    breakers['zen_window'].record_success()
+    return zen_windows[0]
+
+
+def current_workspace():
+    """Get the current workspace info (handles both regular and special workspaces)"""
+    try:
+        # Always get the regular active workspace first
+        workspace_data = hyprland.cached('activeworkspace')
+        regular_workspace = {
+            'id': workspace_data.get('id', 1),
+            'name': workspace_data.get('name', '1'),
+            'is_special': False
+        }
+        
+        # Then check if we're in a special workspace by checking the monitor
+        monitors_data = hyprland.cached('monitors')
+        
+        # Check the first monitor's special workspace
+        if monitors_data and len(monitors_data) > 0:
+            special_workspace = monitors_data[0].get('specialWorkspace', {})
+            if special_workspace.get('name') is not None and special_workspace.get('name') != "":
+                return {
+                    'id': special_workspace.get('id', -1),
+                    'name': special_workspace.get('name', ''),
+                    'is_special': True,
+                    'underlying_workspace': regular_workspace  # Store the regular workspace underneath
+                }
+        
+        # If not in special workspace, return regular workspace
+        return regular_workspace
+        
+    except HYPRLAND_ERRORS + (json.JSONDecodeError, KeyError, IndexError) as e:
+        print(f"Error getting current workspace: {e}")
+        return {'id': 1, 'name': '1', 'is_special': False}
+
+
+def workspace_dispatch(workspace_info):
+    """Dispatcher that switches to the workspace (handles both regular and special workspaces)"""
+    if workspace_info.get('is_special', False):
+        # For special workspaces, use the name
+        return f"togglespecialworkspace {workspace_info['name'].replace('special:', '')}"
+    # For regular workspaces, use the ID
+    return f"workspace {workspace_info['id']}"
+
+
+def switch_to_workspace(workspace_info):
+    """Switch to workspace (handles both regular and special workspaces)"""
+    hyprland.dispatch(workspace_dispatch(workspace_info))
+
+
+def get_workspace_info(workspace_data):
+    """Convert workspace data to consistent format"""
+    if isinstance(workspace_data, dict):
+        workspace_name = workspace_data.get('name', str(workspace_data.get('id', 1)))
+        return {
+            'id': workspace_data.get('id'),
+            'name': workspace_name,
+            'is_special': workspace_name.startswith('special:')
+        }
+    else:
+        # Handle case where workspace_data might be just an ID
+        return {
+            'id': workspace_data,
+            'name': str(workspace_data),
+            'is_special': False
+        }
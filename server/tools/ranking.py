@@ -0,0 +1,115 @@
+import re
+from typing import List, Dict
+import numpy as np
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def split_passages(text: str, target_chars: int = 800) -> List[str]:
+    """Split cleaned page text into passages of roughly `target_chars`, on paragraph boundaries"""
+    passages = []
+    current = []
+    size = 0
+    for paragraph in text.split('\n\n'):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        # Very long paragraphs are cut on sentence boundaries
+        while len(paragraph) > target_chars * 2:
+            cut = paragraph.rfind('. ', 0, target_chars * 2) + 1
+            if cut <= target_chars // 2:
+                cut = paragraph.rfind(' ', 0, target_chars * 2)
+            if cut <= target_chars // 2:
+                cut = target_chars * 2
+            if current:
+                passages.append('\n\n'.join(current))
+                current, size = [], 0
+            passages.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        current.append(paragraph)
+        size += len(paragraph)
+        if size >= target_chars:
+            passages.append('\n\n'.join(current))
+            current, size = [], 0
+    if current:
+        passages.append('\n\n'.join(current))
+    return passages
+
+
+def bm25_scores(query: str, passages: List[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """Score every passage against the query with Okapi BM25, vectorized over passages"""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not passages:
+        return np.zeros(len(passages))
+
+    term_index = {term: i for i, term in enumerate(terms)}
+    tf = np.zeros((len(passages), len(terms)), dtype=np.float32)
+    lengths = np.zeros(len(passages), dtype=np.float32)
+    for row, passage in enumerate(passages):
+        tokens = tokenize(passage)
+        lengths[row] = len(tokens)
+        for token in tokens:
+            col = term_index.get(token)
+            if col is not None:
+                tf[row, col] += 1
+
+    n = len(passages)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    avg_length = lengths.mean() or 1.0
+    norm = k1 * (1 - b + b * lengths / avg_length)
+    return ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+def rank_results(query: str, results: List[Dict], per_result_chars: int = 4000, total_chars: int = 20000) -> List[Dict]:
+    """
+    Replace each result's full content with its passages most relevant to the query.
+
+    Passages from all results are scored together so IDF reflects the whole result
+    set, then each result keeps its best passages (in page order) up to
+    `per_result_chars`, and results are filled best-first up to `total_chars`.
+    """
+    passages = []
+    owners = []
+    for i, result in enumerate(results):
+        for passage in split_passages(result.get('content', '')):
+            passages.append(passage)
+            owners.append(i)
+    if not passages:
+        return results
+
+    scores = bm25_scores(query, passages)
+    owners = np.array(owners)
+
+    # Allocate the total budget to the best passages overall, respecting per-result caps
+    used = [0] * len(results)
+    kept = [[] for _ in results]
+    remaining = total_chars
+    for idx in np.argsort(-scores, kind='stable'):
+        owner = owners[idx]
+        size = len(passages[idx])
+        if used[owner] + size > per_result_chars or size > remaining:
+            continue
+        kept[owner].append(int(idx))
+        used[owner] += size
+        remaining -= size
+        if remaining <= 0:
+            break
+
+    ranked = []
+    for i, result in enumerate(results):
+        if not kept[i]:
+            continue
+        chosen = sorted(kept[i])
+        ranked_result = dict(result)
+        ranked_result['content'] = '\n\n'.join(passages[idx] for idx in chosen)
+        ranked_result['content_length'] = len(ranked_result['content'])
+        ranked_result['original_length'] = len(result.get('content', ''))
+        ranked_result['passage_scores'] = [round(float(scores[idx]), 3) for idx in chosen]
+        ranked_result['relevance'] = round(float(max(scores[idx] for idx in chosen)), 3)
+        ranked.append(ranked_result)
+    return ranked
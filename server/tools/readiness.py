@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from tools.http_fetch import domain_of
+
+# How long the main-content text length has to hold still before a page counts as ready
+STABLE_SECONDS = 0.5
+# Shorter window once a domain's learned readiness time has passed
+FAST_STABLE_SECONDS = 0.15
+# Never accept a known domain before this share of its learned time
+NOT_BEFORE_SHARE = 0.8
+POLL_INTERVAL = 0.1
+HARD_CAP = 12.0
+
+# Same main-content lookup as the extension's content script; textContent
+# is cheap, it doesn't force a layout like innerText
+MAIN_TEXT_LENGTH_JS = """
+() => {
+    const selectors = ['main', 'article', '[role="main"]', '.main-content', '#main-content',
+                       '.content', '#content', '.post-content', '.article-content', '.entry-content'];
+    for (const selector of selectors) {
+        const element = document.querySelector(selector);
+        if (element) return element.textContent.length;
+    }
+    return document.body ? document.body.textContent.length : 0;
+}
+"""
+
+
+class ReadinessTracker:
+    """
+    Learns, per domain, how long pages take until their main text stops changing.
+
+    Each ready page records the moment its text length last changed, folded into
+    a moving average. A domain with history is not accepted before most of that
+    time has passed (so an SPA's loading skeleton doesn't pass as content), and
+    after it only needs a short stable window, so known-fast sites return almost
+    as soon as their text is there.
+    """
+
+    def __init__(self, alpha: float = 0.3, max_domains: int = 2000):
+        self.alpha = alpha
+        self.max_domains = max_domains
+        self._learned: 'OrderedDict[str, Dict[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'ready': 0, 'capped': 0}
+
+    def expected(self, url: str) -> Optional[float]:
+        """Learned seconds until the page's text settles, None for an unknown domain"""
+        with self._lock:
+            entry = self._learned.get(domain_of(url))
+            return entry['seconds'] if entry else None
+
+    def plan(self, url: str) -> Tuple[float, float]:
+        """(not_before, stable_window) in seconds for a page on this domain"""
+        expected = self.expected(url)
+        if expected is None:
+            return 0.0, STABLE_SECONDS
+        return expected * NOT_BEFORE_SHARE, FAST_STABLE_SECONDS
+
+    def record(self, url: str, seconds: float):
+        domain = domain_of(url)
+        with self._lock:
+            entry = self._learned.pop(domain, None)
+            if entry is None:
+                entry = {'seconds': seconds, 'samples': 0}
+            else:
+                entry['seconds'] += self.alpha * (seconds - entry['seconds'])
+            entry['samples'] += 1
+            self._learned[domain] = entry
+            while len(self._learned) > self.max_domains:
+                self._learned.popitem(last=False)
+            self.stats['ready'] += 1
+
+    def watch(self, url: str, cap: float = HARD_CAP) -> 'StabilityWatch':
+        return StabilityWatch(self, url, cap)
+
+    def status(self) -> dict:
+        with self._lock:
+            slowest = sorted(self._learned.items(), key=lambda item: item[1]['seconds'], reverse=True)[:5]
+            return {
+                'domains': len(self._learned),
+                'slowest': {domain: round(entry['seconds'], 2) for domain, entry in slowest},
+                **self.stats
+            }
+
+
+class StabilityWatch:
+    """Takes text-length samples for one page load and says when it has settled"""
+
+    def __init__(self, tracker: ReadinessTracker, url: str, cap: float):
+        self.tracker = tracker
+        self.url = url
+        self.cap = cap
+        self.not_before, self.stable_window = tracker.plan(url)
+        self.started = time.monotonic()
+        self.changed_at = self.started
+        self.length = -1
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def expired(self) -> bool:
+        return self.elapsed >= self.cap
+
+    def sample(self, length: int) -> bool:
+        """Feed the current main-text length, True once the page counts as ready"""
+        now = time.monotonic()
+        if length != self.length:
+            self.length = length
+            self.changed_at = now
+            return False
+        return (
+            length > 0
+            and now - self.started >= self.not_before
+            and now - self.changed_at >= self.stable_window
+        )
+
+    def finish(self, ready: bool) -> Dict:
+        ready_seconds = self.changed_at - self.started
+        if ready:
+            self.tracker.record(self.url, ready_seconds)
+        else:
+            self.tracker.stats['capped'] += 1
+        return {
+            'ready': ready,
+            'seconds': round(self.elapsed, 2),
+            'ready_seconds': round(ready_seconds, 2),
+            'length': max(self.length, 0)
+        }
+
+
+def wait_until_stable_sync(url: str, probe: Callable[[], int], cap: float = HARD_CAP, interval: float = POLL_INTERVAL) -> Dict:
+    """Poll `probe()` for the main-text length until it settles or `cap` seconds pass"""
+    watch = readiness.watch(url, cap)
+    while True:
+        if watch.sample(probe()):
+            return watch.finish(True)
+        if watch.expired:
+            return watch.finish(False)
+        time.sleep(interval)
+
+
+async def wait_until_stable(page, url: str, cap: float = HARD_CAP, interval: float = POLL_INTERVAL) -> Dict:
+    """Async variant for a Playwright page, measuring with MAIN_TEXT_LENGTH_JS"""
+    watch = readiness.watch(url, cap)
+    while True:
+        try:
+            length = await page.evaluate(MAIN_TEXT_LENGTH_JS)
+        except Exception:
+            # The document is still being swapped in
+            length = 0
+        if watch.sample(length):
+            return watch.finish(True)
+        if watch.expired:
+            return watch.finish(False)
+        await asyncio.sleep(interval)
+
+
+# Shared across websearch, scrape_url and the extension's background tabs
+readiness = ReadinessTracker()
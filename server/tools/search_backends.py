@@ -0,0 +1,262 @@
+import asyncio
+import os
+import time
+from html.parser import HTMLParser
+from typing import List, Dict, Optional, Callable, Awaitable
+from urllib.parse import urlparse, parse_qs, urljoin
+from tools.content_cache import cache_key
+from tools.http_fetch import get_http_client
+from tools.circuit_breaker import breaker, CircuitOpen
+
+DUCKDUCKGO_HTML_URL = os.environ.get('WEBSEARCH_DUCKDUCKGO_HTML_URL', 'https://html.duckduckgo.com/html/')
+SEARXNG_URL = os.environ.get('WEBSEARCH_SEARXNG_URL')
+
+# Reciprocal rank fusion constant, 60 is the usual choice
+RRF_K = 60
+
+# Consecutive failed searches (errors, timeouts or no results) before a backend is
+# skipped, and for how long
+BACKEND_FAILURE_THRESHOLD = 3
+BACKEND_COOLDOWN = 60.0
+
+
+class SearchBackend:
+    """
+    A search engine websearch can fan out to.
+
+    Subclasses implement search(), returning [{'url', 'title', 'snippet'}] in
+    rank order and optionally handing each link to `on_link` as soon as it is
+    known. `budget` is the latency budget in seconds for one search.
+    A `fallback` backend is only asked when the others came back empty.
+    """
+
+    name = 'backend'
+    fallback = False
+
+    def __init__(self, budget: float = 8.0):
+        self.budget = budget
+
+    async def search(self, query: str, max_links: int, on_link: Optional[Callable[[Dict], Awaitable[None]]] = None) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+
+class _DuckDuckGoHTMLParser(HTMLParser):
+    """Pulls result links and snippets out of the DuckDuckGo HTML endpoint"""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.results = []
+        self._capture = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'a' and 'result__a' in classes:
+            self.results.append({'url': self._resolve(attrs.get('href', '')), 'title': '', 'snippet': ''})
+            self._capture = 'title'
+        elif 'result__snippet' in classes and self.results:
+            self._capture = 'snippet'
+
+    def handle_endtag(self, tag):
+        if tag in ('a', 'div', 'td'):
+            self._capture = None
+
+    def handle_data(self, data):
+        if self._capture and self.results:
+            self.results[-1][self._capture] += data
+
+    def _resolve(self, href: str) -> str:
+        # Result links go through a redirect carrying the target in `uddg`
+        url = urljoin(self.base_url, href)
+        target = parse_qs(urlparse(url).query).get('uddg')
+        return target[0] if target else url
+
+
+class DuckDuckGoHTMLBackend(SearchBackend):
+    """DuckDuckGo's no-JS HTML endpoint over the shared HTTP client, no browser needed"""
+
+    name = 'duckduckgo_html'
+
+    def __init__(self, url: str = DUCKDUCKGO_HTML_URL, budget: float = 5.0):
+        super().__init__(budget)
+        self.url = url
+
+    async def search(self, query, max_links, on_link=None):
+        response = await get_http_client().get(self.url, params={'q': query})
+        response.raise_for_status()
+        parser = _DuckDuckGoHTMLParser(str(response.url))
+        parser.feed(response.text)
+
+        links = []
+        for result in parser.results:
+            result = {key: ' '.join(value.split()) if key != 'url' else value for key, value in result.items()}
+            # Ads redirect through duckduckgo.com itself
+            if 'duckduckgo.com' in urlparse(result['url']).netloc:
+                continue
+            links.append(result)
+            if on_link is not None:
+                await on_link(result)
+            if len(links) >= max_links:
+                break
+        return links
+
+
+class BrowserDuckDuckGoBackend(SearchBackend):
+    """The full DuckDuckGo page in a pooled browser context, streams links as they render"""
+
+    name = 'duckduckgo_browser'
+    # A browser context per search is only worth it when the HTML endpoint fails us
+    fallback = True
+
+    def __init__(self, budget: float = 10.0):
+        super().__init__(budget)
+
+    async def search(self, query, max_links, on_link=None):
+        # Imported here, websearch itself depends on this module
+        from tools.websearch import _search_duckduckgo_ultra_fast
+        from tools.browser_pool import browser_pool
+
+        async with browser_pool.context() as context:
+            return await _search_duckduckgo_ultra_fast(context, query, max_links, on_link=on_link)
+
+
+class SearxngBackend(SearchBackend):
+    """A SearXNG instance (or a local stand-in) via its JSON API"""
+
+    name = 'searxng'
+
+    def __init__(self, url: str, budget: float = 5.0):
+        super().__init__(budget)
+        self.url = url.rstrip('/') + '/search'
+
+    async def search(self, query, max_links, on_link=None):
+        response = await get_http_client().get(self.url, params={'q': query, 'format': 'json'})
+        response.raise_for_status()
+        links = []
+        for result in response.json().get('results', [])[:max_links]:
+            link = {
+                'url': result.get('url', ''),
+                'title': result.get('title', ''),
+                'snippet': result.get('content', '')
+            }
+            if not link['url']:
+                continue
+            links.append(link)
+            if on_link is not None:
+                await on_link(link)
+        return links
+
+
+def default_backends(use_duckduckgo: bool = True) -> List[SearchBackend]:
+    """Backends a websearch fans out to, SearXNG only when WEBSEARCH_SEARXNG_URL is set.
+    The browser backend is a fallback for when the HTTP ones find nothing."""
+    backends = []
+    if use_duckduckgo:
+        backends += [DuckDuckGoHTMLBackend(DUCKDUCKGO_HTML_URL), BrowserDuckDuckGoBackend()]
+    if SEARXNG_URL:
+        backends.append(SearxngBackend(SEARXNG_URL))
+    return backends
+
+
+def reciprocal_rank_fusion(ranked_lists: List[tuple], max_links: int, k: int = RRF_K) -> List[Dict[str, str]]:
+    """Merge (backend name, links) lists by normalized URL, scored by sum of 1 / (k + rank)"""
+    merged = {}
+    for name, links in ranked_lists:
+        for rank, link in enumerate(links, start=1):
+            key = cache_key(link['url'])
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = dict(link, backends=[], rrf_score=0.0)
+            elif not entry.get('snippet') and link.get('snippet'):
+                entry['snippet'] = link['snippet']
+            if name not in entry['backends']:
+                entry['backends'].append(name)
+                entry['rrf_score'] += 1.0 / (k + rank)
+
+    fused = sorted(merged.values(), key=lambda entry: entry['rrf_score'], reverse=True)
+    for entry in fused:
+        entry['rrf_score'] = round(entry['rrf_score'], 5)
+    return fused[:max_links]
+
+
+async def fan_out_search(query: str, max_links: int, backends: List[SearchBackend], on_link: Optional[Callable[[Dict], Awaitable[None]]] = None, is_valid: Callable[[str], bool] = None, on_ranked: Optional[Callable[[List[Dict[str, str]]], None]] = None) -> List[Dict[str, str]]:
+    """
+    Query every backend concurrently, each within its own latency budget.
+
+    The first `max_links` distinct valid links are handed to `on_link` as soon as
+    any backend produces them, so scraping never waits on the slowest engine.
+    The returned list is the rank-fused merge of everything that came back;
+    `on_ranked` gets the merge so far each time another backend answers, so a
+    caller that stops waiting early still has the fused order of what arrived.
+    
+    Each backend has a circuit breaker: one that keeps failing or coming back
+    empty (markup change, rate limit) is skipped for a cooldown instead of
+    burning its budget on every call. If every backend is skipped this way,
+    CircuitOpen is raised with their reasons.
+
+    Fallback backends only run once the others are done and produced no links,
+    whether they failed, came back empty or were skipped.
+    """
+    streamed = set()
+
+    async def emit(link):
+        if not link.get('url') or (is_valid and not is_valid(link['url'])):
+            return
+        key = cache_key(link['url'])
+        if key in streamed or len(streamed) >= max_links:
+            return
+        streamed.add(key)
+        if on_link is not None:
+            await on_link(link)
+
+    skipped = []
+    finished = []
+
+    async def run(backend):
+        start = time.monotonic()
+        backend_breaker = breaker(f'search:{backend.name}', failure_threshold=BACKEND_FAILURE_THRESHOLD, cooldown=BACKEND_COOLDOWN)
+        try:
+            backend_breaker.allow()
+        except CircuitOpen as e:
+            print(f"Search backend {backend.name}: skipped, {e}")
+            skipped.append(str(e))
+            return backend.name, []
+        try:
+            links = await asyncio.wait_for(backend.search(query, max_links, on_link=emit), backend.budget)
+        except asyncio.TimeoutError:
+            print(f"Search backend {backend.name}: over its {backend.budget:.1f}s budget, dropped")
+            backend_breaker.record_failure(f"over its {backend.budget:.1f}s budget")
+            return backend.name, []
+        except asyncio.CancelledError:
+            backend_breaker.release()
+            raise
+        except Exception as e:
+            # One broken engine must not sink the others
+            print(f"Search backend {backend.name}: failed: {e}")
+            backend_breaker.record_failure(e)
+            return backend.name, []
+        links = [link for link in links if link.get('url') and (not is_valid or is_valid(link['url']))]
+        print(f"Search backend {backend.name}: {len(links)} links in {time.monotonic() - start:.2f}s")
+        # An engine that answers with nothing is usually blocking us or changed its markup
+        if links:
+            backend_breaker.record_success()
+        else:
+            backend_breaker.record_failure("returned no results")
+        for link in links:
+            await emit(link)
+        if links and on_ranked is not None:
+            finished.append((backend.name, links))
+            on_ranked(reciprocal_rank_fusion(finished, max_links))
+        return backend.name, links
+
+    primary = [backend for backend in backends if not backend.fallback]
+    fallbacks = [backend for backend in backends if backend.fallback]
+    ranked_lists = list(await asyncio.gather(*(run(backend) for backend in primary)))
+    if fallbacks and not any(links for _, links in ranked_lists):
+        if primary:
+            print(f"Search: no links from {', '.join(backend.name for backend in primary)}, trying fallbacks")
+        ranked_lists += await asyncio.gather(*(run(backend) for backend in fallbacks))
+    if backends and len(skipped) == len(backends):
+        raise CircuitOpen("all search backends are unavailable: " + '; '.join(skipped))
+    return reciprocal_rank_fusion(ranked_lists, max_links)
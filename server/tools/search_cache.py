@@ -0,0 +1,138 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Optional
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'what', 'when', 'where', 'which',
+    'who', 'why', 'with',
+}
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially reworded searches share a cache key
+
+    Lowercases, strips punctuation, collapses whitespace, drops stopwords and
+    sorts the remaining terms so word order does not matter. Falls back to the
+    full token list if the query is made up of stopwords only.
+    """
+    tokens = re.findall(r'\w+', (query or '').lower())
+    terms = [t for t in tokens if t not in STOPWORDS] or tokens
+    return ' '.join(sorted(terms))
+
+
+class SearchCache:
+    """
+    On-disk cache of search result lists keyed by normalized query.
+
+    Entries expire after `ttl` seconds, and once more than `max_entries` are
+    stored the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str = "search_cache.db", ttl: float = 6 * 3600, max_entries: int = 2000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS serp_cache (
+                    key TEXT NOT NULL,
+                    engine TEXT NOT NULL,
+                    requested INTEGER NOT NULL,
+                    results TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (key, engine)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS serp_cache_lru ON serp_cache (last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, query: str, max_links: int, engine: str = 'duckduckgo') -> Optional[List[Dict[str, str]]]:
+        """Return cached results for the query, or None on a miss or expired entry"""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT requested, results, created_at FROM serp_cache WHERE key = ? AND engine = ?",
+                (key, engine)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            requested, results, created_at = row
+            if now - created_at > self.ttl:
+                db.execute("DELETE FROM serp_cache WHERE key = ? AND engine = ?", (key, engine))
+                db.commit()
+                self.misses += 1
+                return None
+
+            # A shorter cached list only satisfies requests it was fetched for
+            results = json.loads(results)
+            if len(results) < max_links and requested < max_links:
+                self.misses += 1
+                return None
+
+            db.execute(
+                "UPDATE serp_cache SET last_access = ? WHERE key = ? AND engine = ?",
+                (now, key, engine)
+            )
+            db.commit()
+            self.hits += 1
+            return results[:max_links]
+
+    def put(self, query: str, max_links: int, results: List[Dict[str, str]], engine: str = 'duckduckgo'):
+        """Store a result list, evicting least recently used entries over the size cap"""
+        if not results:
+            return
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO serp_cache (key, engine, requested, results, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, engine, max_links, json.dumps(results), now, now)
+            )
+            db.execute("DELETE FROM serp_cache WHERE created_at < ?", (now - self.ttl,))
+            db.execute(
+                "DELETE FROM serp_cache WHERE rowid IN ("
+                "SELECT rowid FROM serp_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            db.commit()
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM serp_cache")
+            db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db().execute("SELECT COUNT(*) FROM serp_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Shared SERP cache for the websearch tools
+search_cache = SearchCache()
@@ -0,0 +1,81 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from tools.extension_bridge import extension_bridge
+
+
+class TabIndex:
+    """
+    Live view of the browser's tabs, kept current by events the extension pushes.
+
+    The extension sends a full 'tabs_snapshot' when it connects and whenever tabs
+    are created, removed or reordered, and small 'tab_updated', 'tab_activated'
+    and 'window_focused' events in between. Listing tabs or matching a URL is
+    then a walk over an in-memory dict, with no round trip to the browser.
+    """
+
+    def __init__(self):
+        self._tabs: Dict[int, Dict[str, Any]] = {}
+        self._focused_window: Optional[int] = None
+        self._lock = threading.Lock()
+        self.ready = False
+        self.updated = 0.0
+        self.stats = {'snapshots': 0, 'events': 0}
+
+    def handle_event(self, message: Dict[str, Any]):
+        event = message.get('event')
+        with self._lock:
+            self.stats['events'] += 1
+            if event == 'tabs_snapshot':
+                self._tabs = {tab['tab_id']: tab for tab in message.get('tabs', [])}
+                self._focused_window = message.get('focused_window_id')
+                self.ready = True
+                self.stats['snapshots'] += 1
+            elif event == 'tab_updated':
+                tab = message['tab']
+                self._tabs[tab['tab_id']] = {**self._tabs.get(tab['tab_id'], {}), **tab}
+            elif event == 'tab_activated':
+                for tab in self._tabs.values():
+                    if tab.get('window_id') == message.get('window_id'):
+                        tab['active'] = tab['tab_id'] == message.get('tab_id')
+            elif event == 'window_focused':
+                self._focused_window = message.get('window_id')
+            elif event == 'bridge_disconnected':
+                # Nothing keeps it current any more
+                self._tabs.clear()
+                self.ready = False
+            else:
+                return
+            self.updated = time.time()
+
+    def listing(self) -> Dict[str, Any]:
+        """Tabs of the focused window in the same shape as the extension's Ctrl+E payload, plus browser tab ids"""
+        with self._lock:
+            window = self._focused_window
+            tabs = sorted(
+                (tab for tab in self._tabs.values() if tab.get('window_id') == window and not tab.get('hidden')),
+                key=lambda tab: tab.get('index', 0)
+            )
+        current_tab = None
+        other_tabs = []
+        for number, tab in enumerate(tabs, start=1):
+            info = {'id': number, 'tab_id': tab['tab_id'], 'title': tab.get('title', ''), 'url': tab.get('url', '')}
+            if tab.get('active') and current_tab is None:
+                current_tab = info
+            else:
+                other_tabs.append(info)
+        return {'current_tab': current_tab, 'other_tabs': other_tabs}
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'tabs': len(self._tabs),
+                'seconds_since_update': round(time.time() - self.updated, 1) if self.updated else None,
+                **self.stats
+            }
+
+
+# Shared index, fed by the extension bridge
+tab_index = TabIndex()
+extension_bridge.add_event_handler(tab_index.handle_event)
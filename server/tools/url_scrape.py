@@ -1,109 +1,42 @@
-import subprocess
+import asyncio
 import json
 import pyperclip
 import time
 import re
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from urllib.parse import urlparse
 from html.parser import HTMLParser
 from html import unescape
+from tools.content_cache import content_cache, cache_key
+from tools.host_scheduler import host_scheduler, HostBlocked
+from tools.extension_bridge import extension_bridge, BridgeError
+from tools.hyprland_ipc import (
+    hyprland, require_zen_window, current_workspace, workspace_dispatch,
+    switch_to_workspace, get_workspace_info, ZenWindowMissing, HYPRLAND_ERRORS
+)
+from tools.tab_index import tab_index
+from tools.desktop_scheduler import desktop_scheduler, DesktopTimeout
+from tools.readiness import readiness, wait_until_stable_sync
+from tools.http_fetch import fetch_document
+from tools.content_budget import MAX_CALL_CHARS
+from tools.circuit_breaker import ensure_available, guarded_run, CircuitOpen
 
-def get_hyprland_clients():
-    """Get all client windows from Hyprland"""
-    try:
-        result = subprocess.run(['hyprctl', 'clients', '-j'], 
-                              capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error getting Hyprland clients: {e}")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Error parsing JSON: {e}")
-        return []
+# How long the extension may take to load a freshly opened tab
+PAGE_LOAD_TIMEOUT = 15.0
 
-def find_zen_workspace():
-    """Find workspace containing window with class 'zen'"""
-    clients = get_hyprland_clients()
-    
-    zen_windows = []
-    
-    for client in clients:
-        # Check if the window class contains 'zen' (case-insensitive)
-        if 'zen' in client.get('class', '').lower():
-            workspace_id = client.get('workspace', {}).get('id', 'Unknown')
-            workspace_name = client.get('workspace', {}).get('name', 'Unknown')
-            
-            zen_windows.append({
-                'title': client.get('title', 'Unknown'),
-                'class': client.get('class', 'Unknown'),
-                'workspace_id': workspace_id,
-                'workspace_name': workspace_name
-            })
-    
-    return zen_windows
+# One scraped page may use a whole websearch call's text budget, cut in the page itself
+MAX_SCRAPE_CHARS = MAX_CALL_CHARS
 
-def current_workspace():
-    """Get the current workspace info (handles both regular and special workspaces)"""
-    try:
-        # Always get the regular active workspace first
-        current_workspace = subprocess.run(['hyprctl', 'activeworkspace', '-j'],
-                                         capture_output=True, text=True, check=True)
-        workspace_data = json.loads(current_workspace.stdout)
-        regular_workspace = {
-            'id': workspace_data.get('id', 1),
-            'name': workspace_data.get('name', '1'),
-            'is_special': False
-        }
-        
-        # Then check if we're in a special workspace by checking the monitor
-        monitor_result = subprocess.run(['hyprctl', 'monitors', '-j'],
-                                      capture_output=True, text=True, check=True)
-        monitors_data = json.loads(monitor_result.stdout)
-        
-        # Check the first monitor's special workspace
-        if monitors_data and len(monitors_data) > 0:
-            special_workspace = monitors_data[0].get('specialWorkspace', {})
-            if special_workspace.get('name') is not None and special_workspace.get('name') != "":
-                return {
-                    'id': special_workspace.get('id', -1),
-                    'name': special_workspace.get('name', ''),
-                    'is_special': True,
-                    'underlying_workspace': regular_workspace  # Store the regular workspace underneath
-                }
-        
-        # If not in special workspace, return regular workspace
-        return regular_workspace
-        
-    except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError, IndexError) as e:
-        print(f"Error getting current workspace: {e}")
-        return {'id': 1, 'name': '1', 'is_special': False}
+# Hard cap on waiting for a tab opened by keystrokes to settle
+KEYSTROKE_READY_CAP = 10.0
+# Without the bridge every readiness probe is a Ctrl+G and a clipboard read, keep them sparse
+KEYSTROKE_PROBE_INTERVAL = 0.75
 
-def switch_to_workspace(workspace_info):
-    """Switch to workspace (handles both regular and special workspaces)"""
-    if workspace_info.get('is_special', False):
-        # For special workspaces, use the name
-        workspace_name = workspace_info['name']
-        subprocess.run(['hyprctl', 'dispatch', 'togglespecialworkspace', workspace_name.replace('special:', '')])
-    else:
-        # For regular workspaces, use the ID
-        workspace_id = workspace_info['id']
-        subprocess.run(['hyprctl', 'dispatch', 'workspace', str(workspace_id)])
+# A keystroke scrape takes ~6s, leave room for a few queued ahead of it
+DESKTOP_SCRAPE_TIMEOUT = 60.0
 
-def get_workspace_info(workspace_data):
-    """Convert workspace data to consistent format"""
-    if isinstance(workspace_data, dict):
-        workspace_name = workspace_data.get('name', str(workspace_data.get('id', 1)))
-        return {
-            'id': workspace_data.get('id'),
-            'name': workspace_name,
-            'is_special': workspace_name.startswith('special:')
-        }
-    else:
-        # Handle case where workspace_data might be just an ID
-        return {
-            'id': workspace_data,
-            'name': str(workspace_data),
-            'is_special': False
-        }
+# A same-host scrape may hold the host's slot for a whole bridge page load
+HOST_SLOT_WAIT = PAGE_LOAD_TIMEOUT + 5
 
 def normalize_url(url):
     """Normalize URL for comparison by removing protocol and www"""
@@ -113,10 +46,53 @@ def normalize_url(url):
         domain = domain[4:]
     return domain + parsed.path
 
+def copy_page_data(wait: float = 1.0) -> str:
+    """Press Ctrl+G and return the page JSON the extension copies, or '' if nothing arrived within `wait` seconds"""
+    pyperclip.copy("")
+    guarded_run('wtype', ['wtype', '-M', 'ctrl', '-k', 'g'])
+    deadline = time.monotonic() + wait
+    while True:
+        page_json = pyperclip.paste()
+        if page_json or time.monotonic() >= deadline:
+            return page_json
+        time.sleep(0.05)
+
+def _content_length(page_json: str) -> int:
+    try:
+        return len(json.loads(page_json).get('content') or '')
+    except (json.JSONDecodeError, AttributeError):
+        return 0
+
+def _wait_for_new_tab(url: str) -> str:
+    """Wait for a tab opened by keystrokes to settle and return its copied page JSON"""
+    if extension_bridge.connected:
+        # Ask the extension for the text length, no keystrokes until the page is ready
+        def probe():
+            try:
+                return extension_bridge.request('content_length', timeout=2.0)['length']
+            except (BridgeError, KeyError, TypeError):
+                return 0
+
+        readiness_info = wait_until_stable_sync(url, probe, cap=KEYSTROKE_READY_CAP, interval=0.2)
+        page_json = None
+    else:
+        # Keep copying the page until its text stops changing, instead of a fixed sleep
+        copied = {'json': ''}
+
+        def probe():
+            copied['json'] = copy_page_data()
+            return _content_length(copied['json'])
+
+        readiness_info = wait_until_stable_sync(url, probe, cap=KEYSTROKE_READY_CAP, interval=KEYSTROKE_PROBE_INTERVAL)
+        page_json = copied['json']
+    print(f"Page text settled after {readiness_info['ready_seconds']}s" if readiness_info['ready']
+          else f"Page still changing after {KEYSTROKE_READY_CAP:.0f}s, using what was there")
+    return copy_page_data() if page_json is None else page_json
+
 def get_all_tabs():
     """Get all tabs by pressing Ctrl+E and parsing the JSON response"""
     # Press Ctrl+E to get tab information
-    subprocess.run(['wtype', '-M', 'ctrl', '-k', 'e'])
+    guarded_run('wtype', ['wtype', '-M', 'ctrl', '-k', 'e'])
     time.sleep(0.3)  # Give the extension time to copy to clipboard
     
     # Get the clipboard content
@@ -132,27 +108,39 @@ def get_all_tabs():
         return {'current_tab': None, 'other_tabs': []}
 
 def find_matching_tab(target_url, tabs):
-    """Find a tab that matches the target URL (only check tabs with id <= 8)"""
+    """
+    Find a tab that matches the target URL. Tabs listed with a browser tab_id
+    can be reached by id through the extension, the rest only via Ctrl+1..8.
+    """
     target_normalized = normalize_url(target_url)
     
+    def reachable(tab, default_id):
+        return tab.get('tab_id') is not None or tab.get('id', default_id) <= 8
+    
     # Check current tab
     if tabs.get('current_tab') and tabs['current_tab'].get('url'):
         current_tab = tabs['current_tab']
-        if current_tab.get('id', 1) <= 8 and normalize_url(current_tab['url']) == target_normalized:
-            return {'type': 'current', 'id': current_tab['id']}
+        if reachable(current_tab, 1) and normalize_url(current_tab['url']) == target_normalized:
+            return {'type': 'current', 'id': current_tab['id'], 'tab_id': current_tab.get('tab_id')}
     
-    # Check other tabs (only those with id <= 8)
+    # Check other tabs
     for tab in tabs.get('other_tabs', []):
-        if tab.get('id', 9) <= 8 and tab.get('url') and normalize_url(tab['url']) == target_normalized:
-            return {'type': 'other', 'id': tab['id']}
+        if reachable(tab, 9) and tab.get('url') and normalize_url(tab['url']) == target_normalized:
+            return {'type': 'other', 'id': tab['id'], 'tab_id': tab.get('tab_id')}
     
     return None
 
+def list_tabs():
+    """Tabs of the focused browser window, from the pushed tab index when it is live"""
+    if tab_index.ready:
+        return tab_index.listing()
+    return extension_bridge.request('list_tabs')
+
 def switch_to_tab(tab_id):
     """Switch to a specific tab using Ctrl+number"""
     if 1 <= tab_id <= 8:
         # Use Ctrl+1 through Ctrl+8 to switch tabs
-        subprocess.run(['wtype', '-M', 'ctrl', '-k', str(tab_id)])
+        guarded_run('wtype', ['wtype', '-M', 'ctrl', '-k', str(tab_id)])
         time.sleep(0.2)
         return True
     return False
@@ -220,19 +208,194 @@ def format_extracted_content(extracted_data):
     else:
         return str(extracted_data)
 
-def scrape_url(url: str) -> str:
+class ScrapeError(Exception):
+    """Raised when a URL could not be scraped, the message is shown to the model as is"""
+
+def scrape_page(url: str, bypass_cache: bool = False, tabs=None) -> dict:
+    """
+    Scrape a URL and return the extension's page data {'tab_number', 'title', 'url', 'content'}.
+    
+    `tabs` is an already fetched tab listing to match against, so callers scraping
+    many URLs only ask the extension once. Raises ScrapeError on failure.
+    """
+    # Serve recently extracted content without touching the browser at all
+    if not bypass_cache:
+        cached = content_cache.get(url)
+        if cached is not None:
+            print(f"Content cache hit for {url}")
+            return {
+                'tab_number': 'cached',
+                'title': cached['title'],
+                'url': cached['url'],
+                'content': cached['content']
+            }
+    
+    # Two callers asking for the same page share one scrape
+    return desktop_scheduler.coalesce(('scrape_url', cache_key(url)), _scrape_uncached, url, tabs)
+
+def _scrape_uncached(url: str, tabs=None) -> dict:
+    try:
+        # Respect per-host limits and skip hosts that keep failing. The slot is
+        # only held while fetching, never while queued for the desktop
+        with host_scheduler.slot_sync(url, max_wait=HOST_SLOT_WAIT) as slot:
+            # PDFs, text and JSON are downloaded and extracted directly, no tab needed.
+            # A URL already open in a tab is read from there, without the extra request
+            known_tabs = tabs if tabs is not None else (tab_index.listing() if tab_index.ready else None)
+            if known_tabs is None or find_matching_tab(url, known_tabs) is None:
+                document = fetch_document(url, slot)
+                if document is not None and document['content'].strip():
+                    print(f"Extracted {len(document['content'])} characters from {document['kind']} document {url}")
+                    page_data = {'tab_number': 'document', **document}
+                    _remember_page(url, page_data, slot)
+                    return page_data
+            # Talk to the extension directly when it is connected, keystrokes otherwise
+            if extension_bridge.connected:
+                try:
+                    return _scrape_url_via_bridge(url, slot, tabs)
+                except BridgeError as e:
+                    print(f"Extension bridge failed for {url}, falling back to keystrokes: {e}")
+        # Keystrokes drive the real desktop, wait for the single seat unless
+        # something it needs is known to be down
+        ensure_available('hyprland', 'wtype', 'zen_window')
+        return desktop_scheduler.run('scrape_url', _scrape_url_on_desktop, url, timeout=DESKTOP_SCRAPE_TIMEOUT)
+    except HostBlocked as e:
+        raise ScrapeError(f"Skipped {url}: {e}")
+    except DesktopTimeout as e:
+        raise ScrapeError(f"Gave up on {url}: {e}")
+    except CircuitOpen as e:
+        raise ScrapeError(f"Can't scrape {url} through the desktop: {e}")
+
+def _scrape_url_on_desktop(url: str) -> dict:
+    """Desktop queue job: take the host's slot once the seat is ours, then scrape with keystrokes"""
+    with host_scheduler.slot_sync(url, max_wait=HOST_SLOT_WAIT) as slot:
+        try:
+            return _scrape_url_in_browser(url, slot)
+        except HYPRLAND_ERRORS as e:
+            # Workspace switches and wtype fail mid-scrape when the compositor goes away
+            raise ScrapeError(f"Can't scrape {url} through the desktop: {e}")
+
+def scrape_url(url: str, bypass_cache: bool = False) -> str:
     """Main function to scrape URL content using Zen browser"""
     if not url:
         return "No URL provided"
+    try:
+        return parse_page_data(scrape_page(url, bypass_cache))
+    except ScrapeError as e:
+        return str(e)
+
+async def scrape_urls(urls: List[str], bypass_cache: bool = False, max_parallel: int = 4, on_result: Optional[Callable[[Dict, int, int], Awaitable[None]]] = None, executor=None) -> Dict[str, Any]:
+    """
+    Scrape several URLs at once with at most `max_parallel` in flight.
+    
+    Each URL gets its own entry with a status ('ok', 'empty' or 'error'), timing
+    and content, in the order given. `on_result(result, completed, total)` is
+    awaited as each one finishes. Open tabs are listed once and reused.
+    """
+    start_time = time.monotonic()
+    loop = asyncio.get_running_loop()
+    urls = [u for u in dict.fromkeys(u.strip() for u in urls) if u]
+    
+    tabs = None
+    if tab_index.ready:
+        tabs = tab_index.listing()
+    elif extension_bridge.connected:
+        try:
+            tabs = await extension_bridge.arequest('list_tabs')
+        except BridgeError as e:
+            print(f"Could not list tabs, every URL will be opened fresh: {e}")
+    
+    semaphore = asyncio.Semaphore(max_parallel)
     
+    async def scrape_one(index, url):
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                page = await loop.run_in_executor(executor, scrape_page, url, bypass_cache, tabs)
+                content = re.sub(r'\s+', ' ', (page.get('content') or '').strip())
+                result = {
+                    'url': url,
+                    'status': 'ok' if content else 'empty',
+                    'title': page.get('title', ''),
+                    'final_url': page.get('url', url),
+                    'content': content,
+                    'content_length': len(content),
+                    'cached': page.get('tab_number') == 'cached'
+                }
+                if page.get('extract_ms') is not None:
+                    result['extract_ms'] = page['extract_ms']
+                if page.get('kind'):
+                    result['kind'] = page['kind']
+            except ScrapeError as e:
+                result = {'url': url, 'status': 'error', 'error': str(e)}
+            except Exception as e:
+                print(f"Unexpected error scraping {url}: {e}")
+                result = {'url': url, 'status': 'error', 'error': f"Unexpected error: {e}"}
+            result['seconds'] = round(time.monotonic() - started, 2)
+            return index, result
+    
+    results = [None] * len(urls)
+    completed = 0
+    for next_done in asyncio.as_completed([scrape_one(i, url) for i, url in enumerate(urls)]):
+        index, result = await next_done
+        results[index] = result
+        completed += 1
+        print(f"Scraped {completed}/{len(urls)}: {result['url']} ({result['status']}, {result['seconds']}s)")
+        if on_result is not None:
+            await on_result(result, completed, len(urls))
+    
+    return {
+        'total_urls': len(urls),
+        'succeeded': sum(1 for r in results if r['status'] == 'ok'),
+        'failed': sum(1 for r in results if r['status'] == 'error'),
+        'elapsed_seconds': round(time.monotonic() - start_time, 2),
+        'results': results
+    }
+
+def _remember_page(url: str, page_data, slot):
+    """Report how the scrape went and cache the extracted page for later scrapes and websearch results"""
+    if isinstance(page_data, dict) and page_data.get('content'):
+        slot.status(200)
+        content_cache.put(url, page_data.get('title', ''), page_data['content'])
+    else:
+        slot.timed_out()
+
+def _scrape_url_via_bridge(url: str, slot, tabs=None) -> dict:
+    """Extract the URL through the extension bridge, in a hidden background tab unless it is already open"""
+    if tabs is None:
+        tabs = list_tabs()
+    matching_tab = find_matching_tab(url, tabs)
+    
+    if matching_tab is not None and matching_tab.get('tab_id') is not None:
+        print(f"Found matching tab: {matching_tab}")
+        page_data = extension_bridge.request('extract_tab', tab_id=matching_tab['tab_id'], max_chars=MAX_SCRAPE_CHARS)
+    else:
+        # Opened, awaited until its text settles, extracted and closed by the
+        # extension without taking focus
+        not_before, stable_window = readiness.plan(url)
+        page_data = extension_bridge.request(
+            'scrape_in_background', timeout=PAGE_LOAD_TIMEOUT + 3, url=url,
+            timeout_ms=int(PAGE_LOAD_TIMEOUT * 1000),
+            stable_ms=int(stable_window * 1000), not_before_ms=int(not_before * 1000),
+            max_chars=MAX_SCRAPE_CHARS
+        )
+        if page_data.get('timed_out'):
+            print(f"{url} was still changing after {PAGE_LOAD_TIMEOUT:.0f}s, extracted what was there")
+        elif page_data.get('ready_ms') is not None:
+            readiness.record(url, page_data['ready_ms'] / 1000)
+    
+    print(f"Extracted {len(page_data.get('content', ''))} characters via extension bridge in {page_data.get('extract_ms', '?')}ms")
+    _remember_page(url, page_data, slot)
+    return page_data
+
+def _scrape_url_in_browser(url: str, slot) -> dict:
+    """Drive the Zen browser to load the URL and copy its content through the extension"""
     # Get workspace information
-    zen_windows = find_zen_workspace()
+    try:
+        zen_workspace_data = require_zen_window()
+    except ZenWindowMissing as e:
+        raise ScrapeError(str(e))
     current_workspace_info = current_workspace()
     
-    if not zen_windows:
-        return "No Zen browser window found"
-    
-    zen_workspace_data = zen_windows[0]
     zen_workspace_info = get_workspace_info({
         'id': zen_workspace_data['workspace_id'],
         'name': zen_workspace_data['workspace_name']
@@ -248,11 +411,12 @@ def scrape_url(url: str) -> str:
     current_special_name = None
     if current_workspace_info.get('is_special', False):
         current_special_name = current_workspace_info['name'].replace('special:', '')
-        subprocess.run(['hyprctl', 'dispatch', 'togglespecialworkspace', current_special_name])
-        time.sleep(0.1)
     
-    # Switch to zen workspace
-    switch_to_workspace(zen_workspace_info)
+    # Leave the special workspace and switch to zen in one round trip
+    hyprland.dispatch(
+        f"togglespecialworkspace {current_special_name}" if current_special_name else None,
+        workspace_dispatch(zen_workspace_info)
+    )
     time.sleep(0.2)
     
     try:
@@ -260,12 +424,12 @@ def scrape_url(url: str) -> str:
         pyperclip.copy("")
         time.sleep(0.1)
         
-        # Get all tabs
-        tabs = get_all_tabs()
+        # Get all tabs, no keystroke needed while the extension keeps the index current
+        tabs = tab_index.listing() if tab_index.ready else get_all_tabs()
         current_tab_count = 1 + len(tabs.get('other_tabs', []))
         print(f"Found current tab + {len(tabs.get('other_tabs', []))} other tabs")
         
-        # Check if URL matches any existing tab (only tabs with id <= 8)
+        # Check if URL matches any existing tab we can switch to
         matching_tab = find_matching_tab(url, tabs)
         opened_new_tab = False
         
@@ -275,65 +439,69 @@ def scrape_url(url: str) -> str:
             if matching_tab['type'] == 'current':
                 print("URL already in current tab")
                 # Already on the correct tab, do nothing
+            elif matching_tab.get('tab_id') is not None and extension_bridge.connected:
+                # Any tab, not just the first 8
+                print(f"Activating tab {matching_tab['id']} by id")
+                extension_bridge.request('activate_tab', tab_id=matching_tab['tab_id'])
             else:
                 print(f"Switching to tab {matching_tab['id']}")
                 if not switch_to_tab(matching_tab['id']):
                     print(f"Failed to switch to tab {matching_tab['id']}")
-                    return "Failed to switch to matching tab"
+                    raise ScrapeError("Failed to switch to matching tab")
                 time.sleep(0.5)  # Increased wait time
         else:
             print(f"No matching tab found for {url} (or tab id > 8), opening new tab")
             # Open new tab with the URL
-            subprocess.run(['wtype', '-M', 'ctrl', '-k', 't'])  # Ctrl+T for new tab
+            guarded_run('wtype', ['wtype', '-M', 'ctrl', '-k', 't'])  # Ctrl+T for new tab
             time.sleep(0.5)  # Increased wait time
             
             # Type the URL
-            subprocess.run(['wtype', url])
+            guarded_run('wtype', ['wtype', url])
             time.sleep(0.3)
             
             # Press Enter to navigate
-            subprocess.run(['wtype', '-k', 'Return'])
-            time.sleep(4)  # Increased wait time for page to load
+            guarded_run('wtype', ['wtype', '-k', 'Return'])
             opened_new_tab = True
         
-        # Clear clipboard before copying page data
-        pyperclip.copy("")
-        time.sleep(0.2)
-        
-        # Press Ctrl+G to get the structured page data
-        subprocess.run(['wtype', '-M', 'ctrl', '-k', 'g'])
-        time.sleep(0.5)  # Wait for the extension to process and copy data
-        
-        # Get the copied JSON content
-        page_json = pyperclip.paste()
-        time.sleep(0.2)
+        if opened_new_tab:
+            page_json = _wait_for_new_tab(url)
+        else:
+            # Press Ctrl+G to get the structured page data
+            page_json = copy_page_data()
         
         if opened_new_tab:
             print("Closing new tab...")
-            subprocess.run(['wtype', '-M', 'ctrl', '-k', 'w'])  # Ctrl+W to close tab
+            guarded_run('wtype', ['wtype', '-M', 'ctrl', '-k', 'w'])  # Ctrl+W to close tab
             time.sleep(0.2)
 
         print(f"Extracted JSON data: {len(page_json)} characters")
         
-        # Parse and format the JSON data
-        formatted_content = parse_page_data(page_json)
+        # Remember the extracted page for later scrapes and websearch results
+        try:
+            page_data = json.loads(page_json)
+        except json.JSONDecodeError:
+            slot.timed_out()
+            raise ScrapeError(f"Error parsing page data: {page_json[:500]}...")
+        _remember_page(url, page_data, slot)
         
-        return formatted_content
+        return page_data
 
     finally:
         # Switch back to original workspace properly
         if current_workspace_info.get('is_special', False):
             # If we were originally in a special workspace:
-            # 1. First go back to the regular workspace that was underneath the special
+            # go back to the regular workspace that was underneath the special,
+            # then toggle the special workspace back on, as one batch
             underlying_workspace = current_workspace_info.get('underlying_workspace')
-            if underlying_workspace:
-                subprocess.run(['hyprctl', 'dispatch', 'workspace', str(underlying_workspace['id'])])
-            time.sleep(0.1)
-            # 2. Then toggle the special workspace back on
-            subprocess.run(['hyprctl', 'dispatch', 'togglespecialworkspace', current_special_name])
+            hyprland.dispatch(
+                f"workspace {underlying_workspace['id']}" if underlying_workspace else None,
+                f"togglespecialworkspace {current_special_name}"
+            )
         else:
             # If we were in a regular workspace, just switch back normally
             switch_to_workspace(current_workspace_info)
 
 # Description for the tool
-scrape_url_description = "Scrape the readable content of a given URL. This tool returns the cleaned text content, title, and URL from the page in a structured JSON format."
\ No newline at end of file
+scrape_url_description = "Scrape the readable content of a given URL. This tool returns the cleaned text content, title, and URL from the page in a structured JSON format. Recently scraped pages are served from cache, set bypass_cache=true to force a fresh scrape."
+
+scrape_urls_description = "Scrape several URLs in parallel (up to 20). Returns one entry per URL with status (ok, empty or error), title, cleaned content and how long it took. Use this instead of calling scrape_url_content repeatedly. Recently scraped pages are served from cache, set bypass_cache=true to force fresh scrapes."
\ No newline at end of file
@@ -1,136 +1,267 @@
+import os
 import re
 import asyncio
-from typing import List, Dict, Any
-from playwright.async_api import async_playwright
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Union
 from urllib.parse import urlparse
 import time
 import pyperclip
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from tools.browser_pool import browser_pool
+from tools.search_cache import search_cache
+from tools.content_cache import content_cache, cache_key
+from tools.http_fetch import fetch_static, preferred_tier, record_tier
+from tools.ranking import rank_results
+from tools.dedup import dedupe_results
+from tools.host_scheduler import host_scheduler
+from tools.search_backends import default_backends, fan_out_search
+from tools.readiness import wait_until_stable
+from tools.doc_fetch import url_looks_like_document
+from tools.content_budget import ContentBudget, PeakMemory, MAX_PAGE_CHARS, MAX_PAGE_BYTES
 
-async def scrape_web_content(query: str, max_links: int = 7, max_content_length: int = None, use_duckduckgo: bool = True) -> Dict[str, Any]:
-    async with async_playwright() as p:
-        # Launch browser with stealth settings but NOT headless
-        browser = await p.chromium.launch(
-            headless=False,  # Keep visible to avoid detection
-            args=[
-                '--no-sandbox',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor',
-                '--disable-background-timer-throttling',
-                '--disable-backgrounding-occluded-windows',
-                '--disable-renderer-backgrounding',
-                '--disable-extensions',
-                '--disable-plugins',
-                '--disable-default-apps',
-                '--no-first-run',
-                '--disable-background-networking',
-                '--disable-ipc-flooding-protection',
-                '--disable-hang-monitor',
-                '--disable-prompt-on-repost',
-                '--disable-sync',
-                '--force-color-profile=srgb',
-                '--metrics-recording-only',
-                '--use-mock-keychain',
-                '--disable-component-extensions-with-background-pages',
-                '--disable-default-apps',
-                '--mute-audio',
-                '--no-default-browser-check',
-                '--autoplay-policy=user-gesture-required',
-                '--disable-background-mode',
-                '--disable-notifications'
-            ]
-        )
-        
-        # Create 7 contexts for maximum parallel processing
-        contexts = []
-        num_contexts = 7  # Full 7 parallel contexts
-
-        for i in range(num_contexts):
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={'width': 1366, 'height': 768},
-                locale='en-US',
-                timezone_id='America/New_York',
-                ignore_https_errors=True,
-                extra_http_headers={
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                }
+# Overridable so the benchmark suite can point searches at a local stand-in
+DUCKDUCKGO_URL = os.environ.get('WEBSEARCH_DUCKDUCKGO_URL', 'https://duckduckgo.com/')
+
+async def scrape_web_content(query: str, max_links: int = 7, max_content_length: int = None, use_duckduckgo: bool = True, use_cache: bool = True, on_result: Optional[Callable[[Dict, int, int], Awaitable[None]]] = None, target_results: int = None, deadline: float = None, rank_passages: bool = False, per_result_chars: int = 4000, total_chars: int = 20000, dedupe: bool = True) -> Dict[str, Any]:
+    """
+    Search for `query` and scrape the result pages.
+    
+    With `target_results` set, up to `max_links` links are scraped at once and the
+    call returns as soon as `target_results` pages have content. `deadline` is the
+    overall latency budget in seconds, after which unfinished scrapes are cancelled.
+    With `rank_passages`, each page is cut down to its passages most relevant to the
+    query, within `per_result_chars` per page and `total_chars` overall.
+    With `dedupe`, mirrored pages and repeated passages are collapsed first.
+    Results come back in the rank-fused order of the search backends that have
+    answered by then; slower backends finish in the background and only feed
+    the search cache.
+    """
+    start_time = time.monotonic()
+    
+    # Step 1: Fan the search out to every backend, pushing each link onto a
+    # queue the moment any of them produces it
+    link_queue = asyncio.Queue()
+    ranked_links = []
+    
+    def update_rank(links):
+        ranked_links[:] = links
+    
+    async def feed_links():
+        try:
+            await _search_links(query, max_links, use_cache, on_link=link_queue.put, use_duckduckgo=use_duckduckgo, on_ranked=update_rank)
+        finally:
+            link_queue.put_nowait(None)
+    
+    search_task = asyncio.create_task(feed_links())
+
+    # Step 2: Scrape links as they arrive, each on its own pooled context,
+    # overlapping search latency with scrape latency, within the call's text budget
+    print("Scraping websites across pooled browser contexts as search results arrive...")
+    budget = ContentBudget()
+    try:
+        async with PeakMemory() as memory:
+            scraped_content = await _scrape_7_parallel_contexts(
+                browser_pool, link_queue, use_cache=use_cache, on_result=on_result,
+                target_results=target_results, deadline=deadline, budget=budget
             )
-            
-            # Enhanced stealth techniques
-            await context.add_init_script("""
-                // Override the `plugins` property to use a custom getter.
-                Object.defineProperty(navigator, 'plugins', {
-                    get: function() {
-                        return [1, 2, 3, 4, 5];
-                    },
-                });
+    except BaseException:
+        search_task.cancel()
+        raise
+    
+    # Enough pages are in, but let slower backends finish so their results
+    # still reach the search cache
+    search_error = None
+    if search_task.done():
+        # Say why there are no results, e.g. every search backend known to be down
+        search_error = search_task.exception() if not search_task.cancelled() else None
+    else:
+        _background_tasks.add(search_task)
+        search_task.add_done_callback(_finish_background_search)
 
-                // Override the `languages` property to use a custom getter.
-                Object.defineProperty(navigator, 'languages', {
-                    get: function() {
-                        return ['en-US', 'en'];
-                    },
-                });
+    # Scrapes finish in arrival order, put them back in fused search rank
+    rank = {cache_key(link['url']): i for i, link in enumerate(ranked_links)}
+    scraped_content.sort(key=lambda result: rank.get(cache_key(result['url']), len(rank)))
 
-                // Override the webdriver property
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined,
-                });
+    # Collapse mirrors, syndicated copies and repeated passages across results
+    merged = []
+    if dedupe:
+        scraped_content, merged = dedupe_results(scraped_content)
+        if merged:
+            print(f"Deduplication removed {sum(m['chars_removed'] for m in merged)} characters")
 
-                // Mock chrome object
-                window.chrome = {
-                    runtime: {},
-                };
-
-                // Mock permissions
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({ state: 'granted' }) :
-                        originalQuery(parameters)
-                );
-            """)
-            
-            contexts.append(context)
+    # Optionally keep only the passages that matter for this query
+    if rank_passages:
+        full_length = sum(result['content_length'] for result in scraped_content)
+        scraped_content = rank_results(query, scraped_content, per_result_chars, total_chars)
+        print(f"Passage ranking kept {sum(r['content_length'] for r in scraped_content)} of {full_length} characters")
+
+    # Copy the results to clipboard
+    try:
+        pyperclip.copy(str(scraped_content))
+    except pyperclip.PyperclipException as e:
+        print(f"Could not copy results to clipboard: {e}")
+
+    response = {
+        'query': query,
+        'search_engine': '+'.join(backend.name for backend in default_backends(use_duckduckgo)),
+        'total_results': len(scraped_content),
+        'elapsed_seconds': round(time.monotonic() - start_time, 2),
+        'merged_duplicates': merged,
+        'memory': {**memory.report(), **budget.report()},
+        'search_cache': search_cache.stats(),
+        'content_cache': content_cache.stats(),
+        'results': scraped_content
+    }
+    if search_error is not None:
+        response['error'] = f"Search failed: {search_error}"
+    return response
+
+
+async def scrape_web_content_batch(queries: List[str], max_links: int = 6, use_cache: bool = True, on_result: Optional[Callable[[Dict, int, int], Awaitable[None]]] = None, target_results: int = None, deadline: float = None, max_concurrency: int = 10, rank_passages: bool = False, per_result_chars: int = 3000, total_chars: int = 12000, dedupe: bool = True) -> Dict[str, Any]:
+    """
+    Search several related queries at once and scrape each distinct URL only once.
+    
+    All queries are searched concurrently, their links are merged by normalized URL
+    and scraped through the shared context pool with at most `max_concurrency`
+    fetches in flight. A page found by several queries is returned in full under
+    the first one and referenced from the others. `target_results` caps the pages
+    per query, `deadline` is the overall latency budget in seconds.
+    """
+    start_time = time.monotonic()
+    queries = [q for q in dict.fromkeys(q.strip() for q in queries) if q]
+    
+    # Step 1: Search every query concurrently
+    link_lists = await asyncio.gather(
+        *(_search_links(query, max_links, use_cache) for query in queries),
+        return_exceptions=True
+    )
+    
+    # Step 2: Merge overlapping links, remembering which queries found each URL
+    unique_links = {}
+    found_by = {}
+    for query, links in zip(queries, link_lists):
+        if isinstance(links, Exception):
+            print(f"Search failed for {query}: {links}")
+            continue
+        for link in links:
+            key = cache_key(link['url'])
+            unique_links.setdefault(key, link)
+            found_by.setdefault(key, []).append(query)
+    shared = sum(1 for owners in found_by.values() if len(owners) > 1)
+    print(f"Batch of {len(queries)} queries found {len(unique_links)} unique URLs ({shared} shared)")
+    
+    # Step 3: Scrape each URL once under a global concurrency cap
+    remaining = None
+    if deadline is not None:
+        remaining = max(0.0, deadline - (time.monotonic() - start_time))
+    budget = ContentBudget()
+    async with PeakMemory() as memory:
+        scraped = await _scrape_7_parallel_contexts(
+            browser_pool, list(unique_links.values()), use_cache=use_cache, on_result=on_result,
+            deadline=remaining, max_concurrency=max_concurrency, budget=budget
+        )
+    scraped_by_key = {cache_key(result['url']): result for result in scraped}
+    
+    # Step 4: Assemble per-query results in search-rank order
+    per_query = []
+    emitted = {}
+    for query, links in zip(queries, link_lists):
+        if isinstance(links, Exception):
+            per_query.append({'query': query, 'error': str(links), 'total_results': 0, 'results': []})
+            continue
+        results = []
+        for link in links:
+            key = cache_key(link['url'])
+            if key in scraped_by_key and key not in emitted and len(results) < (target_results or len(links)):
+                results.append(scraped_by_key[key])
+        if dedupe:
+            results, _ = dedupe_results(results)
+        if rank_passages:
+            results = rank_results(query, results, per_result_chars, total_chars)
+        for result in results:
+            emitted[cache_key(result['url'])] = query
         
-        try:
-            # Step 1: Fast search using single context
-            if use_duckduckgo:
-                search_links = await _search_duckduckgo_ultra_fast(contexts[0], query, max_links)
-            else:
-                search_links = []
-            
-            # Step 2: Distribute scraping across 7 contexts (1 link per context for maximum speed)
-            print(f"Scraping {len(search_links)} websites across {len(contexts)} browser contexts in parallel...")
-            scraped_content = await _scrape_7_parallel_contexts(contexts, search_links)
-
-            # Copy the results to clipboard
-            pyperclip.copy(str(scraped_content))
-
-            return {
-                'query': query,
-                'search_engine': 'DuckDuckGo' if use_duckduckgo else 'Google',
-                'total_results': len(scraped_content),
-                'results': scraped_content
-            }
-            
-        finally:
-            for context in contexts:
-                await context.close()
-            await browser.close()
+        # Pages already returned for an earlier query are only referenced
+        see_also = [
+            {'url': link['url'], 'title': link['title'], 'see_query': emitted[cache_key(link['url'])]}
+            for link in links
+            if cache_key(link['url']) in emitted and emitted[cache_key(link['url'])] != query
+        ]
+        per_query.append({
+            'query': query,
+            'total_results': len(results),
+            'results': results,
+            'also_relevant': see_also
+        })
+    
+    return {
+        'queries': per_query,
+        'unique_urls': len(unique_links),
+        'shared_urls': shared,
+        'elapsed_seconds': round(time.monotonic() - start_time, 2),
+        'memory': {**memory.report(), **budget.report()},
+        'search_cache': search_cache.stats(),
+        'content_cache': content_cache.stats()
+    }
+
+
+async def _search_links(query: str, max_links: int, use_cache: bool = True, on_link: Optional[Callable[[Dict], Awaitable[None]]] = None, use_duckduckgo: bool = True, on_ranked: Optional[Callable[[List[Dict[str, str]]], None]] = None) -> List[Dict[str, str]]:
+    """
+    Search every configured backend in parallel, skipped when the same (normalized) query was searched recently.
+
+    The cache is written each time another backend answers, so a search the
+    caller stops waiting for still leaves what it found for the next call.
+    `on_ranked` also gets each of those rank-fused lists.
+    """
+    backends = default_backends(use_duckduckgo)
+    if not backends:
+        print("No search backends configured, set WEBSEARCH_SEARXNG_URL or enable DuckDuckGo")
+        return []
+    engine = '+'.join(backend.name for backend in backends)
+    
+    cached_links = search_cache.get(query, max_links, engine=engine) if use_cache else None
+    if cached_links is not None:
+        print(f"Search cache hit for: {query}")
+        if on_link is not None:
+            for link in cached_links:
+                await on_link(link)
+        if on_ranked is not None:
+            on_ranked(cached_links)
+        return cached_links
+    
+    async def warm_and_forward(link):
+        _warm_host(link['url'])
+        if on_link is not None:
+            await on_link(link)
+    
+    def store(links):
+        search_cache.put(query, max_links, links, engine=engine)
+        if on_ranked is not None:
+            on_ranked(links)
+    
+    return await fan_out_search(query, max_links, backends, on_link=warm_and_forward, is_valid=_is_valid_url, on_ranked=store)
 
 
-async def _search_duckduckgo_ultra_fast(context, query: str, max_links: int) -> List[Dict[str, str]]:
-    """Ultra-fast DuckDuckGo search with aggressive optimizations"""
+async def _search_duckduckgo_ultra_fast(context, query: str, max_links: int, on_link: Optional[Callable[[Dict], Awaitable[None]]] = None) -> List[Dict[str, str]]:
+    """
+    Ultra-fast DuckDuckGo search with aggressive optimizations
+    
+    With `on_link`, every valid result is handed over the moment its article is
+    rendered, so scraping can start while the rest of the SERP is still loading.
+    """
     page = await context.new_page()
     links = []
+    seen = set()
+    
+    async def report(result):
+        if len(links) >= max_links or not result.get('url') or result['url'] in seen:
+            return
+        seen.add(result['url'])
+        if not _is_valid_url(result['url']):
+            return
+        links.append(result)
+        print(f"Found: {result['title']}")
+        if on_link is not None:
+            await on_link(result)
     
     try:
         print(f"Searching DuckDuckGo for: {query}")
@@ -140,8 +271,13 @@ async def _search_duckduckgo_ultra_fast(context, query: str, max_links: int) ->
                         if route.request.resource_type in ['image', 'stylesheet', 'font', 'media', 'websocket', 'other'] 
                         else route.continue_())
         
+        # Report each result article as soon as it is added to the DOM
+        if on_link is not None:
+            await page.expose_binding('__mcpReportResult', lambda source, result: report(result))
+            await page.add_init_script(RESULT_OBSERVER_SCRIPT)
+        
         # Navigate with minimal wait
-        await page.goto("https://duckduckgo.com/", wait_until="commit", timeout=8000)
+        await page.goto(DUCKDUCKGO_URL, wait_until="commit", timeout=8000)
         
         # Lightning-fast search execution
         await page.fill("input[name='q']", query)
@@ -155,7 +291,8 @@ async def _search_duckduckgo_ultra_fast(context, query: str, max_links: int) ->
             timeout=8000
         )
         
-        # Extract all data in single JavaScript execution (fastest method)
+        # Extract all data in single JavaScript execution (fastest method),
+        # also a final sweep for anything the observer missed
         results = await page.evaluate(f"""
             () => {{
                 const articles = Array.from(document.querySelectorAll("article[data-testid='result']")).slice(0, {max_links});
@@ -175,9 +312,7 @@ async def _search_duckduckgo_ultra_fast(context, query: str, max_links: int) ->
         
         # Filter valid URLs
         for result in results:
-            if result['url'] and _is_valid_url(result['url']):
-                links.append(result)
-                print(f"Found: {result['title']}")
+            await report(result)
         
     except Exception as e:
         print(f"Error searching DuckDuckGo: {e}")
@@ -188,52 +323,221 @@ async def _search_duckduckgo_ultra_fast(context, query: str, max_links: int) ->
     return links
 
 
-async def _scrape_7_parallel_contexts(contexts: List, links: List[Dict]) -> List[Dict]:
-    """Maximum parallelization: each link gets its own dedicated context"""
+# Installed on the search page to stream result articles to Python as they render
+RESULT_OBSERVER_SCRIPT = """
+(() => {
+    const reported = new WeakSet();
+    const report = () => {
+        document.querySelectorAll("article[data-testid='result']").forEach(article => {
+            if (reported.has(article)) return;
+            const linkEl = article.querySelector("h2 a");
+            if (!linkEl) return;
+            reported.add(article);
+            const snippetEl = article.querySelector("[data-result='snippet']");
+            window.__mcpReportResult({
+                url: linkEl.href,
+                title: linkEl.innerText.trim(),
+                snippet: snippetEl ? snippetEl.innerText.trim() : ''
+            });
+        });
+    };
+    new MutationObserver(report).observe(document, { childList: true, subtree: true });
+    document.addEventListener('DOMContentLoaded', report);
+})();
+"""
+
+_background_tasks = set()
+
+
+def _finish_background_search(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Background search failed: {task.exception()}")
+
+
+def _warm_host(url: str):
+    """Resolve a result host in the background so DNS is warm by the time a scraper connects"""
+    async def resolve(host, port):
+        try:
+            await asyncio.get_running_loop().getaddrinfo(host, port)
+        except OSError:
+            pass
+
+    parsed = urlparse(url)
+    if not parsed.hostname:
+        return
+    task = asyncio.create_task(resolve(parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80)))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _scrape_7_parallel_contexts(pool, links: Union[List[Dict], asyncio.Queue], use_cache: bool = True, on_result: Optional[Callable[[Dict, int, int], Awaitable[None]]] = None, target_results: int = None, deadline: float = None, max_concurrency: int = None, budget: ContentBudget = None) -> List[Dict]:
+    """
+    Maximum parallelization: each link borrows its own dedicated context from the pool.
+    
+    `links` is a list, or a queue of links ended by None so scraping can start
+    while the search is still running. Returns the first `target_results` pages
+    with content (all of them if None), or whatever finished within `deadline`
+    seconds, in search-rank order.
+    `max_concurrency` caps fetches in flight across both the HTTP and browser tiers.
+    `budget` bounds the text kept per page and for the whole call.
+    """
+    limiter = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    if budget is None:
+        budget = ContentBudget()
     
-    async def scrape_single_link_dedicated_context(context, link_data, index):
+    async def scrape_single_link_dedicated_context(link_data, index):
         """Each link gets a dedicated context for maximum speed"""
-        page = await context.new_page()
+        if budget.exhausted:
+            print(f"Context {index + 1}: Content budget spent, skipping {link_data['url']}")
+            budget.skip()
+            return {}
         
+        cached = content_cache.get(link_data['url']) if use_cache else None
+        if cached is not None:
+            print(f"Context {index + 1}: Content cache hit for {link_data['url']}")
+            return _build_result(link_data, budget.take(cached['content']), cached=True)
+
+        # Fast tier: plain HTTP + Python extraction, unless the domain is known to need
+        # a browser. PDFs and other documents always go this way, a browser only shows a viewer
+        tier = preferred_tier(link_data['url'])
+        if tier != 'browser' or url_looks_like_document(link_data['url']):
+            static = await fetch_static(link_data['url'])
+            if static is None:
+                content = ''
+            elif static.get('kind') == 'json':
+                # Line cleaning would squash the indentation doc_fetch gave the JSON
+                content = static['content'][:budget.per_page]
+            else:
+                content = _clean_text_unlimited(static['content'], budget.per_page)
+            if len(content) >= 100:
+                kind = static.get('kind', 'html')
+                # A PDF says nothing about how the site's HTML pages render
+                if kind == 'html':
+                    record_tier(link_data['url'], 'http')
+                # Cache the whole page before the call's budget cuts it, unless
+                # the per-page or byte cap already did
+                if not static.get('truncated') and len(static['content']) < budget.per_page:
+                    content_cache.put(link_data['url'], link_data['title'], content)
+                content = budget.take(content)
+                print(f"Context {index + 1}: Extracted {len(content)} characters over HTTP from {link_data['url']} ({kind})")
+                return _build_result(link_data, content, tier='http')
+
+        # The budget may have run out while this page was on the HTTP tier
+        if budget.exhausted:
+            budget.skip()
+            return {}
+        
+        async with pool.context() as context:
+            page = await context.new_page()
+            
+            try:
+                print(f"Context {index + 1}: Scraping {link_data['url']}")
+                result = await _scrape_page_unlimited_content(page, link_data, index, budget.per_page)
+                if result:
+                    record_tier(link_data['url'], 'browser')
+                    if not result.get('truncated'):
+                        content_cache.put(result['url'], result['title'], result['content'])
+                    result['content'] = budget.take(result['content'])
+                    result['content_length'] = len(result['content'])
+                return result
+            except Exception as e:
+                print(f"Context {index + 1} error: {e}")
+                return {}
+            finally:
+                await page.close()
+
+    async def scrape_indexed(link_data, index):
         try:
-            print(f"Context {index + 1}: Scraping {link_data['url']}")
-            result = await _scrape_page_unlimited_content(page, link_data, index)
-            return result
+            if limiter is None:
+                return index, await scrape_single_link_dedicated_context(link_data, index)
+            async with limiter:
+                return index, await scrape_single_link_dedicated_context(link_data, index)
         except Exception as e:
-            print(f"Context {index + 1} error: {e}")
-            return {}
-        finally:
-            await page.close()
+            return index, e
 
-    # Create tasks - each link gets its own context (up to 7)
-    tasks = []
-    for i, link in enumerate(links[:7]):  # Limit to 7 for perfect 1:1 mapping
-        context = contexts[i % len(contexts)]
-        tasks.append(scrape_single_link_dedicated_context(context, link, i))
+    results = {}
+    pending = set()
+    started = 0
+    successful = 0
+    
+    def start(link):
+        # Links are numbered in arrival order, which is search-rank order
+        nonlocal started
+        pending.add(asyncio.create_task(scrape_indexed(link, started)))
+        started += 1
+    
+    # Links come either as a list or as a queue fed by a running search (ended by None)
+    getter = None
+    if isinstance(links, asyncio.Queue):
+        getter = asyncio.create_task(links.get())
+        target = target_results or float('inf')
+    else:
+        for link in links:
+            start(link)
+        target = min(target_results or len(links), len(links))
     
-    # Execute all 7 scraping operations simultaneously
-    print(f"Launching {len(tasks)} parallel scraping operations...")
+    def progress_total():
+        return int(target) if target != float('inf') else max(started, successful)
+    
+    deadline_at = time.monotonic() + deadline if deadline is not None else None
+    
+    # Hand each page to on_result as soon as it finishes, and stop once `target`
+    # pages have content or the deadline passes instead of waiting for the slowest
+    print(f"Launching parallel scraping operations for {target_results or 'all'} results...")
     start_time = time.time()
     
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    while (pending or getter is not None) and successful < target:
+        timeout = None
+        if deadline_at is not None:
+            timeout = deadline_at - time.monotonic()
+            if timeout <= 0:
+                print("Scrape deadline reached")
+                break
+        waiting = pending | ({getter} if getter is not None else set())
+        done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task is getter:
+                link = task.result()
+                if link is None:
+                    getter = None
+                else:
+                    start(link)
+                    getter = asyncio.create_task(links.get())
+                continue
+            
+            pending.discard(task)
+            i, result = task.result()
+            if isinstance(result, dict) and result.get('content') and successful < target:
+                results[i] = result
+                successful += 1
+                print(f"Context {i + 1}: Successfully scraped {len(result['content'])} characters")
+                if on_result is not None:
+                    try:
+                        await on_result(result, successful, progress_total())
+                    except Exception as e:
+                        print(f"Context {i + 1}: Failed to stream result: {e}")
+            elif isinstance(result, Exception):
+                print(f"Context {i + 1}: Failed with error: {result}")
     
-    end_time = time.time()
-    print(f"Completed all scraping in {end_time - start_time:.2f} seconds")
+    # Cancel stragglers; their pages and contexts go back to the pool on the way out
+    if getter is not None:
+        getter.cancel()
+    if pending:
+        print(f"Cancelling {len(pending)} straggling scrapes")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
     
-    # Filter successful results
-    scraped_content = []
-    for i, result in enumerate(results):
-        if isinstance(result, dict) and result.get('content'):
-            scraped_content.append(result)
-            print(f"Context {i + 1}: Successfully scraped {len(result['content'])} characters")
-        elif isinstance(result, Exception):
-            print(f"Context {i + 1}: Failed with error: {result}")
+    end_time = time.time()
+    print(f"Completed scraping in {end_time - start_time:.2f} seconds ({successful}/{started} results)")
     
-    return scraped_content
+    # Keep successful results in search-rank order
+    return [results[i] for i in sorted(results)]
 
 
-async def _scrape_page_unlimited_content(page, link_data: Dict, context_index: int) -> Dict:
-    """Lightning-fast page scraping with UNLIMITED content length"""
+async def _scrape_page_unlimited_content(page, link_data: Dict, context_index: int, max_chars: int = MAX_PAGE_CHARS) -> Dict:
+    """Lightning-fast page scraping, keeping at most `max_chars` characters of text"""
     
     try:
         # Aggressive resource blocking - only allow essential resources
@@ -248,15 +552,32 @@ async def _scrape_page_unlimited_content(page, link_data: Dict, context_index: i
         page.set_default_timeout(15000)
         page.set_default_navigation_timeout(15000)
         
-        # Navigate with minimal wait - don't wait for full load
-        await page.goto(link_data['url'], wait_until="commit", timeout=15000)
-        
-        # Wait only for document ready, not full load
-        await page.wait_for_load_state("domcontentloaded", timeout=12000)
+        # Navigate politely: per-host concurrency, rate limits and backoff
+        async with host_scheduler.slot(link_data['url']) as slot:
+            try:
+                # Navigate with minimal wait - don't wait for full load
+                response = await page.goto(link_data['url'], wait_until="commit", timeout=15000)
+                if response is not None:
+                    slot.status(response.status, response.headers.get('retry-after'))
+                    # Don't let a giant document anywhere near the extraction script
+                    declared = int(response.headers.get('content-length') or 0)
+                    if declared > MAX_PAGE_BYTES:
+                        print(f"Context {context_index + 1}: {link_data['url']} is {declared // (1024 * 1024)} MB, skipping")
+                        return {}
+                
+                # Wait until the main text stops growing rather than for a load event,
+                # DOM ready is too early for SPAs and full load too slow for static pages
+                readiness_info = await wait_until_stable(page, link_data['url'], cap=12.0)
+                if not readiness_info['ready'] and not readiness_info['length']:
+                    raise PlaywrightTimeoutError(f"no content after {readiness_info['seconds']}s")
+            except PlaywrightTimeoutError:
+                slot.timed_out()
+                raise
         
-        # Extract ALL content without length limits
+        # Extract the content, cut to `max_chars` inside the page so an oversized
+        # page is never copied whole into the server
         content = await page.evaluate("""
-            () => {
+            (maxChars) => {
                 // Immediate DOM cleanup and content extraction
                 const unwantedSelectors = [
                     'script', 'style', 'nav', 'header', 'footer', 'aside',
@@ -311,42 +632,62 @@ async def _scrape_page_unlimited_content(page, link_data: Dict, context_index: i
                         'p, div.content, div.text, div.article, div.post, section, .paragraph'
                     );
                     
-                    const additionalContent = Array.from(contentElements)
-                        .map(el => el.innerText || el.textContent || '')
-                        .filter(text => text.length > 50)
-                        .join('\\n\\n');
+                    // Stop collecting once the budget is covered
+                    const sections = [];
+                    let collected = 0;
+                    for (const el of contentElements) {
+                        const text = el.innerText || el.textContent || '';
+                        if (text.length <= 50) continue;
+                        sections.push(text);
+                        collected += text.length + 2;
+                        if (collected >= maxChars) break;
+                    }
+                    const additionalContent = sections.join('\\n\\n');
                     
                     if (additionalContent.length > allContent.length) {
                         allContent = additionalContent;
                     }
                 }
                 
-                return allContent;
+                return allContent.length > maxChars ? allContent.slice(0, maxChars) : allContent;
             }
-        """)
+        """, max_chars)
         
-        # Clean text but keep ALL content
-        content = _clean_text_unlimited(content)
+        # Clean text within the same budget
+        truncated = len(content) >= max_chars
+        content = _clean_text_unlimited(content, max_chars)
         
         if len(content) < 100:  # Skip pages with too little content
             print(f"Context {context_index + 1}: Content too short ({len(content)} chars), skipping")
             return {}
         
-        print(f"Context {context_index + 1}: Extracted {len(content)} characters from {link_data['url']}")
+        print(f"Context {context_index + 1}: Extracted {len(content)} characters from {link_data['url']} (text settled after {readiness_info['ready_seconds']}s)")
         
-        return {
-            'url': link_data['url'],
-            'title': link_data['title'],
-            'search_snippet': link_data.get('snippet', ''),
-            'content': content,
-            'content_length': len(content)
-        }
+        result = _build_result(link_data, content)
+        if truncated:
+            result['truncated'] = True
+        return result
         
     except Exception as e:
         print(f"Context {context_index + 1}: Error scraping {link_data['url']}: {e}")
         return {}
 
 
+def _build_result(link_data: Dict, content: str, cached: bool = False, tier: str = 'browser') -> Dict:
+    result = {
+        'url': link_data['url'],
+        'title': link_data['title'],
+        'search_snippet': link_data.get('snippet', ''),
+        'content': content,
+        'content_length': len(content)
+    }
+    if cached:
+        result['cached'] = True
+    else:
+        result['fetched_via'] = tier
+    return result
+
+
 def _is_valid_url(url: str) -> bool:
     """Ultra-fast URL validation"""
     if not url or len(url) < 10:
@@ -363,36 +704,45 @@ def _is_valid_url(url: str) -> bool:
     return True
 
 
-def _clean_text_unlimited(text: str) -> str:
-    """Ultra-fast text cleaning that preserves ALL content"""
+# Only the most obvious unwanted patterns (minimal cleaning)
+_QUICK_REMOVES = re.compile('|'.join(map(re.escape, [
+    'Click here to', 'Subscribe to', 'Sign up for', 'Follow us on',
+    'Share this article', 'Related articles', 'You may also like'
+])))
+_LINE = re.compile(r'[^\n]+')
+
+
+def _clean_text_unlimited(text: str, max_chars: int = None) -> str:
+    """
+    Text cleaning in one walk over the lines: collapse whitespace within each
+    line, drop empty lines and join paragraphs with blank lines.
+    
+    Lines are matched in place rather than split into a list first, and with
+    `max_chars` the walk stops as soon as that much text has been kept, so a
+    huge page never gets copied whole. Boilerplate phrases are removed from
+    the (bounded) result in a single regex pass.
+    """
     if not text:
         return ""
     
-    # Preserve all content, just clean up formatting
-    # Replace multiple whitespace with single space but keep paragraph breaks
-    lines = text.split('\n')
-    cleaned_lines = []
+    parts = []
+    size = 0
+    for match in _LINE.finditer(text):
+        line = ' '.join(match.group().split())
+        if not line:
+            continue
+        if parts:
+            size += 2
+        if max_chars is not None and size + len(line) >= max_chars:
+            parts.append(line[:max(0, max_chars - size)])
+            break
+        parts.append(line)
+        size += len(line)
     
-    for line in lines:
-        cleaned_line = ' '.join(line.split())  # Remove extra spaces within line
-        if cleaned_line.strip():  # Only keep non-empty lines
-            cleaned_lines.append(cleaned_line)
-    
-    # Join with double newlines to preserve paragraph structure
-    text = '\n\n'.join(cleaned_lines)
-    
-    # Remove only the most obvious unwanted patterns (minimal cleaning)
-    quick_removes = [
-        'Click here to', 'Subscribe to', 'Sign up for', 'Follow us on',
-        'Share this article', 'Related articles', 'You may also like'
-    ]
-    
-    for phrase in quick_removes:
-        if phrase in text:
-            text = text.replace(phrase, '')
-    
-    return text.strip()
+    return _QUICK_REMOVES.sub('', '\n\n'.join(parts)).strip()
+
 
 
+websearch_batch_description = "Search the web for several related queries in one step (pass them as a list). Overlapping results are scraped once, and a page found by several queries is returned under the first one and referenced from the rest. Use this instead of several websearch calls in a row. Supports max_results per query, time_budget, focused and bypass_cache like websearch."
 
-websearch_description = "Search the web for a given query and return the content of the top results."
\ No newline at end of file
+websearch_description = "Search the web for a given query and return the content of the top results. Returns the first max_results pages (default 5) that load within time_budget seconds (default 12). Set focused=true to get only the passages most relevant to the query instead of full pages. Recent searches and pages are cached, set bypass_cache=true to force fresh results."
\ No newline at end of file